@@ -0,0 +1,54 @@
+"""
+Benchmark: Kafka value codecs.
+
+Compares payload size and encode/decode throughput of every registered
+codec for CPTelemetry (the highest-volume topic) and CPStatus.
+
+Run from the repository root:
+    python -m benchmarks.bench_codecs
+"""
+
+import time
+
+from evcharging.common.kafka import available_codecs, get_codec
+from evcharging.common.messages import CPStatus, CPTelemetry
+
+ITERATIONS = 50_000
+
+
+def throughput(fn, *args) -> float:
+    """Return calls per second of CPU time."""
+    start = time.process_time()
+    for _ in range(ITERATIONS):
+        fn(*args)
+    return ITERATIONS / (time.process_time() - start)
+
+
+def main():
+    samples = [
+        CPTelemetry(
+            cp_id="CP-001", kw=22.0, kwh=1.2345, euros=0.37035,
+            driver_id="driver-alice", session_id="session-1a2b3c4d"
+        ),
+        CPStatus(cp_id="CP-001", state="SUPPLYING", reason="Starting supply for driver driver-alice"),
+    ]
+
+    print(f"{'message':<13}{'codec':<18}{'bytes':>7}{'vs json':>9}{'encode/s':>12}{'decode/s':>12}")
+    for message in samples:
+        model = type(message)
+        json_size = len(get_codec("json").encode(message))
+        for name in available_codecs():
+            codec = get_codec(name)
+            if not codec.accepts(message):
+                continue
+            raw = codec.encode(message)
+            assert codec.decode(raw, model) == message
+            print(
+                f"{model.__name__:<13}{name:<18}{len(raw):>7}{len(raw) / json_size:>9.0%}"
+                f"{throughput(codec.encode, message):>12,.0f}"
+                f"{throughput(codec.decode, raw, model):>12,.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: central.commands bytes consumed per CP Engine.
+
+Compares broadcast-and-filter (every engine reads the whole topic) with
+keyed partition assignment (each engine reads only the partition its CP ID
+hashes to) as the fleet grows. Command traffic is modelled as a fixed
+number of commands per CP, serialized exactly as Central sends them.
+
+Run from the repository root:
+    python -m benchmarks.bench_command_routing
+"""
+
+from collections import Counter
+
+from evcharging.common.kafka import partition_for_key, serialize_value
+from evcharging.common.messages import CentralCommand, CommandType
+
+FLEET_SIZES = (10, 100, 500, 1000, 2000)
+PARTITIONS = (16, 64)
+COMMANDS_PER_CP = 20  # ~10 sessions (start + stop) per CP
+
+
+def command_bytes(cp_id: str) -> int:
+    """Serialized size of one START_SUPPLY/STOP_SUPPLY pair, averaged."""
+    start = CentralCommand(
+        cmd=CommandType.START_SUPPLY, cp_id=cp_id,
+        payload={"driver_id": "driver-alice", "request_id": "req-0001", "session_id": "session-1a2b3c4d"}
+    )
+    stop = CentralCommand(cmd=CommandType.STOP_SUPPLY, cp_id=cp_id)
+    return (len(serialize_value(start)) + len(serialize_value(stop))) // 2
+
+
+def fmt_bytes(n: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024:
+            return f"{n:,.1f} {unit}"
+        n /= 1024
+    return f"{n:,.1f} TB"
+
+
+def main():
+    print(
+        f"{'CPs':>6}{'parts':>7}{'broadcast/engine':>18}{'keyed/engine':>15}"
+        f"{'keyed max':>12}{'fleet broadcast':>17}{'fleet keyed':>14}{'reduction':>11}"
+    )
+    for num_partitions in PARTITIONS:
+        for fleet_size in FLEET_SIZES:
+            cp_ids = [f"CP-{i:04d}" for i in range(1, fleet_size + 1)]
+            per_cp = {cp_id: command_bytes(cp_id) * COMMANDS_PER_CP for cp_id in cp_ids}
+            topic_bytes = sum(per_cp.values())
+
+            partition_bytes = Counter()
+            for cp_id, size in per_cp.items():
+                partition_bytes[partition_for_key(cp_id, num_partitions)] += size
+            keyed = [partition_bytes[partition_for_key(cp_id, num_partitions)] for cp_id in cp_ids]
+
+            fleet_broadcast = topic_bytes * fleet_size
+            fleet_keyed = sum(keyed)
+            print(
+                f"{fleet_size:>6}{num_partitions:>7}{fmt_bytes(topic_bytes):>18}"
+                f"{fmt_bytes(fleet_keyed / fleet_size):>15}{fmt_bytes(max(keyed)):>12}"
+                f"{fmt_bytes(fleet_broadcast):>17}{fmt_bytes(fleet_keyed):>14}"
+                f"{fleet_broadcast / fleet_keyed:>10.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark: loading and querying a 100k-CP metadata registry.
+
+Writes a synthetic CSV of 100k charging points and times load() (which
+also builds the GeoIndex, in the loading thread), get() and the indexed
+find() against a linear scan. It also measures the memory held by the
+columnar store against one dataclass per CP, which is how the old
+hardcoded METADATA dict held them, with the GeoIndex's share shown
+separately.
+
+Run from the repository root:
+    python -m benchmarks.bench_cp_registry
+"""
+
+import csv
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from loguru import logger
+
+from evcharging.common.charging_points import ChargingPointMetadata, ChargingPointRegistry
+from evcharging.common.geo import GeoIndex
+
+CP_COUNT = 100000
+LOOKUPS = 20000
+CITIES = [f"City-{i:03d}" for i in range(200)]
+CONNECTORS = ["Type 2", "CCS", "CHAdeMO"]
+POWERS = [7.4, 11.0, 22.0, 50.0, 150.0, 350.0]
+AMENITIES = [["WiFi"], ["Restrooms", "Coffee"], ["24/7"], ["Parking", "Security"], []]
+
+
+def write_registry(path: Path, rng: random.Random):
+    with path.open("w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["cp_id", "name", "address", "city", "latitude", "longitude",
+                         "connector_type", "power_kw", "amenities"])
+        for i in range(CP_COUNT):
+            writer.writerow([
+                f"CP-{i:06d}", f"Station {i}", f"{rng.randint(1, 999)} Main St", rng.choice(CITIES),
+                round(rng.uniform(36, 44), 5), round(rng.uniform(-9, 3), 5),
+                rng.choice(CONNECTORS), rng.choice(POWERS), ";".join(rng.choice(AMENITIES)),
+            ])
+
+
+def load_registry(path: Path) -> ChargingPointRegistry:
+    registry = ChargingPointRegistry(path)
+    registry.load()
+    return registry
+
+
+def load_dataclasses(path: Path) -> dict:
+    """The old layout: one ChargingPointMetadata (and amenity list) per CP."""
+    with path.open(newline="") as f:
+        return {
+            row["cp_id"]: ChargingPointMetadata(
+                cp_id=row["cp_id"], name=row["name"], address=row["address"], city=row["city"],
+                latitude=float(row["latitude"]), longitude=float(row["longitude"]),
+                connector_type=row["connector_type"], power_kw=float(row["power_kw"]),
+                amenities=[a for a in row["amenities"].split(";") if a],
+            )
+            for row in csv.DictReader(f)
+        }
+
+
+def traced_mb(build) -> float:
+    """Memory still allocated after build() returns, in MB."""
+    tracemalloc.start()
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0] / 2**20
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def per_call_us(fn, args_list) -> float:
+    start = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return (time.perf_counter() - start) / len(args_list) * 1e6
+
+
+def main():
+    logger.remove()
+    rng = random.Random(1)
+    path = Path(tempfile.mkdtemp()) / "charging_points.csv"
+    write_registry(path, rng)
+
+    start = time.perf_counter()
+    registry = ChargingPointRegistry(path)
+    created_us = (time.perf_counter() - start) * 1e6
+
+    start = time.perf_counter()
+    registry.load()
+    load_ms = (time.perf_counter() - start) * 1e3
+
+    columnar_mb = traced_mb(lambda: load_registry(path))
+    objects = {}
+    dataclass_mb = traced_mb(lambda: objects.update(load_dataclasses(path)))
+    geo_mb = traced_mb(lambda: GeoIndex((m.cp_id, m.latitude, m.longitude) for m in objects.values()))
+
+    ids = [(f"CP-{rng.randrange(CP_COUNT):06d}",) for _ in range(LOOKUPS)]
+    get_us = per_call_us(registry.get, ids)
+
+    queries = [(rng.choice(CITIES), rng.choice(CONNECTORS), 50.0) for _ in range(200)]
+    find_us = per_call_us(registry.find, queries)
+
+    values = list(objects.values())
+
+    def linear(city, connector, min_kw):
+        return [m.cp_id for m in values
+                if m.city == city and m.connector_type == connector and m.power_kw >= min_kw]
+
+    linear_us = per_call_us(linear, queries[:20])
+
+    print(f"{CP_COUNT:,} charging points ({path.stat().st_size / 2**20:.1f} MB CSV)")
+    print(f"  registry created (nothing read):  {created_us:8.1f} µs")
+    print(f"  load() incl. geo index:           {load_ms:8.1f} ms")
+    print(f"  columnar store + geo index:       {columnar_mb:8.1f} MB")
+    print(f"    of which geo index:             {geo_mb:8.1f} MB")
+    print(f"  one dataclass per CP:             {dataclass_mb:8.1f} MB")
+    print(f"  get(cp_id):                       {get_us:8.2f} µs")
+    print(f"  find(city, connector, min kW):    {find_us:8.1f} µs")
+    print(f"  linear scan, same filters:        {linear_us:8.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
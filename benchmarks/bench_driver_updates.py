@@ -0,0 +1,126 @@
+"""
+Benchmark: driver.updates traffic and fan-out cost as the driver count grows.
+
+The first table compares the bytes the broker ships to consumers for three
+delivery modes: one consumer group per driver over the whole topic (every
+driver reads every update, D² messages), keyed partition assignment (each
+driver reads only the partition its driver ID hashes to) and one fleet host
+consuming its drivers' partitions once. Update traffic is modelled as a
+fixed number of sessions per driver, serialized exactly as Central sends it.
+
+The second table times in-process delivery of one update to the right
+handler among D hosted drivers: offering it to every handler to filter, as
+separate per-driver consumers effectively do, versus the fleet host's dict
+lookup by driver_id.
+
+Run from the repository root:
+    python -m benchmarks.bench_driver_updates
+"""
+
+import time
+from collections import Counter
+
+from evcharging.common.kafka import partition_for_key, serialize_value
+from evcharging.common.messages import DriverUpdate, MessageStatus
+
+DRIVER_COUNTS = (10, 100, 1000)
+PARTITIONS = 16
+SESSIONS_PER_DRIVER = 10
+SESSION_STATUSES = (MessageStatus.ACCEPTED, MessageStatus.COMPLETED)
+ROUTED = 20000
+
+
+def session_bytes(driver_id: str) -> int:
+    """Serialized size of the updates one session sends its driver."""
+    return sum(
+        len(serialize_value(DriverUpdate(
+            request_id="req-1a2b3c4d", driver_id=driver_id, cp_id="CP-001",
+            status=status, reason="Charging at CP-001"
+        )))
+        for status in SESSION_STATUSES
+    )
+
+
+def fmt_bytes(n: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024:
+            return f"{n:,.1f} {unit}"
+        n /= 1024
+    return f"{n:,.1f} TB"
+
+
+class FilteringHandler:
+    """Stands in for a driver that sees every update and keeps its own."""
+
+    def __init__(self, driver_id: str):
+        self.driver_id = driver_id
+        self.received = 0
+
+    def offer(self, update: DriverUpdate):
+        if update.driver_id == self.driver_id:
+            self.received += 1
+
+
+def time_routing(driver_count: int) -> tuple[float, float]:
+    """Microseconds per update for broadcast-and-filter and dict lookup."""
+    driver_ids = [f"driver-{i:04d}" for i in range(driver_count)]
+    handlers = [FilteringHandler(driver_id) for driver_id in driver_ids]
+    by_id = {handler.driver_id: handler for handler in handlers}
+    updates = [
+        DriverUpdate(request_id="req-1", driver_id=driver_id, cp_id="CP-001", status=MessageStatus.ACCEPTED)
+        for driver_id in driver_ids[::max(1, driver_count // 97)]
+    ]
+
+    def run(route) -> float:
+        calls = 0
+        start = time.perf_counter()
+        while calls < ROUTED:
+            for update in updates:
+                route(update)
+            calls += len(updates)
+        return (time.perf_counter() - start) / calls * 1e6
+
+    def broadcast(update: DriverUpdate):
+        for handler in handlers:
+            handler.offer(update)
+
+    def lookup(update: DriverUpdate):
+        handler = by_id.get(update.driver_id)
+        if handler is not None:
+            handler.offer(update)
+
+    return run(broadcast), run(lookup)
+
+
+def main():
+    print(f"driver.updates bytes delivered ({SESSIONS_PER_DRIVER} sessions per driver, {PARTITIONS} partitions):")
+    print(
+        f"{'drivers':>8}{'topic':>12}{'per-driver groups':>19}"
+        f"{'keyed drivers':>15}{'fleet host':>12}{'keyed vs groups':>17}"
+    )
+    for driver_count in DRIVER_COUNTS:
+        driver_ids = [f"driver-{i:04d}" for i in range(driver_count)]
+        per_driver = {d: session_bytes(d) * SESSIONS_PER_DRIVER for d in driver_ids}
+        topic_bytes = sum(per_driver.values())
+
+        partition_bytes = Counter()
+        for driver_id, size in per_driver.items():
+            partition_bytes[partition_for_key(driver_id, PARTITIONS)] += size
+        keyed = sum(partition_bytes[partition_for_key(d, PARTITIONS)] for d in driver_ids)
+
+        groups = topic_bytes * driver_count
+        print(
+            f"{driver_count:>8}{fmt_bytes(topic_bytes):>12}{fmt_bytes(groups):>19}"
+            f"{fmt_bytes(keyed):>15}{fmt_bytes(topic_bytes):>12}{groups / keyed:>16.1f}x"
+        )
+
+    print()
+    print("In-process fan-out of one update:")
+    print(f"{'drivers':>8}{'broadcast µs':>14}{'lookup µs':>12}{'speedup':>10}")
+    for driver_count in DRIVER_COUNTS:
+        broadcast, lookup = time_routing(driver_count)
+        print(f"{driver_count:>8}{broadcast:>14.2f}{lookup:>12.3f}{broadcast / lookup:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark: TCP frame parsing throughput.
+
+Compares the previous MessageFramer (immutable bytes buffer, re-sliced and
+re-scanned from the start on every read) with FrameParser (bytearray with a
+read cursor and resumable ETX search). Frames of 1 KB and 64 KB are fed in
+4 KB reads and in 256 KB bursts.
+
+Both parsers verify the LRC with the same function, which dominates the
+end-to-end figure; the "buffering" column stubs it out to isolate the cost
+of buffer management and scanning.
+
+The previous framer truncated its buffer to 1000 bytes past 10 KB, so it
+could never deliver a 64 KB frame; the legacy path below has that cap
+removed so the two can be compared on the same input.
+
+Run from the repository root:
+    python -m benchmarks.bench_framing
+"""
+
+import time
+
+from evcharging.common import framing
+from evcharging.common.framing import FrameParser, frame_message, parse_framed_message
+
+READ_SIZES = (4096, 256 * 1024)
+STREAM_BYTES = 8 * 1024 * 1024
+REPEAT = 3
+
+
+class LegacyFramer:
+    """Previous MessageFramer without the 10 KB truncation."""
+
+    def __init__(self):
+        self.buffer = b''
+
+    def add_data(self, data: bytes):
+        self.buffer += data
+
+    def get_all_messages(self) -> list[str]:
+        messages = []
+        while True:
+            message, self.buffer = parse_framed_message(self.buffer)
+            if message is None:
+                return messages
+            messages.append(message)
+
+
+def legacy(reads) -> int:
+    framer = LegacyFramer()
+    count = 0
+    for chunk in reads:
+        framer.add_data(chunk)
+        count += len(framer.get_all_messages())
+    return count
+
+
+def streaming(reads) -> int:
+    parser = FrameParser(max_frame_size=128 * 1024)
+    count = 0
+    for chunk in reads:
+        parser.feed(chunk)
+        for _ in parser.messages():
+            count += 1
+    return count
+
+
+def best_rate(parse, reads, stream_size: int, num_frames: int) -> float:
+    """Return the best of REPEAT runs in MB/s."""
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        assert parse(reads) == num_frames
+        best = min(best, time.perf_counter() - start)
+    return stream_size / best / 1e6
+
+
+def main():
+    real_lrc = framing.calculate_lrc
+    print(f"{'frame':>7}{'read':>8}{'parser':>11}{'MB/s':>9}{'buffering MB/s':>16}{'speedup':>9}")
+    for frame_size in (1024, 64 * 1024):
+        frame = frame_message("x" * frame_size)
+        num_frames = STREAM_BYTES // len(frame)
+        stream = frame * num_frames
+        for read_size in READ_SIZES:
+            reads = [stream[i:i + read_size] for i in range(0, len(stream), read_size)]
+            rates = {}
+            for name, parse in (("legacy", legacy), ("streaming", streaming)):
+                framing.calculate_lrc = real_lrc
+                full = best_rate(parse, reads, len(stream), num_frames)
+                # Every frame is identical, so a constant LRC is still correct
+                framing.calculate_lrc = lambda data, lrc=frame[-1]: lrc
+                rates[name] = best_rate(parse, reads, len(stream), num_frames)
+                print(
+                    f"{frame_size // 1024:>5}KB{read_size // 1024:>6}KB{name:>11}{full:>9.1f}"
+                    f"{rates[name]:>16.1f}{rates[name] / rates['legacy']:>8.1f}x"
+                )
+    framing.calculate_lrc = real_lrc
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: nearest-charger queries with GeoIndex versus a linear scan.
+
+Builds indexes over up to 100k synthetic charging points spread over a
+country-sized area, with half of them clustered around a few cities. It
+times k-nearest (k=10) and 5 km radius queries from random locations
+against computing the haversine distance to every point and sorting.
+Radius queries in the city clusters return hundreds of points, so their
+cost follows the number of results, shown as "hits". "far k-NN" queries
+start from points around the globe far outside that area, where the scan
+has to cross thousands of empty cells to reach any point.
+
+Run from the repository root:
+    python -m benchmarks.bench_geo_index
+"""
+
+import random
+import time
+
+from evcharging.common.geo import GeoIndex, haversine_km
+
+POINT_COUNTS = (1000, 10000, 100000)
+QUERIES = 500
+LINEAR_QUERIES = 20
+K = 10
+RADIUS_KM = 5.0
+LAT_RANGE = (36.0, 44.0)
+LON_RANGE = (-9.0, 3.0)
+FAR_ORIGINS = [(0.0, -160.0), (-33.9, 151.2), (64.1, -21.9), (-54.8, -68.3), (35.7, 139.7), (45.0, 10.0)]
+CITIES = [(40.42, -3.70), (41.39, 2.17), (39.47, -0.38), (37.39, -5.98), (43.26, -2.93)]
+
+
+def make_points(n: int, rng: random.Random) -> list[tuple[str, float, float]]:
+    points = []
+    for i in range(n):
+        if i % 2:
+            lat, lon = rng.choice(CITIES)
+            lat, lon = rng.gauss(lat, 0.15), rng.gauss(lon, 0.15)
+        else:
+            lat, lon = rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)
+        points.append((f"CP-{i:06d}", lat, lon))
+    return points
+
+
+def linear_nearest(points, lat: float, lon: float, k: int):
+    return sorted((haversine_km(lat, lon, p_lat, p_lon), key) for key, p_lat, p_lon in points)[:k]
+
+
+def time_queries(query, origins) -> float:
+    """Mean microseconds per query."""
+    start = time.perf_counter()
+    for lat, lon in origins:
+        query(lat, lon)
+    return (time.perf_counter() - start) / len(origins) * 1e6
+
+
+def main():
+    rng = random.Random(42)
+    origins = [
+        (rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)) if i % 2 else rng.choice(CITIES)
+        for i in range(QUERIES)
+    ]
+
+    print(
+        f"{'points':>8}{'build ms':>10}{'cells':>8}{'linear µs':>12}{'k-NN µs':>10}"
+        f"{'k-NN speedup':>14}{'far k-NN µs':>13}{'radius µs':>11}{'hits':>7}"
+    )
+    for n in POINT_COUNTS:
+        points = make_points(n, rng)
+        start = time.perf_counter()
+        index = GeoIndex(points)
+        build_ms = (time.perf_counter() - start) * 1e3
+
+        linear = time_queries(lambda lat, lon: linear_nearest(points, lat, lon, K), origins[:LINEAR_QUERIES])
+        knn = time_queries(lambda lat, lon: index.nearest(lat, lon, k=K), origins)
+        far = time_queries(lambda lat, lon: index.nearest(lat, lon, k=K), FAR_ORIGINS)
+        radius = time_queries(lambda lat, lon: index.nearest(lat, lon, radius_km=RADIUS_KM), origins)
+        hits = sum(len(index.nearest(lat, lon, radius_km=RADIUS_KM)) for lat, lon in origins) / len(origins)
+        print(
+            f"{n:>8}{build_ms:>10.1f}{index.stats()['cells']:>8}{linear:>12.0f}{knn:>10.1f}"
+            f"{linear / knn:>13.0f}x{far:>13.1f}{radius:>11.1f}{hits:>7.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
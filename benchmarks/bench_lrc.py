@@ -0,0 +1,93 @@
+"""
+Benchmark: LRC and batch framing throughput.
+
+Compares the previous byte-loop LRC with calculate_lrc (big-int XOR
+folding, or NumPy when installed) across payload sizes, then framing and
+sending a batch of control-plane messages over a local socket one frame
+(and one send) at a time versus frame_messages() and a single send.
+
+Run from the repository root:
+    python -m benchmarks.bench_lrc
+"""
+
+import os
+import socket
+import threading
+import time
+
+from evcharging.common import framing
+from evcharging.common.framing import calculate_lrc, frame_message, frame_messages
+
+TARGET_BYTES = 32 * 1024 * 1024
+BATCH = 1000
+
+
+def loop_lrc(data: bytes) -> int:
+    lrc = 0
+    for byte in data:
+        lrc ^= byte
+    return lrc
+
+
+def mb_per_second(fn, arg, size: int) -> float:
+    """Return throughput over roughly TARGET_BYTES (at least 10 calls)."""
+    calls = max(10, TARGET_BYTES // max(size, 1) // 8)
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn(arg)
+    return size * calls / (time.perf_counter() - start) / 1e6
+
+
+def main():
+    print(f"NumPy: {'yes' if framing.np is not None else 'not installed'}")
+    print(f"{'payload':>9}{'loop MB/s':>12}{'fast MB/s':>12}{'speedup':>9}")
+    for size in (64, 256, 1024, 4096, 64 * 1024, 1024 * 1024):
+        data = os.urandom(size)
+        assert calculate_lrc(data) == loop_lrc(data)
+        slow = mb_per_second(loop_lrc, data, size)
+        fast = mb_per_second(calculate_lrc, data, size)
+        print(f"{size:>9,}{slow:>12.1f}{fast:>12.1f}{fast / slow:>8.1f}x")
+
+    print()
+    print(f"{'message':>9}{'per-frame MB/s':>16}{'batch MB/s':>12}{'speedup':>9}")
+    for size in (64, 1024, 16 * 1024):
+        messages = ["x" * size] * BATCH
+        framed_size = len(frame_messages(messages))
+        single = send_rate(send_each, messages, framed_size)
+        batch = send_rate(send_batch, messages, framed_size)
+        print(f"{size:>9,}{single:>16.1f}{batch:>12.1f}{batch / single:>8.1f}x")
+
+
+def send_each(sock: socket.socket, messages: list[str]):
+    for message in messages:
+        sock.sendall(frame_message(message))
+
+
+def send_batch(sock: socket.socket, messages: list[str]):
+    sock.sendall(frame_messages(messages))
+
+
+def send_rate(send, messages: list[str], framed_size: int, rounds: int = 20) -> float:
+    """Frame and send ``rounds`` batches through a socketpair; return MB/s."""
+    sender, receiver = socket.socketpair()
+    expected = framed_size * rounds
+
+    def drain():
+        received = 0
+        while received < expected:
+            received += len(receiver.recv(1 << 20))
+
+    reader = threading.Thread(target=drain)
+    reader.start()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        send(sender, messages)
+    reader.join()
+    elapsed = time.perf_counter() - start
+    sender.close()
+    receiver.close()
+    return expected / elapsed / 1e6
+
+
+if __name__ == "__main__":
+    main()
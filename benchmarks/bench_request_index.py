@@ -0,0 +1,128 @@
+"""
+Benchmark: per-message cost of request lookups in EV Central.
+
+Telemetry ticks and session ends both need the active request for
+(cp_id, driver_id). The previous controller scanned every active request
+for it; ActiveRequestIndex answers from a dict. The first table times the
+lookup alone; the second times EVCentralController.handle_cp_telemetry end
+to end (in-memory producer, write-behind DB) to show the per-message cost
+staying flat as concurrent sessions grow to 10k.
+
+Run from the repository root:
+    python -m benchmarks.bench_request_index
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+
+from loguru import logger
+
+from evcharging.apps.ev_central.main import ChargingPoint, EVCentralController
+from evcharging.apps.ev_central.request_index import ActiveRequestIndex
+from evcharging.common.config import CentralConfig
+from evcharging.common.messages import CPTelemetry, DriverRequest
+from evcharging.common.states import CPState
+
+SESSION_COUNTS = (100, 1000, 10000)
+LOOKUPS = 20000
+
+
+class NullProducer:
+    def send_nowait(self, topic, message, key=None):
+        pass
+
+    async def send(self, topic, message, key=None):
+        pass
+
+
+def make_requests(n: int) -> list[DriverRequest]:
+    return [
+        DriverRequest(request_id=f"req-{i}", driver_id=f"driver-{i}", cp_id=f"CP-{i:05d}")
+        for i in range(n)
+    ]
+
+
+def legacy_scan(active: dict, cp_id: str, driver_id: str):
+    for req in active.values():
+        if req.cp_id == cp_id and req.driver_id == driver_id:
+            return req
+    return None
+
+
+def time_lookups(lookup, requests: list[DriverRequest]) -> float:
+    """Mean microseconds per lookup, over CPs spread across the table."""
+    step = max(1, len(requests) // 97)
+    targets = [(r.cp_id, r.driver_id) for r in requests[::step]]
+    calls = 0
+    start = time.perf_counter()
+    while calls < LOOKUPS:
+        for cp_id, driver_id in targets:
+            lookup(cp_id, driver_id)
+        calls += len(targets)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def time_telemetry(n: int) -> float:
+    """Mean microseconds per handle_cp_telemetry call with n active sessions."""
+    controller = EVCentralController(CentralConfig())
+    controller.producer = NullProducer()
+    requests = make_requests(n)
+    for req in requests:
+        cp = ChargingPoint(req.cp_id)
+        cp.state = CPState.SUPPLYING
+        cp.current_driver = req.driver_id
+        cp.current_session = f"session-{req.request_id}"
+        controller.charging_points[req.cp_id] = cp
+        controller.active_requests.add(req)
+
+    step = max(1, n // 97)
+    ticks = [
+        CPTelemetry(
+            cp_id=req.cp_id, kw=22.0, kwh=1.0, euros=0.3,
+            driver_id=req.driver_id, session_id=f"session-{req.request_id}"
+        )
+        for req in requests[::step]
+    ]
+
+    async def run() -> float:
+        calls = 0
+        start = time.perf_counter()
+        while calls < LOOKUPS:
+            for tick in ticks:
+                await controller.handle_cp_telemetry(tick)
+            calls += len(ticks)
+        return (time.perf_counter() - start) / calls * 1e6
+
+    try:
+        return asyncio.run(run())
+    finally:
+        controller.db.close()
+
+
+def main():
+    logger.remove()
+    os.chdir(tempfile.mkdtemp())
+
+    print("Lookup of the active request for (cp_id, driver_id):")
+    print(f"{'sessions':>10}{'scan µs':>12}{'index µs':>12}{'speedup':>10}")
+    for n in SESSION_COUNTS:
+        requests = make_requests(n)
+        active = {r.request_id: r for r in requests}
+        index = ActiveRequestIndex()
+        for r in requests:
+            index.add(r)
+        scan = time_lookups(lambda cp, drv: legacy_scan(active, cp, drv), requests)
+        indexed = time_lookups(index.for_cp, requests)
+        print(f"{n:>10}{scan:>12.2f}{indexed:>12.3f}{scan / indexed:>9.0f}x")
+
+    print()
+    print("handle_cp_telemetry with the index:")
+    print(f"{'sessions':>10}{'µs/msg':>10}")
+    for n in SESSION_COUNTS:
+        print(f"{n:>10}{time_telemetry(n):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
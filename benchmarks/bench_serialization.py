@@ -0,0 +1,81 @@
+"""
+Micro-benchmark: Kafka message serialization paths.
+
+Compares the previous send/receive path (model -> JSON str -> dict -> JSON
+bytes, then bytes -> dict -> model) with the single-pass path used by
+KafkaProducerHelper/KafkaConsumerHelper (model -> JSON bytes, bytes -> model).
+
+Run from the repository root:
+    python -m benchmarks.bench_serialization
+"""
+
+import json
+import time
+
+from evcharging.common.kafka import serialize_value
+from evcharging.common.messages import CPStatus, CPTelemetry, DriverRequest
+
+TARGET_RATE = 10_000  # messages per second
+ITERATIONS = 50_000
+
+
+def legacy_encode(message) -> bytes:
+    value = json.loads(message.model_dump_json())
+    return json.dumps(value).encode("utf-8")
+
+
+def legacy_decode(model, raw: bytes):
+    return model(**json.loads(raw.decode("utf-8")))
+
+
+def direct_encode(message) -> bytes:
+    return serialize_value(message)
+
+
+def direct_decode(model, raw: bytes):
+    return model.model_validate_json(raw)
+
+
+def time_per_call(fn, *args) -> float:
+    """Return mean CPU seconds per call."""
+    start = time.process_time()
+    for _ in range(ITERATIONS):
+        fn(*args)
+    return (time.process_time() - start) / ITERATIONS
+
+
+def main():
+    samples = [
+        DriverRequest(request_id="req-0001", driver_id="driver-alice", cp_id="CP-001"),
+        CPStatus(cp_id="CP-001", state="SUPPLYING", reason="Starting supply for driver driver-alice"),
+        CPTelemetry(
+            cp_id="CP-001", kw=22.0, kwh=1.2345, euros=0.37035,
+            driver_id="driver-alice", session_id="session-1a2b3c4d"
+        ),
+    ]
+
+    print(f"{'message':<14}{'path':<9}{'encode us':>11}{'decode us':>11}{'total us':>10}{'CPU @10k/s':>12}")
+    for message in samples:
+        model = type(message)
+        raw = direct_encode(message)
+        results = {}
+        for name, encode, decode in (
+            ("legacy", legacy_encode, legacy_decode),
+            ("direct", direct_encode, direct_decode),
+        ):
+            enc = time_per_call(encode, message)
+            dec = time_per_call(decode, model, raw)
+            results[name] = enc + dec
+            print(
+                f"{model.__name__:<14}{name:<9}{enc * 1e6:>11.2f}{dec * 1e6:>11.2f}"
+                f"{(enc + dec) * 1e6:>10.2f}{(enc + dec) * TARGET_RATE:>11.1%}"
+            )
+        saved = results["legacy"] - results["direct"]
+        print(
+            f"{'':<14}{'saving':<9}{'':>11}{'':>11}{saved * 1e6:>10.2f}"
+            f"{saved * TARGET_RATE:>11.1%}  ({saved / results['legacy']:.0%} less CPU per message)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,16 +4,20 @@ Provides real-time view of charging points and telemetry.
 """
 
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from typing import TYPE_CHECKING
 from loguru import logger
 
-from evcharging.common.messages import CPRegistration
+from evcharging.common.messages import CPRegistration, MonitorHeartbeat
+from evcharging.common.snapshot import event_stream
 
 if TYPE_CHECKING:
     from evcharging.apps.ev_central.main import EVCentralController
 
+# Comment line sent on idle /events streams so proxies keep them open (seconds)
+SSE_KEEPALIVE_INTERVAL = 15.0
+
 
 def create_dashboard_app(controller: "EVCentralController") -> FastAPI:
     """Create FastAPI application for dashboard."""
@@ -25,6 +29,11 @@ def create_dashboard_app(controller: "EVCentralController") -> FastAPI:
         """Health check endpoint."""
         return {"status": "healthy", "service": "ev-central"}
     
+    @app.get("/metrics")
+    async def metrics():
+        """Internal pipeline metrics (queues, backpressure, throughput)."""
+        return controller.get_metrics()
+    
     @app.post("/cp/register")
     async def register_cp(registration: CPRegistration):
         """Register or update a charging point."""
@@ -65,14 +74,39 @@ def create_dashboard_app(controller: "EVCentralController") -> FastAPI:
         controller.record_monitor_ping(cp_id)
         return {"success": True, "cp_id": cp_id}
     
+    @app.post("/cp/heartbeat/batch")
+    async def monitor_heartbeat_batch(heartbeats: list[MonitorHeartbeat]):
+        """Receive heartbeats for many CPs from a CP Monitor fleet host."""
+        recorded = controller.record_monitor_pings(heartbeats)
+        return {"success": True, "recorded": recorded}
+    
     @app.get("/cp")
-    async def list_charging_points():
-        """List all charging points and their current state."""
-        data = controller.get_dashboard_data()
-        return {
-            "charging_points": data["charging_points"],
-            "active_requests": data["active_requests"]
-        }
+    async def list_charging_points(request: Request):
+        """List all charging points and their current state.
+        
+        Served from the controller's pre-serialized snapshot. The ETag is the
+        snapshot version, so pollers sending If-None-Match get a 304 until a
+        charging point changes.
+        """
+        snapshot = controller.snapshot
+        body = snapshot.body()
+        etag = snapshot.etag
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        # no-cache: browsers may store the body but must revalidate each poll
+        return Response(
+            body, media_type="application/json", headers={"ETag": etag, "Cache-Control": "no-cache"}
+        )
+    
+    @app.get("/cp/changes")
+    async def charging_point_changes(since: int, epoch: str | None = None):
+        """CPs whose state, driver, telemetry or monitor status changed after ``since``.
+        
+        ``since`` is the ``version`` of the previous GET /cp or /cp/changes
+        response. If the change log no longer covers it, the response has
+        ``"resync": true`` and the client should reload GET /cp.
+        """
+        return controller.snapshot.changes_since(since, epoch)
     
     @app.get("/cp/{cp_id}")
     async def get_charging_point(cp_id: str):
@@ -116,345 +150,298 @@ def create_dashboard_app(controller: "EVCentralController") -> FastAPI:
                 })
         return {"telemetry": telemetry_list}
     
-    @app.get("/", response_class=HTMLResponse)
-    async def dashboard_home(request: Request):
-        """Main dashboard HTML page."""
-        data = controller.get_dashboard_data()
+    @app.get("/events")
+    async def events():
+        """Server-Sent Events stream of charging point changes.
         
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>EV Central Dashboard</title>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <style>
-                body {{
-                    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                    margin: 0;
-                    padding: 20px;
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    color: #333;
-                }}
-                .container {{
-                    max-width: 1200px;
-                    margin: 0 auto;
-                    background: white;
-                    border-radius: 12px;
-                    padding: 30px;
-                    box-shadow: 0 10px 40px rgba(0,0,0,0.2);
-                }}
-                h1 {{
-                    color: #667eea;
-                    margin-top: 0;
-                    border-bottom: 3px solid #667eea;
-                    padding-bottom: 15px;
-                }}
-                .stats {{
-                    display: flex;
-                    gap: 20px;
-                    margin: 20px 0;
-                }}
-                .stat-card {{
-                    flex: 1;
-                    background: #f8f9fa;
-                    padding: 20px;
-                    border-radius: 8px;
-                    border-left: 4px solid #667eea;
-                }}
-                .stat-value {{
-                    font-size: 2em;
-                    font-weight: bold;
-                    color: #667eea;
-                }}
-                .stat-label {{
-                    color: #666;
-                    margin-top: 5px;
-                }}
-                .cp-grid {{
-                    display: grid;
-                    grid-template-columns: repeat(auto-fill, minmax(300px, 1fr));
-                    gap: 20px;
-                    margin-top: 30px;
-                }}
-                .cp-card {{
-                    background: #fff;
-                    border: 2px solid #e0e0e0;
-                    border-radius: 8px;
-                    padding: 20px;
-                    transition: all 0.3s;
-                }}
-                .cp-card:hover {{
-                    border-color: #667eea;
-                    box-shadow: 0 5px 15px rgba(102,126,234,0.3);
-                    transform: translateY(-2px);
-                }}
-                .cp-header {{
-                    display: flex;
-                    justify-content: space-between;
-                    align-items: center;
-                    margin-bottom: 15px;
-                }}
-                .cp-id {{
-                    font-size: 1.2em;
-                    font-weight: bold;
-                    color: #333;
-                }}
-                .state-badge {{
-                    padding: 5px 12px;
-                    border-radius: 20px;
-                    font-size: 0.85em;
-                    font-weight: bold;
-                    text-transform: uppercase;
-                }}
-                .state-ACTIVATED {{ background: #4caf50; color: white; }}
-                .state-SUPPLYING {{ background: #2196f3; color: white; animation: pulse 2s infinite; }}
-                .state-STOPPED {{ background: #ff9800; color: white; }}
-                .state-FAULT {{ background: #f44336; color: white; }}
-                .state-DISCONNECTED {{ background: #9e9e9e; color: white; }}
-                .state-ON {{ background: #4caf50; color: white; }}
-                .state-BROKEN {{ background: #f44336; color: white; }}
-                @keyframes pulse {{
-                    0%, 100% {{ opacity: 1; }}
-                    50% {{ opacity: 0.7; }}
-                }}
-                .telemetry {{
-                    background: #f0f4ff;
-                    padding: 12px;
-                    border-radius: 6px;
-                    margin-top: 10px;
-                }}
-                .telemetry-row {{
-                    display: flex;
-                    justify-content: space-between;
-                    margin: 5px 0;
-                }}
-                .telemetry-label {{
-                    color: #666;
-                    font-weight: 500;
-                }}
-                .telemetry-value {{
-                    color: #222;
-                    font-weight: bold;
-                }}
-                .driver-info {{
-                    color: #667eea;
-                    font-style: italic;
-                    margin-top: 10px;
-                }}
-                .refresh-btn {{
-                    background: #667eea;
-                    color: white;
-                    border: none;
-                    padding: 10px 20px;
-                    border-radius: 6px;
-                    cursor: pointer;
-                    font-size: 1em;
-                    margin-top: 20px;
-                }}
-                .refresh-btn:hover {{
-                    background: #5568d3;
-                }}
-            </style>
-            <script>
-                // Fetch and update data without page reload
-                function formatTime(ts) {{
-                    if (!ts) return 'Unknown';
-                    const date = new Date(ts);
-                    return date.toLocaleTimeString();
-                }}
-
-                async function updateDashboard() {{
-                    try {{
-                        const response = await fetch('/cp');
-                        const data = await response.json();
-                        
-                        // Update stats
-                        document.getElementById('total-cps').textContent = data.charging_points.length;
-                        document.getElementById('active-requests').textContent = data.active_requests;
-                        document.getElementById('currently-charging').textContent = 
-                            data.charging_points.filter(cp => cp.engine_state === 'SUPPLYING').length;
-                        
-                        // Update CP cards
-                        const cpGrid = document.getElementById('cp-grid');
-                        cpGrid.innerHTML = '';
-                        
-                        data.charging_points.forEach(cp => {{
-                            const card = document.createElement('div');
-                            card.className = 'cp-card';
-                            
-                            let telemetryRows = '';
-                            if (cp.telemetry) {{
-                                telemetryRows = `
-                                    <div class="telemetry-row">
-                                        <span class="telemetry-label">Power:</span>
-                                        <span class="telemetry-value">${{cp.telemetry.kw.toFixed(2)}} kW</span>
-                                    </div>
-                                    <div class="telemetry-row">
-                                        <span class="telemetry-label">Energy:</span>
-                                        <span class="telemetry-value">${{cp.telemetry.kwh.toFixed(3)}} kWh</span>
-                                    </div>
-                                    <div class="telemetry-row">
-                                        <span class="telemetry-label">Cost:</span>
-                                        <span class="telemetry-value">€${{cp.telemetry.euros.toFixed(4)}}</span>
-                                    </div>
-                                    <div class="telemetry-row">
-                                        <span class="telemetry-label">Session:</span>
-                                        <span class="telemetry-value">${{cp.telemetry.session_id || 'N/A'}}</span>
-                                    </div>
-                                `;
-                            }} else {{
-                                telemetryRows = `
-                                    <div class="telemetry-row">
-                                        <span class="telemetry-label">Power:</span>
-                                        <span class="telemetry-value">N/A</span>
-                                    </div>
-                                `;
-                            }}
+        Sends a ``snapshot`` event with the full GET /cp payload on connect
+        (and whenever the change log no longer covers the stream), then one
+        ``changes`` event per burst of changes, in the GET /cp/changes format.
+        """
+        stream = event_stream(
+            controller.snapshot,
+            coalesce=controller.config.events_coalesce_ms / 1000,
+            keepalive=SSE_KEEPALIVE_INTERVAL
+        )
+        return StreamingResponse(
+            stream,
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    @app.get("/", response_class=HTMLResponse)
+    async def dashboard_home():
+        """Main dashboard HTML page (static; live data arrives over /events)."""
+        return HTMLResponse(content=DASHBOARD_HTML)
+    
+    return app
 
-                            const statusHtml = `
-                                <div class="telemetry">
-                                    <div class="telemetry-row">
-                                        <span class="telemetry-label">Monitor:</span>
-                                        <span class="telemetry-value">${{cp.monitor_status}}</span>
-                                    </div>
-                                    <div class="telemetry-row">
-                                        <span class="telemetry-label">Engine:</span>
-                                        <span class="telemetry-value">${{cp.engine_state}}</span>
-                                    </div>
-                                    <div class="telemetry-row">
-                                        <span class="telemetry-label">Last Monitor Ping:</span>
-                                        <span class="telemetry-value">${{formatTime(cp.monitor_last_seen)}}</span>
-                                    </div>
-                                    ${{telemetryRows}}
-                                </div>
-                            `;
-                            
-                            const driverHtml = cp.current_driver ? 
-                                `<div class="driver-info">👤 Driver: ${{cp.current_driver}}</div>` : '';
-                            
-                            card.innerHTML = `
-                                <div class="cp-header">
-                                    <div class="cp-id">${{cp.cp_id}}</div>
-                                    <span class="state-badge state-${{cp.state}}">${{cp.state}}</span>
-                                </div>
-                                ${{driverHtml}}
-                                ${{statusHtml}}
-                            `;
-                            
-                            cpGrid.appendChild(card);
-                        }});
-                        
-                        // Update timestamp
-                        document.getElementById('last-update').textContent = new Date().toLocaleTimeString();
-                    }} catch (error) {{
-                        console.error('Error updating dashboard:', error);
-                    }}
-                }}
-                
-                function refresh() {{
-                    updateDashboard();
-                }}
-                
-                // Initial load
-                updateDashboard();
-                
-                // Auto-refresh every 1 second for real-time updates
-                setInterval(updateDashboard, 1000);
-            </script>
-        </head>
-        <body>
-            <div class="container">
-                <h1>⚡ EV Central Dashboard <span style="font-size: 0.5em; color: #999;">Last update: <span id="last-update">--:--:--</span></span></h1>
-                
-                <div class="stats">
-                    <div class="stat-card">
-                        <div class="stat-value" id="total-cps">{len(data['charging_points'])}</div>
-                        <div class="stat-label">Total Charging Points</div>
-                    </div>
-                    <div class="stat-card">
-                        <div class="stat-value" id="active-requests">{data['active_requests']}</div>
-                        <div class="stat-label">Active Requests</div>
-                    </div>
-                    <div class="stat-card">
-                        <div class="stat-value" id="currently-charging">{sum(1 for cp in data['charging_points'] if cp['engine_state'] == 'SUPPLYING')}</div>
-                        <div class="stat-label">Currently Charging</div>
-                    </div>
-                </div>
-                
-                <h2>Charging Points</h2>
-                <div class="cp-grid" id="cp-grid">
-            """
+# Served as-is: the page loads once and patches itself from the /events stream
+DASHBOARD_HTML = """<!DOCTYPE html>
+<html>
+<head>
+    <title>EV Central Dashboard</title>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <style>
+        body {
+            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+            margin: 0;
+            padding: 20px;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: #333;
+        }
+        .container {
+            max-width: 1200px;
+            margin: 0 auto;
+            background: white;
+            border-radius: 12px;
+            padding: 30px;
+            box-shadow: 0 10px 40px rgba(0,0,0,0.2);
+        }
+        h1 {
+            color: #667eea;
+            margin-top: 0;
+            border-bottom: 3px solid #667eea;
+            padding-bottom: 15px;
+        }
+        .stats {
+            display: flex;
+            gap: 20px;
+            margin: 20px 0;
+        }
+        .stat-card {
+            flex: 1;
+            background: #f8f9fa;
+            padding: 20px;
+            border-radius: 8px;
+            border-left: 4px solid #667eea;
+        }
+        .stat-value {
+            font-size: 2em;
+            font-weight: bold;
+            color: #667eea;
+        }
+        .stat-label {
+            color: #666;
+            margin-top: 5px;
+        }
+        .cp-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fill, minmax(300px, 1fr));
+            gap: 20px;
+            margin-top: 30px;
+        }
+        .cp-card {
+            background: #fff;
+            border: 2px solid #e0e0e0;
+            border-radius: 8px;
+            padding: 20px;
+            transition: all 0.3s;
+        }
+        .cp-card:hover {
+            border-color: #667eea;
+            box-shadow: 0 5px 15px rgba(102,126,234,0.3);
+            transform: translateY(-2px);
+        }
+        .cp-header {
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+            margin-bottom: 15px;
+        }
+        .cp-id {
+            font-size: 1.2em;
+            font-weight: bold;
+            color: #333;
+        }
+        .state-badge {
+            padding: 5px 12px;
+            border-radius: 20px;
+            font-size: 0.85em;
+            font-weight: bold;
+            text-transform: uppercase;
+        }
+        .state-ACTIVATED { background: #4caf50; color: white; }
+        .state-SUPPLYING { background: #2196f3; color: white; animation: pulse 2s infinite; }
+        .state-STOPPED { background: #ff9800; color: white; }
+        .state-FAULT { background: #f44336; color: white; }
+        .state-DISCONNECTED { background: #9e9e9e; color: white; }
+        .state-ON { background: #4caf50; color: white; }
+        .state-BROKEN { background: #f44336; color: white; }
+        @keyframes pulse {
+            0%, 100% { opacity: 1; }
+            50% { opacity: 0.7; }
+        }
+        .telemetry {
+            background: #f0f4ff;
+            padding: 12px;
+            border-radius: 6px;
+            margin-top: 10px;
+        }
+        .telemetry-row {
+            display: flex;
+            justify-content: space-between;
+            margin: 5px 0;
+        }
+        .telemetry-label {
+            color: #666;
+            font-weight: 500;
+        }
+        .telemetry-value {
+            color: #222;
+            font-weight: bold;
+        }
+        .driver-info {
+            color: #667eea;
+            font-style: italic;
+            margin-top: 10px;
+        }
+        .refresh-btn {
+            background: #667eea;
+            color: white;
+            border: none;
+            padding: 10px 20px;
+            border-radius: 6px;
+            cursor: pointer;
+            font-size: 1em;
+            margin-top: 20px;
+        }
+        .refresh-btn:hover {
+            background: #5568d3;
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>⚡ EV Central Dashboard <span style="font-size: 0.5em; color: #999;">Last update: <span id="last-update">--:--:--</span></span></h1>
+        
+        <div class="stats">
+            <div class="stat-card">
+                <div class="stat-value" id="total-cps">0</div>
+                <div class="stat-label">Total Charging Points</div>
+            </div>
+            <div class="stat-card">
+                <div class="stat-value" id="active-requests">0</div>
+                <div class="stat-label">Active Requests</div>
+            </div>
+            <div class="stat-card">
+                <div class="stat-value" id="currently-charging">0</div>
+                <div class="stat-label">Currently Charging</div>
+            </div>
+        </div>
+        
+        <h2>Charging Points</h2>
+        <div class="cp-grid" id="cp-grid"></div>
+        
+        <button class="refresh-btn" onclick="refresh()">🔄 Refresh Now</button>
+    </div>
+    <script>
+        const cards = new Map();
+        const charging = new Set();
+        
+        function formatTime(ts) {
+            if (!ts) return 'Unknown';
+            const date = new Date(ts);
+            return date.toLocaleTimeString();
+        }
         
-        for cp in data['charging_points']:
-            telemetry_rows = ""
-            if cp.get('telemetry'):
-                t = cp['telemetry']
-                telemetry_rows = f"""
+        function renderCard(cp) {
+            let telemetryRows;
+            if (cp.telemetry) {
+                telemetryRows = `
                     <div class="telemetry-row">
                         <span class="telemetry-label">Power:</span>
-                        <span class="telemetry-value">{t['kw']:.2f} kW</span>
+                        <span class="telemetry-value">${cp.telemetry.kw.toFixed(2)} kW</span>
                     </div>
                     <div class="telemetry-row">
                         <span class="telemetry-label">Energy:</span>
-                        <span class="telemetry-value">{t['kwh']:.3f} kWh</span>
+                        <span class="telemetry-value">${cp.telemetry.kwh.toFixed(3)} kWh</span>
                     </div>
                     <div class="telemetry-row">
                         <span class="telemetry-label">Cost:</span>
-                        <span class="telemetry-value">€{t['euros']:.2f}</span>
+                        <span class="telemetry-value">€${cp.telemetry.euros.toFixed(4)}</span>
                     </div>
                     <div class="telemetry-row">
                         <span class="telemetry-label">Session:</span>
-                        <span class="telemetry-value">{t.get('session_id', 'N/A')}</span>
+                        <span class="telemetry-value">${cp.telemetry.session_id || 'N/A'}</span>
                     </div>
-                """
-            else:
-                telemetry_rows = """
+                `;
+            } else {
+                telemetryRows = `
                     <div class="telemetry-row">
                         <span class="telemetry-label">Power:</span>
                         <span class="telemetry-value">N/A</span>
                     </div>
-                """
-
-            status_html = f"""
+                `;
+            }
+            const driverHtml = cp.current_driver ?
+                `<div class="driver-info">👤 Driver: ${cp.current_driver}</div>` : '';
+            return `
+                <div class="cp-header">
+                    <div class="cp-id">${cp.cp_id}</div>
+                    <span class="state-badge state-${cp.state}">${cp.state}</span>
+                </div>
+                ${driverHtml}
                 <div class="telemetry">
                     <div class="telemetry-row">
                         <span class="telemetry-label">Monitor:</span>
-                        <span class="telemetry-value">{cp['monitor_status']}</span>
+                        <span class="telemetry-value">${cp.monitor_status}</span>
                     </div>
                     <div class="telemetry-row">
                         <span class="telemetry-label">Engine:</span>
-                        <span class="telemetry-value">{cp['engine_state']}</span>
+                        <span class="telemetry-value">${cp.engine_state}</span>
                     </div>
                     <div class="telemetry-row">
                         <span class="telemetry-label">Last Monitor Ping:</span>
-                        <span class="telemetry-value">{cp.get('monitor_last_seen', 'Unknown')}</span>
+                        <span class="telemetry-value">${formatTime(cp.monitor_last_seen)}</span>
                     </div>
-                    {telemetry_rows}
+                    ${telemetryRows}
                 </div>
-            """
-            driver_html = f'<div class="driver-info">👤 Driver: {cp["current_driver"]}</div>' if cp.get('current_driver') else ''
-            
-            html_content += f"""
-                    <div class="cp-card">
-                        <div class="cp-header">
-                            <div class="cp-id">{cp['cp_id']}</div>
-                            <span class="state-badge state-{cp['state']}">{cp['state']}</span>
-                        </div>
-                        {driver_html}
-                        {status_html}
-                    </div>
-            """
+            `;
+        }
         
-        html_content += """
-                </div>
-                
-                <button class="refresh-btn" onclick="refresh()">🔄 Refresh Now</button>
-            </div>
-        </body>
-        </html>
-        """
+        // Patch (or add) one card and the counters it affects
+        function applyCp(cp) {
+            let card = cards.get(cp.cp_id);
+            if (!card) {
+                card = document.createElement('div');
+                card.className = 'cp-card';
+                document.getElementById('cp-grid').appendChild(card);
+                cards.set(cp.cp_id, card);
+            }
+            card.innerHTML = renderCard(cp);
+            if (cp.engine_state === 'SUPPLYING') charging.add(cp.cp_id); else charging.delete(cp.cp_id);
+        }
         
-        return HTMLResponse(content=html_content)
-    
-    return app
+        function applyUpdate(data, replace) {
+            if (replace) {
+                document.getElementById('cp-grid').innerHTML = '';
+                cards.clear();
+                charging.clear();
+            }
+            data.charging_points.forEach(applyCp);
+            document.getElementById('total-cps').textContent = cards.size;
+            document.getElementById('active-requests').textContent = data.active_requests;
+            document.getElementById('currently-charging').textContent = charging.size;
+            document.getElementById('last-update').textContent = new Date().toLocaleTimeString();
+        }
+        
+        async function refresh() {
+            try {
+                const response = await fetch('/cp');
+                applyUpdate(await response.json(), true);
+            } catch (error) {
+                console.error('Error updating dashboard:', error);
+            }
+        }
+        
+        // The stream starts with a full snapshot, then sends only changed CPs;
+        // EventSource reconnects by itself and gets a fresh snapshot
+        const events = new EventSource('/events');
+        events.addEventListener('snapshot', e => applyUpdate(JSON.parse(e.data), true));
+        events.addEventListener('changes', e => applyUpdate(JSON.parse(e.data), false));
+    </script>
+</body>
+</html>
+"""
@@ -13,21 +13,25 @@ import argparse
 import sys
 from enum import Enum
 from typing import Dict
-from datetime import datetime, timedelta
+from datetime import datetime
 from loguru import logger
 
 from evcharging.common.config import CentralConfig, TOPICS
 from evcharging.common.kafka import KafkaProducerHelper, KafkaConsumerHelper, ensure_topics
 from evcharging.common.messages import (
     DriverRequest, DriverUpdate, MessageStatus, CentralCommand, CommandType,
-    CPStatus, CPTelemetry, CPRegistration
+    CPStatus, CPTelemetry, CPRegistration, MonitorHeartbeat
 )
 from evcharging.common.states import CPState, can_supply
 from evcharging.common.utils import utc_now, generate_id
 from evcharging.common.circuit_breaker import CircuitBreaker, CircuitState
-from evcharging.common.database import FaultHistoryDB
+from evcharging.common.database import FaultHistoryDB, SessionEnergyCoalescer
+from evcharging.common.dispatcher import KeyedDispatcher
+from evcharging.common.liveness import LivenessTracker
+from evcharging.common.snapshot import DashboardSnapshot
 
 from evcharging.apps.ev_central.dashboard import create_dashboard_app
+from evcharging.apps.ev_central.request_index import ActiveRequestIndex
 from evcharging.apps.ev_central.tcp_server import TCPControlServer
 
 
@@ -58,6 +62,8 @@ class ChargingPoint:
         )
         self.monitor_status: ChargingPoint.MonitorStatus = ChargingPoint.MonitorStatus.DOWN
         self.monitor_last_seen: datetime | None = None
+        self.monitor_rtt_ms: float | None = None
+        self.monitor_engine_state: str | None = None
         self.engine_status_known: bool = False
     
     def is_available(self) -> bool:
@@ -90,6 +96,24 @@ class ChargingPoint:
         return "ON"
 
 
+class _BatchCompletion:
+    """Counts the records of one consumed batch still waiting on a dispatcher worker."""
+    
+    def __init__(self, count: int):
+        self.remaining = count
+        self.failed = False  # Some record was never handled; do not commit past it
+        self.done = asyncio.Event()
+        if count <= 0:
+            self.done.set()
+    
+    def item_done(self, handled: bool = True):
+        if not handled:
+            self.failed = True
+        self.remaining -= 1
+        if self.remaining <= 0:
+            self.done.set()
+
+
 class EVCentralController:
     """Main controller managing all charging points and driver requests."""
     
@@ -98,10 +122,31 @@ class EVCentralController:
         self.producer: KafkaProducerHelper | None = None
         self.consumer: KafkaConsumerHelper | None = None
         self.charging_points: Dict[str, ChargingPoint] = {}
-        self.active_requests: Dict[str, DriverRequest] = {}
+        self.active_requests = ActiveRequestIndex()
         self._running = False
-        self.db = FaultHistoryDB()  # Initialize database
-        self.monitor_timeout = timedelta(seconds=5)
+        self.db = FaultHistoryDB(
+            write_behind=config.db_write_behind,
+            batch_size=config.db_batch_size,
+            flush_interval_ms=config.db_flush_interval_ms,
+            max_queue_size=config.db_queue_size
+        )
+        self.energy_coalescer = SessionEnergyCoalescer(self.db)
+        self._session_flush_task: asyncio.Task | None = None
+        self.dispatcher = KeyedDispatcher(
+            self._handle_message,
+            num_workers=config.dispatcher_workers,
+            queue_size=config.dispatcher_queue_size,
+            name="central-dispatcher"
+        )
+        # Last pending offset commit per (topic, partition), chained in batch order
+        self._commit_tasks: Dict[tuple[str, int], asyncio.Task] = {}
+        # Monitor heartbeat deadlines, expired by _liveness_loop on a fixed tick
+        self.liveness = LivenessTracker(config.monitor_timeout)
+        self._liveness_task: asyncio.Task | None = None
+        # Pre-serialized GET /cp payload; call _mark_changed(cp) after display changes
+        self.snapshot = DashboardSnapshot(
+            self._render_cp, self._render_summary, change_log_size=config.change_log_size
+        )
     
     async def start(self):
         """Initialize and start the central controller."""
@@ -110,11 +155,21 @@ class EVCentralController:
         # Ensure Kafka topics exist
         await ensure_topics(
             self.config.kafka_bootstrap,
-            list(TOPICS.values())
+            list(TOPICS.values()),
+            partitions={
+                TOPICS["CENTRAL_COMMANDS"]: self.config.command_partitions,
+                TOPICS["DRIVER_UPDATES"]: self.config.update_partitions,
+            }
         )
         
         # Initialize Kafka producer
-        self.producer = KafkaProducerHelper(self.config.kafka_bootstrap)
+        self.producer = KafkaProducerHelper(
+            self.config.kafka_bootstrap,
+            linger_ms=self.config.kafka_linger_ms,
+            max_batch_size=self.config.kafka_max_batch_size,
+            compression_type=self.config.kafka_compression
+        )
+        self.producer.add_failure_callback(self._on_delivery_failure)
         await self.producer.start()
         
         # Initialize Kafka consumer for driver requests and CP status
@@ -122,11 +177,20 @@ class EVCentralController:
             self.config.kafka_bootstrap,
             topics=[TOPICS["DRIVER_REQUESTS"], TOPICS["CP_STATUS"], TOPICS["CP_TELEMETRY"]],
             group_id="central-controller",
-            auto_offset_reset="latest"
+            auto_offset_reset="latest",
+            enable_auto_commit=False,
+            value_models={
+                TOPICS["DRIVER_REQUESTS"]: DriverRequest,
+                TOPICS["CP_STATUS"]: CPStatus,
+                TOPICS["CP_TELEMETRY"]: CPTelemetry,
+            }
         )
         await self.consumer.start()
         
         self._running = True
+        self.dispatcher.start()
+        self._session_flush_task = asyncio.create_task(self._session_flush_loop())
+        self._liveness_task = asyncio.create_task(self._liveness_loop())
         logger.info("EV Central Controller started successfully")
     
     async def stop(self):
@@ -134,11 +198,33 @@ class EVCentralController:
         logger.info("Stopping EV Central Controller...")
         self._running = False
         
+        for task in (self._session_flush_task, self._liveness_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        
+        # Finish messages already handed to workers while the producer is still up
+        await self.dispatcher.drain(timeout=5.0)
+        # Commit the offsets of batches the workers finished (drain released the rest)
+        commits = list(self._commit_tasks.values())
+        if commits:
+            _, pending = await asyncio.wait(commits, timeout=5.0)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*commits, return_exceptions=True)
+        
         if self.consumer:
             await self.consumer.stop()
         if self.producer:
             await self.producer.stop()
         
+        # Flush coalesced readings and queued database writes before exiting
+        self.energy_coalescer.flush()
+        await asyncio.to_thread(self.db.close)
+        
         logger.info("EV Central Controller stopped")
     
     def register_cp(self, registration: CPRegistration) -> bool:
@@ -161,7 +247,8 @@ class EVCentralController:
         # Set to ACTIVATED state
         self.charging_points[cp_id].state = CPState.ACTIVATED
         self.charging_points[cp_id].last_update = utc_now()
-        self.charging_points[cp_id].record_monitor_heartbeat()
+        self._touch_monitor(self.charging_points[cp_id])
+        self._mark_changed(self.charging_points[cp_id])
         
         return True
     
@@ -176,12 +263,13 @@ class EVCentralController:
         cp.fault_reason = reason
         cp.fault_timestamp = utc_now()
         cp.circuit_breaker.call_failed()  # Record failure in circuit breaker
-        cp.record_monitor_heartbeat()
+        self._touch_monitor(cp)
         
         # Update engine state to reflect fault condition
         cp.state = CPState.FAULT
         cp.engine_status_known = False  # Engine status unknown until it recovers
         cp.last_update = utc_now()
+        self._mark_changed(cp)
         
         # Record fault event in database
         self.db.record_fault_event(cp_id, "FAULT", reason)
@@ -218,12 +306,13 @@ class EVCentralController:
             cp.fault_reason = None
             cp.fault_timestamp = None
             cp.circuit_breaker.call_succeeded()  # Record success in circuit breaker
-            cp.record_monitor_heartbeat()
+            self._touch_monitor(cp)
             
             # Reset engine state to ACTIVATED and clear engine status
             cp.state = CPState.ACTIVATED
             cp.engine_status_known = False  # Engine will send new status
             cp.last_update = utc_now()
+            self._mark_changed(cp)
             
             # Record recovery event in database
             self.db.record_fault_event(cp_id, "RECOVERY", "Health check restored")
@@ -238,19 +327,40 @@ class EVCentralController:
     def record_monitor_ping(self, cp_id: str):
         """Record heartbeat from CP Monitor."""
         if cp_id in self.charging_points:
-            cp = self.charging_points[cp_id]
-            cp.record_monitor_heartbeat()
+            self._touch_monitor(self.charging_points[cp_id])
         else:
             logger.warning(f"Heartbeat from unregistered CP monitor: {cp_id} - creating and activating placeholder entry")
             # Create placeholder and immediately activate it since monitor is alive
             cp = ChargingPoint(cp_id)
             cp.state = CPState.ACTIVATED  # Set to ACTIVATED instead of DISCONNECTED
-            cp.record_monitor_heartbeat()
             self.charging_points[cp_id] = cp
+            self._touch_monitor(cp)
             
             # Log the auto-registration
             logger.info(f"CP {cp_id} auto-registered via monitor heartbeat - state: ACTIVATED")
 
+    def _touch_monitor(self, cp: ChargingPoint):
+        """Mark the CP's monitor alive and push out its heartbeat deadline."""
+        was_down = cp.monitor_status == ChargingPoint.MonitorStatus.DOWN
+        cp.record_monitor_heartbeat()
+        self.liveness.touch(cp.cp_id)
+        # monitor_last_seen alone does not bump the snapshot version
+        if was_down:
+            self._mark_changed(cp)
+
+    def _mark_changed(self, cp: ChargingPoint):
+        """Invalidate the CP's entry in the dashboard snapshot."""
+        self.snapshot.mark_changed(cp.cp_id)
+
+    def record_monitor_pings(self, heartbeats: list[MonitorHeartbeat]) -> int:
+        """Record a batch of CP Monitor heartbeats; returns the number applied."""
+        for heartbeat in heartbeats:
+            self.record_monitor_ping(heartbeat.cp_id)
+            cp = self.charging_points[heartbeat.cp_id]
+            cp.monitor_rtt_ms = heartbeat.health_rtt_ms
+            cp.monitor_engine_state = heartbeat.engine_state
+        return len(heartbeats)
+
     async def handle_driver_request(self, request: DriverRequest):
         """Process a driver charging request."""
         logger.info(
@@ -278,9 +388,10 @@ class EVCentralController:
             return
         
         # Accept the request
-        self.active_requests[request.request_id] = request
+        self.active_requests.add(request)
         cp.current_driver = request.driver_id
         cp.current_session = generate_id("session")
+        self._mark_changed(cp)
         
         # Start charging session in database
         self.db.start_charging_session(
@@ -341,12 +452,16 @@ class EVCentralController:
         
         # Handle state transitions
         await self._handle_state_transition(cp_id, old_state, cp)
+        self._mark_changed(cp)
     
     async def _handle_state_transition(self, cp_id: str, old_state: CPState, cp: ChargingPoint):
         """Handle state transitions for charging points."""
         # Session ended - transition from SUPPLYING to any other state
         if old_state == CPState.SUPPLYING and cp.state != CPState.SUPPLYING:
             if cp.current_session:
+                # Persist the latest coalesced reading before closing the session
+                self.energy_coalescer.flush(cp.current_session)
+                
                 # End the session in database
                 if cp.last_telemetry:
                     self.db.end_charging_session(
@@ -357,23 +472,21 @@ class EVCentralController:
                     )
                 
                 # Notify driver
-                if cp.current_driver:
-                    for req_id, req in list(self.active_requests.items()):
-                        if req.cp_id == cp_id and req.driver_id == cp.current_driver:
-                            if cp.state == CPState.ACTIVATED:
-                                await self._send_driver_update(
-                                    req,
-                                    MessageStatus.COMPLETED,
-                                    "Charging completed successfully"
-                                )
-                            else:
-                                await self._send_driver_update(
-                                    req,
-                                    MessageStatus.FAILED,
-                                    f"Charging interrupted: {cp.state.value}"
-                                )
-                            del self.active_requests[req_id]
-                            break
+                req = self.active_requests.for_cp(cp_id, cp.current_driver) if cp.current_driver else None
+                if req:
+                    self.active_requests.remove(req.request_id)
+                    if cp.state == CPState.ACTIVATED:
+                        await self._send_driver_update(
+                            req,
+                            MessageStatus.COMPLETED,
+                            "Charging completed successfully"
+                        )
+                    else:
+                        await self._send_driver_update(
+                            req,
+                            MessageStatus.FAILED,
+                            f"Charging interrupted: {cp.state.value}"
+                        )
                 
                 # Clear session
                 cp.current_driver = None
@@ -387,10 +500,11 @@ class EVCentralController:
         if cp_id in self.charging_points:
             cp = self.charging_points[cp_id]
             cp.last_telemetry = telemetry
+            self._mark_changed(cp)
             
-            # Update session energy in database if session is active
+            # Coalesce session energy; it is flushed on a fixed cadence
             if cp.current_session and telemetry.session_id == cp.current_session:
-                self.db.update_session_energy(
+                self.energy_coalescer.record(
                     session_id=cp.current_session,
                     kwh=telemetry.kwh,
                     cost=telemetry.euros
@@ -401,16 +515,39 @@ class EVCentralController:
                 f"€{telemetry.euros:.2f}, driver={telemetry.driver_id}"
             )
             
-            # Send progress update to driver
-            if telemetry.driver_id:
-                for req_id, req in self.active_requests.items():
-                    if req.cp_id == cp_id and req.driver_id == telemetry.driver_id:
-                        await self._send_driver_update(
-                            req,
-                            MessageStatus.IN_PROGRESS,
-                            f"Charging: {telemetry.kw:.1f} kW, €{telemetry.euros:.2f}"
-                        )
-                        break
+            # Send progress update to driver (pipelined, not awaited)
+            req = self.active_requests.for_cp(cp_id, telemetry.driver_id) if telemetry.driver_id else None
+            if req:
+                update = DriverUpdate(
+                    request_id=req.request_id,
+                    driver_id=req.driver_id,
+                    cp_id=req.cp_id,
+                    status=MessageStatus.IN_PROGRESS,
+                    reason=f"Charging: {telemetry.kw:.1f} kW, €{telemetry.euros:.2f}"
+                )
+                self.producer.send_nowait(TOPICS["DRIVER_UPDATES"], update, key=req.driver_id)
+    
+    async def _liveness_loop(self):
+        """Mark monitors DOWN once their heartbeat deadline has passed."""
+        while self._running:
+            await asyncio.sleep(self.config.liveness_tick)
+            try:
+                self.expire_monitors()
+            except Exception as e:
+                logger.error(f"Error expiring monitor heartbeats: {e}")
+    
+    async def _session_flush_loop(self):
+        """Periodically write coalesced session energy to the database."""
+        while self._running:
+            await asyncio.sleep(self.config.session_flush_interval)
+            try:
+                self.energy_coalescer.flush()
+            except Exception as e:
+                logger.error(f"Error flushing session energy: {e}")
+    
+    def _on_delivery_failure(self, topic: str, key: str | None, error: BaseException):
+        """Log Kafka messages the broker did not acknowledge."""
+        logger.error(f"Kafka delivery to {topic} (key={key}) failed: {error}")
     
     async def _send_driver_update(
         self,
@@ -429,75 +566,143 @@ class EVCentralController:
         await self.producer.send(TOPICS["DRIVER_UPDATES"], update, key=request.driver_id)
     
     async def process_messages(self):
-        """Main message processing loop."""
-        async for msg in self.consumer.consume():
-            try:
-                topic = msg["topic"]
-                value = msg["value"]
-                
-                if topic == TOPICS["DRIVER_REQUESTS"]:
-                    request = DriverRequest(**value)
-                    await self.handle_driver_request(request)
-                
-                elif topic == TOPICS["CP_STATUS"]:
-                    status = CPStatus(**value)
-                    await self.handle_cp_status(status)
+        """
+        Main message processing loop, sharding records by cp_id.
+        
+        Batches are handed to the dispatcher without waiting for them, so a
+        slow shard only holds back the commits of partitions whose records
+        it owns. Each batch's offset is committed once all of its records
+        have been handled and that partition's earlier batches committed.
+        """
+        batches = self.consumer.consume_batches(
+            max_records=self.config.consume_batch_size,
+            timeout_ms=self.config.consume_batch_timeout_ms
+        )
+        async for batch in batches:
+            if not batch:
+                continue
+            completion = _BatchCompletion(len(batch))
+            for msg in batch:
+                try:
+                    # Values arrive already validated into their message model
+                    message = msg["value"]
+                    
+                    # Same cp_id -> same worker, preserving per-CP ordering
+                    await self.dispatcher.submit(message.cp_id, message, on_done=completion.item_done)
                 
-                elif topic == TOPICS["CP_TELEMETRY"]:
-                    telemetry = CPTelemetry(**value)
-                    await self.handle_cp_telemetry(telemetry)
+                except Exception as e:
+                    completion.item_done()
+                    logger.error(f"Error processing message from {msg.get('topic')}: {e}")
             
-            except Exception as e:
-                logger.error(f"Error processing message from {msg.get('topic')}: {e}")
+            last = batch[-1]
+            tp = (last["topic"], last["partition"])
+            self._commit_tasks[tp] = asyncio.create_task(
+                self._commit_when_done(completion, self._commit_tasks.get(tp), *tp, last["offset"] + 1)
+            )
+    
+    async def _commit_when_done(
+        self,
+        completion: _BatchCompletion,
+        previous: asyncio.Task | None,
+        topic: str,
+        partition: int,
+        offset: int
+    ) -> bool:
+        """
+        Commit a batch's partition offset once it and the partition's earlier batches are done.
+        
+        Returns False without committing if this batch or an earlier one of
+        the partition has records that were never handled, so they are
+        consumed again after a restart.
+        """
+        await completion.done.wait()
+        if previous is not None:
+            committed, = await asyncio.gather(previous, return_exceptions=True)
+            if committed is not True:
+                return False
+        if completion.failed:
+            logger.warning(f"Not committing {topic}[{partition}]@{offset}: batch was not fully handled")
+            return False
+        try:
+            await self.consumer.commit_offset(topic, partition, offset)
+        except Exception as e:
+            # A later commit of this partition still covers these records
+            logger.error(f"Error committing {topic}[{partition}]@{offset}: {e}")
+        return True
+    
+    async def _handle_message(self, message: DriverRequest | CPStatus | CPTelemetry):
+        """Route a parsed message to its handler (runs on a dispatcher worker)."""
+        if isinstance(message, DriverRequest):
+            await self.handle_driver_request(message)
+        elif isinstance(message, CPStatus):
+            await self.handle_cp_status(message)
+        elif isinstance(message, CPTelemetry):
+            await self.handle_cp_telemetry(message)
     
     def get_dashboard_data(self) -> dict:
-        """Get current state for dashboard display."""
-        self._refresh_monitor_states()
+        """Get current state for dashboard display (CP views are shared; do not mutate)."""
         return {
-            "charging_points": [
+            "charging_points": self.snapshot.views(),
+            **self._render_summary(),
+        }
+
+    def _render_cp(self, cp_id: str) -> dict | None:
+        """Build the dashboard view of one CP (called by the snapshot on change)."""
+        cp = self.charging_points.get(cp_id)
+        if cp is None:
+            return None
+        return {
+            "cp_id": cp.cp_id,
+            "state": cp.get_display_state(),
+            "engine_state": cp.state.value,
+            "monitor_status": cp.monitor_status.value,
+            "current_driver": cp.current_driver,
+            "last_update": cp.last_update.isoformat(),
+            "monitor_last_seen": cp.monitor_last_seen.isoformat() if cp.monitor_last_seen else None,
+            "telemetry": (
                 {
-                    "cp_id": cp.cp_id,
-                    "state": cp.get_display_state(),
-                    "engine_state": cp.state.value,
-                    "monitor_status": cp.monitor_status.value,
-                    "current_driver": cp.current_driver,
-                    "last_update": cp.last_update.isoformat(),
-                    "monitor_last_seen": cp.monitor_last_seen.isoformat() if cp.monitor_last_seen else None,
-                    "telemetry": (
-                        {
-                            "kw": cp.last_telemetry.kw,
-                            "kwh": cp.last_telemetry.kwh,
-                            "euros": cp.last_telemetry.euros,
-                            "session_id": cp.last_telemetry.session_id,
-                        }
-                        if cp.last_telemetry
-                        else None
-                    ),
+                    "kw": cp.last_telemetry.kw,
+                    "kwh": cp.last_telemetry.kwh,
+                    "euros": cp.last_telemetry.euros,
+                    "session_id": cp.last_telemetry.session_id,
                 }
-                for cp in self.charging_points.values()
-            ],
-            "active_requests": len(self.active_requests),
+                if cp.last_telemetry
+                else None
+            ),
+        }
+
+    def _render_summary(self) -> dict:
+        return {"active_requests": len(self.active_requests)}
+
+    def get_metrics(self) -> dict:
+        """Get internal pipeline metrics for monitoring."""
+        return {
+            "db_writer": self.db.get_writer_stats(),
+            "session_energy": self.energy_coalescer.stats(),
+            "dispatcher": self.dispatcher.stats(),
+            "producer": self.producer.stats() if self.producer else None,
+            "liveness": self.liveness.stats(),
+            "snapshot": self.snapshot.stats(),
         }
 
-    def _refresh_monitor_states(self):
-        """Mark monitors as down when heartbeat timeout is exceeded."""
+    def expire_monitors(self) -> int:
+        """Mark monitors DOWN whose heartbeat timed out; returns how many expired."""
+        expired = self.liveness.expire()
+        if not expired:
+            return 0
         now = utc_now()
-        for cp in self.charging_points.values():
-            if not cp.monitor_last_seen:
-                cp.mark_monitor_down()
-                # If monitor is down, engine status is unknown
-                if cp.state != CPState.DISCONNECTED:
-                    cp.state = CPState.DISCONNECTED
-                    cp.engine_status_known = False
-                    cp.last_update = now
+        for cp_id in expired:
+            cp = self.charging_points.get(cp_id)
+            if cp is None:
                 continue
-            if now - cp.monitor_last_seen > self.monitor_timeout:
-                cp.mark_monitor_down()
-                # If monitor heartbeat timed out, engine status is unknown
-                if cp.state != CPState.DISCONNECTED:
-                    cp.state = CPState.DISCONNECTED
-                    cp.engine_status_known = False
-                    cp.last_update = now
+            cp.mark_monitor_down()
+            # If monitor heartbeat timed out, engine status is unknown
+            if cp.state != CPState.DISCONNECTED:
+                cp.state = CPState.DISCONNECTED
+                cp.engine_status_known = False
+                cp.last_update = now
+            self._mark_changed(cp)
+        return len(expired)
 
 
 # Global controller instance for dashboard access
@@ -542,7 +747,7 @@ async def main():
         await _controller.start()
         
         # Start TCP control server
-        tcp_server = TCPControlServer(config.listen_port)
+        tcp_server = TCPControlServer(config.listen_port, _controller)
         tcp_task = asyncio.create_task(tcp_server.start())
         
         # Start dashboard (in separate thread via uvicorn)
@@ -0,0 +1,68 @@
+"""
+Index of accepted driver requests for EV Central.
+Keeps request_id, cp_id and driver_id lookups in step so telemetry and
+session-end handling never scan every active request.
+"""
+
+from typing import Dict, Optional, Set
+
+from evcharging.common.messages import DriverRequest
+
+
+class ActiveRequestIndex:
+    """
+    Active driver requests indexed by request, CP and driver.
+
+    A CP serves at most one accepted request at a time, so the CP index maps
+    to a single request; a driver may hold several. ``add`` and ``remove``
+    update all three maps together.
+    """
+
+    def __init__(self):
+        self._by_id: Dict[str, DriverRequest] = {}
+        self._by_cp: Dict[str, DriverRequest] = {}
+        self._by_driver: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, request_id: str) -> bool:
+        return request_id in self._by_id
+
+    def add(self, request: DriverRequest):
+        """Index an accepted request, replacing any request still held by its CP."""
+        previous = self._by_cp.get(request.cp_id)
+        if previous is not None and previous.request_id != request.request_id:
+            self.remove(previous.request_id)
+        self.remove(request.request_id)
+        self._by_id[request.request_id] = request
+        self._by_cp[request.cp_id] = request
+        self._by_driver.setdefault(request.driver_id, set()).add(request.request_id)
+
+    def remove(self, request_id: str) -> Optional[DriverRequest]:
+        """Drop a request from every index; returns it, or None if unknown."""
+        request = self._by_id.pop(request_id, None)
+        if request is None:
+            return None
+        if self._by_cp.get(request.cp_id) is request:
+            del self._by_cp[request.cp_id]
+        driver_requests = self._by_driver.get(request.driver_id)
+        if driver_requests is not None:
+            driver_requests.discard(request_id)
+            if not driver_requests:
+                del self._by_driver[request.driver_id]
+        return request
+
+    def get(self, request_id: str) -> Optional[DriverRequest]:
+        return self._by_id.get(request_id)
+
+    def for_cp(self, cp_id: str, driver_id: Optional[str] = None) -> Optional[DriverRequest]:
+        """The request active on a CP (only if it belongs to driver_id, when given)."""
+        request = self._by_cp.get(cp_id)
+        if request is None or (driver_id is not None and request.driver_id != driver_id):
+            return None
+        return request
+
+    def for_driver(self, driver_id: str) -> list[DriverRequest]:
+        """All active requests of a driver."""
+        return [self._by_id[request_id] for request_id in self._by_driver.get(driver_id, ())]
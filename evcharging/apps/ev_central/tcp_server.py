@@ -1,83 +1,200 @@
 """
 TCP Control Server for EV Central.
 Provides a TCP socket interface for control plane operations with message framing.
+
+Protocol: each <STX><DATA><ETX><LRC> frame carries one JSON object.
+
+Request:  {"id": 7, "cmd": "heartbeat", "cp_id": "CP-001"}
+Response: {"id": 7, "ok": true, "result": {...}}
+          {"id": 7, "ok": false, "error": "..."}
+
+Commands: register, heartbeat, fault, healthy, query. Clients may pipeline
+many requests on one connection; responses echo the request id. Requests on
+one connection are executed in order, and all responses to the frames of one
+read are written back together with a single drain.
 """
 
 import asyncio
+import json
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
 from loguru import logger
+from pydantic import ValidationError
+
+from evcharging.common.framing import FrameParser, frame_messages
+from evcharging.common.messages import CPRegistration, MonitorHeartbeat
+
+if TYPE_CHECKING:
+    from evcharging.apps.ev_central.main import EVCentralController
 
-from evcharging.common.framing import MessageFramer, frame_message
+
+READ_SIZE = 64 * 1024
 
 
 class TCPControlServer:
-    """Simple TCP server for control plane operations."""
-    
-    def __init__(self, port: int):
+    """Pipelined TCP command channel into the EV Central controller."""
+
+    def __init__(self, port: int, controller: "EVCentralController", host: str = '0.0.0.0'):
         self.port = port
+        self.host = host
+        self.controller = controller
         self.server = None
         self._running = False
-    
+        self._handlers: dict[str, Callable[[dict], Awaitable[dict]]] = {
+            "register": self.cmd_register,
+            "heartbeat": self.cmd_heartbeat,
+            "fault": self.cmd_fault,
+            "healthy": self.cmd_healthy,
+            "query": self.cmd_query,
+        }
+        self.requests_handled = 0
+        self.requests_failed = 0
+
     async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
-        """Handle incoming TCP connections with message framing."""
+        """Serve framed JSON requests from one connection until it closes."""
         addr = writer.get_extra_info('peername')
         logger.info(f"TCP client connected: {addr}")
-        
-        framer = MessageFramer()
-        
+
+        parser = FrameParser()
+
         try:
             while True:
-                data = await reader.read(1024)
+                data = await reader.read(READ_SIZE)
                 if not data:
                     break
-                
-                # Add data to framer
-                framer.add_data(data)
-                
-                # Process all complete messages
-                messages = framer.get_all_messages()
-                for message in messages:
-                    logger.debug(f"Received from {addr}: {message}")
-                    
-                    # Process command (simple echo for now)
-                    response_text = f"ACK: {message}"
-                    response_framed = frame_message(response_text)
-                    
-                    writer.write(response_framed)
+
+                parser.feed(data)
+                responses = [await self.handle_request(message) for message in parser.messages()]
+                if responses:
+                    # One write and one drain for everything this read completed
+                    writer.write(frame_messages(responses))
                     await writer.drain()
-        
+
         except asyncio.CancelledError:
             pass
+        except ConnectionError as e:
+            logger.debug(f"TCP client {addr} connection lost: {e}")
         except Exception as e:
             logger.error(f"Error handling TCP client {addr}: {e}")
         finally:
             logger.info(f"TCP client disconnected: {addr}")
             writer.close()
-            await writer.wait_closed()
-    
-    async def start(self):
-        """Start the TCP server."""
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def handle_request(self, message: str) -> str:
+        """Execute one JSON request and return the JSON response."""
+        request_id = None
+        try:
+            request = json.loads(message)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object")
+            request_id = request.get("id")
+            cmd = request.get("cmd")
+            handler = self._handlers.get(cmd)
+            if handler is None:
+                raise ValueError(f"Unknown command '{cmd}'")
+            result = await handler(request)
+            response = {"id": request_id, "ok": True, "result": result}
+        except (ValueError, ValidationError) as e:
+            self.requests_failed += 1
+            response = {"id": request_id, "ok": False, "error": str(e)}
+        except Exception as e:
+            self.requests_failed += 1
+            logger.error(f"TCP command failed: {e}")
+            response = {"id": request_id, "ok": False, "error": "Internal error"}
+        self.requests_handled += 1
+        return json.dumps(response)
+
+    def _known_cp(self, request: dict) -> str:
+        cp_id = request.get("cp_id")
+        if not cp_id:
+            raise ValueError("cp_id required")
+        if cp_id not in self.controller.charging_points:
+            raise ValueError(f"Unknown charging point '{cp_id}'")
+        return cp_id
+
+    async def cmd_register(self, request: dict) -> dict:
+        """Register or update a charging point."""
+        registration = CPRegistration.model_validate(
+            {k: v for k, v in request.items() if k not in ("id", "cmd")}
+        )
+        success = self.controller.register_cp(registration)
+        return {"cp_id": registration.cp_id, "registered": success}
+
+    async def cmd_heartbeat(self, request: dict) -> dict:
+        """Record a CP Monitor heartbeat, with its probe RTT and engine state if sent."""
+        if not request.get("cp_id"):
+            raise ValueError("cp_id required")
+        heartbeat = MonitorHeartbeat.model_validate(
+            {k: v for k, v in request.items() if k not in ("id", "cmd")}
+        )
+        self.controller.record_monitor_pings([heartbeat])
+        return {"cp_id": heartbeat.cp_id}
+
+    async def cmd_fault(self, request: dict) -> dict:
+        """Mark a charging point as faulty."""
+        cp_id = self._known_cp(request)
+        reason = request.get("reason", "")
+        logger.warning(f"CP {cp_id} marked as faulty by monitor: {reason}")
+        await self.controller.mark_cp_faulty(cp_id, reason)
+        return {"cp_id": cp_id, "status": "FAULT"}
+
+    async def cmd_healthy(self, request: dict) -> dict:
+        """Clear a charging point fault."""
+        cp_id = self._known_cp(request)
+        logger.info(f"CP {cp_id} health restored: {request.get('reason', '')}")
+        await self.controller.clear_cp_fault(cp_id)
+        return {"cp_id": cp_id, "status": "HEALTHY"}
+
+    async def cmd_query(self, request: dict) -> dict:
+        """Return the state of one charging point, or of all of them."""
+        if request.get("cp_id"):
+            cp_ids = [self._known_cp(request)]
+        else:
+            cp_ids = list(self.controller.charging_points)
+        return {"charging_points": [self._cp_state(cp_id) for cp_id in cp_ids]}
+
+    def _cp_state(self, cp_id: str) -> dict[str, Any]:
+        cp = self.controller.charging_points[cp_id]
+        return {
+            "cp_id": cp.cp_id,
+            "state": cp.state.value,
+            "current_driver": cp.current_driver,
+            "current_session": cp.current_session,
+            "last_update": cp.last_update.isoformat(),
+        }
+
+    async def listen(self):
+        """Bind the listening socket without serving yet."""
         self.server = await asyncio.start_server(
             self.handle_client,
-            '0.0.0.0',
+            self.host,
             self.port
         )
-        
+
         addr = self.server.sockets[0].getsockname()
+        self.port = addr[1]
         logger.info(f"TCP Control Server listening on {addr}")
         self._running = True
-        
+
+    async def start(self):
+        """Start the TCP server."""
+        await self.listen()
+
         # Serve until stopped
         try:
             async with self.server:
                 await self.server.serve_forever()
         except asyncio.CancelledError:
             logger.info("TCP server cancelled")
-    
+
     async def stop(self):
         """Stop the TCP server gracefully."""
         logger.info("Stopping TCP Control Server...")
         self._running = False
-        
+
         if self.server:
             self.server.close()
             await self.server.wait_closed()
@@ -0,0 +1,189 @@
+"""
+EV CP Fleet Host - runs many CP Engines in a single process.
+
+Responsibilities:
+- Create and supervise N CPEngine instances on one event loop
+- Share a single Kafka producer between all engines
+- Consume the central.commands partitions of its CP IDs once and route each
+  command to its engine by cp_id
+- Optionally expose one health check port per engine for CP Monitors
+"""
+
+import asyncio
+import argparse
+import sys
+from loguru import logger
+
+from evcharging.common.config import CPEngineConfig, CPFleetConfig, TOPICS
+from evcharging.common.dispatcher import KeyedDispatcher
+from evcharging.common.kafka import KafkaProducerHelper, KafkaConsumerHelper, ensure_topics
+from evcharging.common.messages import CentralCommand
+
+from evcharging.apps.ev_cp_e.main import CPEngine
+
+
+class CPFleetHost:
+    """Hosts a fleet of CP Engines sharing one producer and one consumer."""
+
+    def __init__(self, config: CPFleetConfig):
+        self.config = config
+        self.producer: KafkaProducerHelper | None = None
+        self.consumer: KafkaConsumerHelper | None = None
+        self.engines: dict[str, CPEngine] = {}
+        # Commands for one CP are handled in order; different CPs run concurrently
+        self.dispatcher = KeyedDispatcher(
+            self.route_command,
+            num_workers=config.command_workers,
+            name="fleet-commands"
+        )
+        self.dropped_commands = 0
+        self._running = False
+
+    def cp_ids(self) -> list[str]:
+        """Return the CP IDs hosted by this fleet."""
+        start = self.config.cp_start_index
+        return [
+            f"{self.config.cp_id_prefix}{i:03d}"
+            for i in range(start, start + self.config.cp_count)
+        ]
+
+    def engine_config(self, index: int, cp_id: str) -> CPEngineConfig:
+        """Build the configuration for the engine at position index."""
+        base = self.config.health_port_base
+        return CPEngineConfig(
+            cp_id=cp_id,
+            kafka_bootstrap=self.config.kafka_bootstrap,
+            health_port=base + index if base else 0,
+            telemetry_interval=self.config.telemetry_interval,
+            kw_rate=self.config.kw_rate,
+            euro_rate=self.config.euro_rate,
+            telemetry_codec=self.config.telemetry_codec,
+            command_partitions=self.config.command_partitions
+        )
+
+    def create_engines(self):
+        """Instantiate one engine per CP ID, all bound to the shared producer."""
+        for index, cp_id in enumerate(self.cp_ids()):
+            self.engines[cp_id] = CPEngine(self.engine_config(index, cp_id), producer=self.producer)
+
+    async def start(self):
+        """Start the shared Kafka clients and every hosted engine."""
+        logger.info(f"Starting CP fleet {self.config.fleet_id} with {self.config.cp_count} engines")
+
+        await ensure_topics(
+            self.config.kafka_bootstrap,
+            list(TOPICS.values()),
+            partitions={TOPICS["CENTRAL_COMMANDS"]: self.config.command_partitions}
+        )
+
+        self.producer = KafkaProducerHelper(
+            self.config.kafka_bootstrap,
+            codecs={TOPICS["CP_TELEMETRY"]: self.config.telemetry_codec},
+            linger_ms=self.config.kafka_linger_ms,
+            max_batch_size=self.config.kafka_max_batch_size,
+            compression_type=self.config.kafka_compression
+        )
+        self.producer.add_failure_callback(
+            lambda topic, key, error: logger.error(f"CP {key}: delivery to {topic} failed: {error}")
+        )
+        await self.producer.start()
+
+        self.consumer = KafkaConsumerHelper(
+            self.config.kafka_bootstrap,
+            topics=[TOPICS["CENTRAL_COMMANDS"]],
+            group_id=f"cp-fleet-{self.config.fleet_id}",
+            auto_offset_reset="latest",
+            value_models={TOPICS["CENTRAL_COMMANDS"]: CentralCommand},
+            assign_keys=self.cp_ids()
+        )
+        await self.consumer.start()
+
+        self.dispatcher.start()
+        self.create_engines()
+        await asyncio.gather(*(engine.start() for engine in self.engines.values()))
+
+        self._running = True
+        logger.info(f"CP fleet {self.config.fleet_id} started: {len(self.engines)} engines")
+
+    async def stop(self):
+        """Stop all engines, then the shared Kafka clients."""
+        logger.info(f"Stopping CP fleet {self.config.fleet_id}")
+        self._running = False
+
+        await self.dispatcher.drain(timeout=5.0)
+        await asyncio.gather(
+            *(engine.stop() for engine in self.engines.values() if engine._running),
+            return_exceptions=True
+        )
+
+        if self.consumer:
+            await self.consumer.stop()
+        if self.producer:
+            await self.producer.stop()
+
+        logger.info(f"CP fleet {self.config.fleet_id} stopped")
+
+    async def route_command(self, command: CentralCommand):
+        """Deliver a command to the engine it is addressed to."""
+        engine = self.engines.get(command.cp_id)
+        if engine is None:
+            self.dropped_commands += 1
+            return  # Not hosted here
+        await engine.handle_command(command)
+
+    async def process_messages(self):
+        """Consume central.commands once for the whole fleet."""
+        try:
+            async for batch in self.consumer.consume_batches():
+                if not self._running:
+                    break
+                for msg in batch:
+                    command: CentralCommand = msg["value"]
+                    await self.dispatcher.submit(command.cp_id, command)
+        except Exception as e:
+            if self._running:
+                logger.error(f"Error in fleet message processing loop: {e}")
+
+
+async def main():
+    """Main entry point for the CP fleet host."""
+    parser = argparse.ArgumentParser(description="EV CP Fleet Host")
+    parser.add_argument("--kafka-bootstrap", type=str, help="Kafka bootstrap servers")
+    parser.add_argument("--fleet-id", type=str, help="Fleet host ID")
+    parser.add_argument("--cp-count", type=int, help="Number of CP Engines to host")
+    parser.add_argument("--cp-start-index", type=int, help="Number of the first CP ID")
+    parser.add_argument("--health-port-base", type=int, help="First health check port (0 disables)")
+    parser.add_argument("--log-level", type=str, help="Log level")
+
+    args = parser.parse_args()
+
+    config_dict = {k: v for k, v in vars(args).items() if v is not None and k != 'log_level'}
+    config = CPFleetConfig(**config_dict)
+
+    log_level = args.log_level if args.log_level else config.log_level
+
+    logger.remove()
+    logger.add(
+        sys.stderr,
+        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>CP_FLEET:{extra[fleet_id]}</cyan> | <level>{message}</level>",
+        level=log_level
+    )
+    logger.configure(extra={"fleet_id": config.fleet_id})
+
+    host = CPFleetHost(config)
+
+    try:
+        await host.start()
+        await host.process_messages()
+
+    except KeyboardInterrupt:
+        logger.info("Shutting down...")
+    except Exception as e:
+        logger.error(f"Fatal error: {e}")
+        raise
+    finally:
+        await host.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
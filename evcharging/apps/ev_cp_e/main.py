@@ -37,13 +37,21 @@ class ChargingSession:
 
 
 class CPEngine:
-    """Charging Point Engine managing state and operations."""
+    """
+    Charging Point Engine managing state and operations.
     
-    def __init__(self, config: CPEngineConfig):
+    Standalone engines own their Kafka producer and command consumer. When a
+    producer is passed in, the engine is hosted (see fleet.py): it shares that
+    producer, has no consumer of its own and receives commands through
+    handle_command() from the host.
+    """
+    
+    def __init__(self, config: CPEngineConfig, producer: KafkaProducerHelper | None = None):
         self.config = config
         self.cp_id = config.cp_id
         self.state = CPState.DISCONNECTED  # Start in DISCONNECTED, will transition to ACTIVATED
-        self.producer: KafkaProducerHelper | None = None
+        self.hosted = producer is not None
+        self.producer: KafkaProducerHelper | None = producer
         self.consumer: KafkaConsumerHelper | None = None
         self.current_session: ChargingSession | None = None
         self.telemetry_task: asyncio.Task | None = None
@@ -55,27 +63,41 @@ class CPEngine:
         """Initialize and start the CP Engine."""
         logger.info(f"Starting CP Engine: {self.cp_id}")
         
-        # Ensure Kafka topics exist
-        await ensure_topics(
-            self.config.kafka_bootstrap,
-            list(TOPICS.values())
-        )
-        
-        # Initialize Kafka producer
-        self.producer = KafkaProducerHelper(self.config.kafka_bootstrap)
-        await self.producer.start()
-        
-        # Initialize Kafka consumer for commands
-        self.consumer = KafkaConsumerHelper(
-            self.config.kafka_bootstrap,
-            topics=[TOPICS["CENTRAL_COMMANDS"]],
-            group_id=f"cp-engine-{self.cp_id}",
-            auto_offset_reset="latest"
-        )
-        await self.consumer.start()
+        if not self.hosted:
+            # Ensure Kafka topics exist
+            await ensure_topics(
+                self.config.kafka_bootstrap,
+                list(TOPICS.values()),
+                partitions={TOPICS["CENTRAL_COMMANDS"]: self.config.command_partitions}
+            )
+            
+            # Initialize Kafka producer
+            self.producer = KafkaProducerHelper(
+                self.config.kafka_bootstrap,
+                codecs={TOPICS["CP_TELEMETRY"]: self.config.telemetry_codec},
+                linger_ms=self.config.kafka_linger_ms,
+                max_batch_size=self.config.kafka_max_batch_size,
+                compression_type=self.config.kafka_compression
+            )
+            self.producer.add_failure_callback(
+                lambda topic, key, error: logger.error(f"CP {self.cp_id}: delivery to {topic} failed: {error}")
+            )
+            await self.producer.start()
+            
+            # Initialize Kafka consumer for commands, reading only our key's partition
+            self.consumer = KafkaConsumerHelper(
+                self.config.kafka_bootstrap,
+                topics=[TOPICS["CENTRAL_COMMANDS"]],
+                group_id=f"cp-engine-{self.cp_id}",
+                auto_offset_reset="latest",
+                value_models={TOPICS["CENTRAL_COMMANDS"]: CentralCommand},
+                assign_keys=[self.cp_id]
+            )
+            await self.consumer.start()
         
-        # Start health check TCP server
-        await self.start_health_server()
+        # Start health check TCP server (port 0 disables it)
+        if self.config.health_port:
+            await self.start_health_server()
         
         # Auto-activate CP for immediate availability
         await self.change_state(CPEvent.CONNECT, "Engine started - auto-connecting")
@@ -108,7 +130,7 @@ class CPEngine:
         
         if self.consumer:
             await self.consumer.stop()
-        if self.producer:
+        if self.producer and not self.hosted:
             await self.producer.stop()
         
         if self.health_server:
@@ -141,7 +163,7 @@ class CPEngine:
     async def handle_command(self, command: CentralCommand):
         """Process command from Central."""
         if command.cp_id != self.cp_id:
-            return  # Not for this CP
+            return  # Another CP whose ID hashes to the same partition
         
         logger.info(f"CP {self.cp_id} received command: {command.cmd}")
         
@@ -249,7 +271,8 @@ class CPEngine:
                     driver_id=self.current_session.driver_id,
                     session_id=self.current_session.session_id
                 )
-                await self.producer.send(TOPICS["CP_TELEMETRY"], telemetry, key=self.cp_id)
+                # Fire-and-forget: failures are reported by the producer callback
+                self.producer.send_nowait(TOPICS["CP_TELEMETRY"], telemetry, key=self.cp_id)
                 
                 logger.debug(
                     f"CP {self.cp_id} telemetry: {telemetry.kw:.2f} kW, "
@@ -274,8 +297,10 @@ class CPEngine:
         async def handle_health_check(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
             addr = writer.get_extra_info('peername')
             try:
+                # One response per PING line, so monitors can keep the
+                # connection open and send probes back to back
                 while True:
-                    data = await reader.read(100)
+                    data = await reader.readline()
                     if not data:
                         break
                     
@@ -329,8 +354,7 @@ class CPEngine:
                     value = msg["value"]
                     
                     if topic == TOPICS["CENTRAL_COMMANDS"]:
-                        command = CentralCommand(**value)
-                        await self.handle_command(command)
+                        await self.handle_command(value)
                         
                         # Break loop if shutdown was commanded
                         if not self._running:
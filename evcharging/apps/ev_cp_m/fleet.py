@@ -0,0 +1,202 @@
+"""
+EV CP Monitor Fleet Host - runs many CP Monitors in a single process.
+
+Responsibilities:
+- Create one CPMonitor per CP, all sharing a pooled HTTP client to Central
+- Probe each CP Engine (e.g. engines hosted by ev_cp_e.fleet)
+- Aggregate heartbeats into one POST /cp/heartbeat/batch per interval
+"""
+
+import asyncio
+import argparse
+import random
+import sys
+import time
+import httpx
+from loguru import logger
+
+from evcharging.common.config import CPMonitorConfig, CPMonitorFleetConfig
+from evcharging.common.messages import MonitorHeartbeat
+
+from evcharging.apps.ev_cp_m.main import CPMonitor
+
+
+class CPMonitorFleet:
+    """Hosts a fleet of CP Monitors sharing one HTTP client and heartbeat batch."""
+
+    def __init__(self, config: CPMonitorFleetConfig):
+        self.config = config
+        self.http: httpx.AsyncClient | None = None
+        self.monitors: dict[str, CPMonitor] = {}
+        # Latest heartbeat per CP since the last batch was sent
+        self.pending: dict[str, MonitorHeartbeat] = {}
+        self.batches_sent = 0
+        self.heartbeats_sent = 0
+        self.batch_failures = 0
+        self._tasks: list[asyncio.Task] = []
+        self._running = False
+
+    def cp_ids(self) -> list[str]:
+        """Return the CP IDs monitored by this fleet."""
+        start = self.config.cp_start_index
+        return [
+            f"{self.config.cp_id_prefix}{i:03d}"
+            for i in range(start, start + self.config.cp_count)
+        ]
+
+    def monitor_config(self, index: int, cp_id: str) -> CPMonitorConfig:
+        """Build the configuration for the monitor at position index."""
+        return CPMonitorConfig(
+            cp_id=cp_id,
+            cp_e_host=self.config.cp_e_host,
+            cp_e_port=self.config.cp_e_port_base + index,
+            central_host=self.config.central_host,
+            central_port=self.config.central_port,
+            # Fleet monitors share the host's pooled HTTP client and batched heartbeats
+            central_control_port=0,
+            health_interval=self.config.health_interval,
+            persistent_probe=self.config.persistent_probe,
+            probe_timeout=self.config.probe_timeout,
+            metrics_log_interval=0
+        )
+
+    def create_monitors(self):
+        """Instantiate one monitor per CP ID, all bound to the shared client."""
+        sink = self.collect_heartbeat if self.config.aggregate_heartbeats else None
+        for index, cp_id in enumerate(self.cp_ids()):
+            self.monitors[cp_id] = CPMonitor(
+                self.monitor_config(index, cp_id), http=self.http, heartbeat_sink=sink
+            )
+
+    def collect_heartbeat(self, heartbeat: MonitorHeartbeat):
+        """Heartbeat sink for hosted monitors; keeps only the latest per CP."""
+        self.pending[heartbeat.cp_id] = heartbeat
+
+    async def flush_heartbeats(self) -> int:
+        """POST all pending heartbeats in batches; returns how many were delivered."""
+        if not self.pending:
+            return 0
+        heartbeats = list(self.pending.values())
+        self.pending.clear()
+
+        delivered = 0
+        size = self.config.heartbeat_batch_max
+        for i in range(0, len(heartbeats), size):
+            batch = [hb.model_dump(mode='json') for hb in heartbeats[i:i + size]]
+            try:
+                response = await self.http.post("/cp/heartbeat/batch", json=batch)
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                self.batch_failures += 1
+                logger.warning(f"Heartbeat batch of {len(batch)} failed: {e}")
+                continue
+            self.batches_sent += 1
+            delivered += len(batch)
+        self.heartbeats_sent += delivered
+        return delivered
+
+    def stats(self) -> dict:
+        """Heartbeat batching and per-monitor connection metrics."""
+        return {
+            "monitors": len(self.monitors),
+            "batches_sent": self.batches_sent,
+            "heartbeats_sent": self.heartbeats_sent,
+            "batch_failures": self.batch_failures,
+            "healthy": sum(1 for m in self.monitors.values() if m.is_healthy),
+        }
+
+    async def start(self):
+        """Create the shared client and register every monitored CP."""
+        logger.info(f"Starting CP Monitor fleet {self.config.fleet_id} for {self.config.cp_count} CPs")
+        self.http = httpx.AsyncClient(
+            base_url=f"http://{self.config.central_host}:{self.config.central_port}",
+            timeout=5.0,
+            limits=httpx.Limits(
+                max_connections=self.config.central_connections,
+                max_keepalive_connections=self.config.central_connections
+            )
+        )
+        self.create_monitors()
+        await asyncio.gather(*(monitor.start() for monitor in self.monitors.values()))
+        self._running = True
+        logger.info(f"CP Monitor fleet {self.config.fleet_id} started: {len(self.monitors)} monitors")
+
+    async def stop(self):
+        """Stop all monitors and close the shared client."""
+        logger.info(f"Stopping CP Monitor fleet {self.config.fleet_id}")
+        self._running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await asyncio.gather(*(monitor.stop() for monitor in self.monitors.values()), return_exceptions=True)
+        if self.http:
+            await self.http.aclose()
+        logger.info(f"CP Monitor fleet {self.config.fleet_id} stopped")
+
+    async def run(self):
+        """Run every monitor's health loop plus the heartbeat batch loop."""
+        async def run_monitor(monitor: CPMonitor):
+            # Spread probes over the interval instead of firing them all at once
+            await asyncio.sleep(random.uniform(0, self.config.health_interval))
+            await monitor.health_check_loop()
+
+        self._tasks = [asyncio.create_task(run_monitor(m)) for m in self.monitors.values()]
+        if self.config.aggregate_heartbeats:
+            self._tasks.append(asyncio.create_task(self.heartbeat_loop()))
+        await asyncio.gather(*self._tasks)
+
+    async def heartbeat_loop(self):
+        """Send one batched heartbeat per interval."""
+        last_log = time.monotonic()
+        while self._running:
+            await asyncio.sleep(self.config.health_interval)
+            await self.flush_heartbeats()
+            if time.monotonic() - last_log >= 60:
+                last_log = time.monotonic()
+                logger.info(f"Monitor fleet metrics {self.stats()}")
+
+
+async def main():
+    """Main entry point for the CP Monitor fleet host."""
+    parser = argparse.ArgumentParser(description="EV CP Monitor Fleet Host")
+    parser.add_argument("--fleet-id", type=str, help="Monitor fleet host ID")
+    parser.add_argument("--cp-count", type=int, help="Number of CPs to monitor")
+    parser.add_argument("--cp-start-index", type=int, help="Number of the first CP ID")
+    parser.add_argument("--cp-e-host", type=str, help="CP Engine fleet host")
+    parser.add_argument("--cp-e-port-base", type=int, help="Health port of the first engine")
+    parser.add_argument("--central-host", type=str, help="Central host")
+    parser.add_argument("--central-port", type=int, help="Central HTTP port")
+    parser.add_argument("--log-level", type=str, help="Log level")
+
+    args = parser.parse_args()
+
+    config_dict = {k: v for k, v in vars(args).items() if v is not None and k != 'log_level'}
+    config = CPMonitorFleetConfig(**config_dict)
+
+    log_level = args.log_level if args.log_level else config.log_level
+
+    logger.remove()
+    logger.add(
+        sys.stderr,
+        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <yellow>CP_M_FLEET:{extra[fleet_id]}</yellow> | <level>{message}</level>",
+        level=log_level
+    )
+    logger.configure(extra={"fleet_id": config.fleet_id})
+
+    fleet = CPMonitorFleet(config)
+
+    try:
+        await fleet.start()
+        await fleet.run()
+
+    except KeyboardInterrupt:
+        logger.info("Shutting down...")
+    except Exception as e:
+        logger.error(f"Fatal error: {e}")
+        raise
+    finally:
+        await fleet.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
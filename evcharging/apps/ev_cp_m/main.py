@@ -12,30 +12,76 @@ import asyncio
 import argparse
 import sys
 import signal
+import time
 from datetime import datetime
+from typing import Callable, Optional
 import httpx
 from loguru import logger
 
 from evcharging.common.config import CPMonitorConfig
-from evcharging.common.messages import CPRegistration
-from evcharging.common.utils import utc_now
-from evcharging.common.utils import utc_now
+from evcharging.common.control_client import ControlClient, ControlError
+from evcharging.common.messages import CPRegistration, MonitorHeartbeat
+from evcharging.common.metrics import RollingLatency
+from evcharging.common.utils import utc_now, jittered_backoff
 
 
 class CPMonitor:
-    """Monitor for Charging Point health and connectivity."""
+    """
+    Monitor for Charging Point health and connectivity.
     
-    def __init__(self, config: CPMonitorConfig):
+    Registration, heartbeats and fault reports go over Central's pipelined
+    TCP control channel when ``central_control_port`` is set, on one
+    persistent connection. Otherwise they are POSTed through one pooled
+    httpx client, which reuses a keep-alive (or HTTP/2) connection instead
+    of opening one per request. After a connection error, heartbeats are
+    skipped and notifications wait for a jittered backoff before the next
+    connection attempt.
+    
+    A monitor fleet host (see fleet.py) can pass in a shared client, and a
+    ``heartbeat_sink`` that collects heartbeats for one batched POST instead
+    of sending them one by one.
+    """
+    
+    def __init__(
+        self,
+        config: CPMonitorConfig,
+        http: Optional[httpx.AsyncClient] = None,
+        heartbeat_sink: Optional[Callable[[MonitorHeartbeat], None]] = None
+    ):
         self.config = config
         self.cp_id = config.cp_id
         self.is_healthy = True
         self.fault_simulated = False
         self._running = False
+        self.central_url = f"http://{config.central_host}:{config.central_port}"
+        self.http: Optional[httpx.AsyncClient] = http
+        self._owns_http = http is None
+        self.heartbeat_sink = heartbeat_sink
+        self.control: Optional[ControlClient] = (
+            ControlClient(config.central_host, config.central_control_port)
+            if config.central_control_port else None
+        )
+        self.engine_state: Optional[str] = None
+        self.last_probe_rtt: Optional[float] = None
+        self.heartbeat_rtt = RollingLatency()
+        self.requests_sent = 0
+        self.connections_opened = 0
+        self.request_failures = 0
+        self._failed_attempts = 0
+        self._retry_at = 0.0
+        self._last_metrics_log = time.monotonic()
+        self.probe_rtt = RollingLatency()
+        self.probe_connections = 0
+        self._probe_reader: Optional[asyncio.StreamReader] = None
+        self._probe_writer: Optional[asyncio.StreamWriter] = None
     
     async def start(self):
         """Initialize and start the CP Monitor."""
         logger.info(f"Starting CP Monitor for {self.cp_id}")
         
+        if self._owns_http:
+            self.http = self.create_http_client()
+        
         # Register with Central
         await self.register_with_central()
         
@@ -46,6 +92,143 @@ class CPMonitor:
         """Stop the monitor gracefully."""
         logger.info(f"Stopping CP Monitor: {self.cp_id}")
         self._running = False
+        await self.close_probe()
+        if self.control is not None:
+            await self.control.close()
+        if self.http and self._owns_http:
+            await self.http.aclose()
+            self.http = None
+    
+    def create_http_client(self) -> httpx.AsyncClient:
+        """Create the long-lived, pooled client used for every call to Central."""
+        http2 = self.config.central_http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP/2 requested but the 'h2' package is not installed - using HTTP/1.1 keep-alive")
+                http2 = False
+        
+        return httpx.AsyncClient(
+            base_url=self.central_url,
+            http2=http2,
+            timeout=5.0,
+            limits=httpx.Limits(
+                max_connections=2,
+                max_keepalive_connections=2,
+                keepalive_expiry=self.config.central_keepalive_expiry
+            )
+        )
+    
+    async def _trace(self, event: str, info: dict):
+        """httpcore trace hook: count new TCP connections to Central."""
+        if event == "connection.connect_tcp.complete":
+            self.connections_opened += 1
+    
+    async def post_to_central(self, path: str, payload: dict, wait_for_backoff: bool = True) -> Optional[httpx.Response]:
+        """
+        POST a JSON payload to Central over the pooled connection.
+        
+        Returns None if the request could not be delivered. While backing off
+        after a transport error, the call either waits for the backoff to end
+        or, with ``wait_for_backoff=False``, is skipped.
+        """
+        if not await self._wait_for_retry(wait_for_backoff):
+            return None
+        
+        self.requests_sent += 1
+        try:
+            response = await self.http.post(path, json=payload, extensions={"trace": self._trace})
+        except httpx.TransportError as e:
+            self._record_failure(path, e)
+            return None
+        
+        self._record_success()
+        return response
+    
+    async def send_to_central(
+        self,
+        cmd: str,
+        params: dict,
+        path: str,
+        payload: Optional[dict] = None,
+        wait_for_backoff: bool = True
+    ) -> Optional[bool]:
+        """
+        Deliver one monitor command to Central.
+        
+        Uses the TCP control channel (``cmd`` with ``params``) when one is
+        configured, reconnecting it as needed, and otherwise POSTs
+        ``payload`` (default ``params``) to ``path``. Returns None if Central
+        could not be reached, else whether it accepted the command.
+        """
+        if self.control is None:
+            response = await self.post_to_central(path, payload or params, wait_for_backoff)
+            if response is None:
+                return None
+            if response.status_code != 200:
+                logger.debug(f"Central rejected {path} for {self.cp_id}: {response.status_code} {response.text}")
+            return response.status_code == 200
+        
+        if not await self._wait_for_retry(wait_for_backoff):
+            return None
+        
+        self.requests_sent += 1
+        try:
+            if not self.control.connected:
+                await self.control.connect()
+                self.connections_opened += 1
+            await self.control.request(cmd, **params)
+        except ControlError as e:
+            self._record_success()
+            logger.debug(f"Central rejected {cmd} for {self.cp_id}: {e}")
+            return False
+        except (OSError, asyncio.TimeoutError) as e:
+            await self.control.close()
+            self._record_failure(cmd, e)
+            return None
+        
+        self._record_success()
+        return True
+    
+    async def _wait_for_retry(self, wait_for_backoff: bool) -> bool:
+        """Wait out a pending backoff; returns False if the call should be skipped instead."""
+        delay = self._retry_at - time.monotonic()
+        if delay > 0:
+            if not wait_for_backoff:
+                return False
+            await asyncio.sleep(delay)
+        return True
+    
+    def _record_failure(self, what: str, error: BaseException):
+        self.request_failures += 1
+        self._failed_attempts += 1
+        backoff = jittered_backoff(
+            self._failed_attempts,
+            self.config.reconnect_backoff_base,
+            self.config.reconnect_backoff_max
+        )
+        self._retry_at = time.monotonic() + backoff
+        logger.debug(f"Request to Central {what} failed ({type(error).__name__}), retrying in {backoff:.2f}s")
+    
+    def _record_success(self):
+        self._failed_attempts = 0
+        self._retry_at = 0.0
+    
+    def stats(self) -> dict:
+        """Connection reuse and heartbeat latency metrics."""
+        delivered = self.requests_sent - self.request_failures
+        return {
+            "requests": self.requests_sent,
+            "request_failures": self.request_failures,
+            "connections_opened": self.connections_opened,
+            "connection_reuse_rate": (
+                round(1 - self.connections_opened / delivered, 4) if delivered else None
+            ),
+            "heartbeat_rtt": self.heartbeat_rtt.stats(),
+            "probe_connections": self.probe_connections,
+            "probe_rtt": self.probe_rtt.stats(),
+        }
     
     async def register_with_central(self):
         """Register or authenticate CP with Central with retry logic."""
@@ -55,107 +238,149 @@ class CPMonitor:
             cp_e_port=self.config.cp_e_port
         )
         
-        central_url = f"http://{self.config.central_host}:{self.config.central_port}"
-        
         max_retries = 10
-        retry_delay = 2.0  # Start with 2 seconds
         
         for attempt in range(1, max_retries + 1):
-            try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(
-                        f"{central_url}/cp/register",
-                        json=registration.model_dump(mode='json'),
-                        timeout=5.0
-                    )
-                    
-                    if response.status_code == 200:
-                        logger.info(f"CP {self.cp_id} registered with Central successfully (attempt {attempt})")
-                        return  # Success - exit retry loop
-                    else:
-                        logger.warning(f"Failed to register CP (attempt {attempt}/{max_retries}): {response.status_code} {response.text}")
-
-            except Exception as e:
-                logger.warning(f"Error registering with Central (attempt {attempt}/{max_retries}): {e}")
+            accepted = await self.send_to_central("register", registration.model_dump(mode='json'), "/cp/register")
+            
+            if accepted:
+                logger.info(f"CP {self.cp_id} registered with Central successfully (attempt {attempt})")
+                return  # Success - exit retry loop
+            elif accepted is not None:
+                logger.warning(f"Central rejected CP registration (attempt {attempt}/{max_retries})")
+            else:
+                logger.warning(f"Central unreachable for registration (attempt {attempt}/{max_retries})")
             
             # If not last attempt, wait before retrying
             if attempt < max_retries:
-                logger.debug(f"Retrying registration in {retry_delay} seconds...")
+                retry_delay = jittered_backoff(attempt, self.config.reconnect_backoff_base, self.config.reconnect_backoff_max)
+                logger.debug(f"Retrying registration in {retry_delay:.2f} seconds...")
                 await asyncio.sleep(retry_delay)
-                # Exponential backoff with max 10 seconds
-                retry_delay = min(retry_delay * 1.5, 10.0)
             else:
                 logger.error(f"Failed to register CP {self.cp_id} after {max_retries} attempts - will retry via heartbeat")
 
     async def send_heartbeat(self):
         """Send heartbeat to Central indicating monitor is alive."""
-        central_url = f"http://{self.config.central_host}:{self.config.central_port}"
-        heartbeat = {
-            "cp_id": self.cp_id,
-            "ts": utc_now().isoformat()
-        }
+        heartbeat = MonitorHeartbeat(
+            cp_id=self.cp_id,
+            health_rtt_ms=round(self.last_probe_rtt * 1000, 3) if self.last_probe_rtt is not None else None,
+            engine_state=self.engine_state
+        )
+        if self.heartbeat_sink is not None:
+            # Aggregated by the fleet host into one batched POST
+            self.heartbeat_sink(heartbeat)
+            return
 
-        try:
-            async with httpx.AsyncClient() as client:
-                await client.post(
-                    f"{central_url}/cp/heartbeat",
-                    json=heartbeat,
-                    timeout=5.0
-                )
-        except Exception as e:
-            logger.debug(f"Heartbeat send failed for {self.cp_id}: {e}")
+        start = time.perf_counter()
+        # Heartbeats are periodic; skip rather than queue while backing off
+        accepted = await self.send_to_central(
+            "heartbeat", heartbeat.model_dump(mode='json'), "/cp/heartbeat", wait_for_backoff=False
+        )
+        if accepted:
+            self.heartbeat_rtt.record(time.perf_counter() - start)
+        
+        interval = self.config.metrics_log_interval
+        if interval and time.monotonic() - self._last_metrics_log >= interval:
+            self._last_metrics_log = time.monotonic()
+            logger.info(f"CP {self.cp_id}: connection metrics {self.stats()}")
     
     async def notify_central_fault(self):
         """Notify Central that this CP has a fault."""
-        try:
-            central_url = f"http://{self.config.central_host}:{self.config.central_port}"
-            fault_data = {
-                "cp_id": self.cp_id,
-                "status": "FAULT",
-                "reason": "Health check failures exceeded threshold",
-                "ts": utc_now().isoformat()
-            }
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{central_url}/cp/fault",
-                    json=fault_data,
-                    timeout=5.0
-                )
-                
-                if response.status_code == 200:
-                    logger.info(f"CP {self.cp_id}: Fault notification sent to Central")
-                else:
-                    logger.error(f"Failed to notify Central of fault: {response.status_code}")
+        reason = "Health check failures exceeded threshold"
+        fault_data = {
+            "cp_id": self.cp_id,
+            "status": "FAULT",
+            "reason": reason,
+            "ts": utc_now().isoformat()
+        }
         
-        except Exception as e:
-            logger.error(f"Error notifying Central of fault: {e}")
+        accepted = await self.send_to_central("fault", {"cp_id": self.cp_id, "reason": reason}, "/cp/fault", fault_data)
+        if accepted is None:
+            logger.error("Error notifying Central of fault: Central unreachable")
+        elif accepted:
+            logger.info(f"CP {self.cp_id}: Fault notification sent to Central")
+        else:
+            logger.error("Failed to notify Central of fault: rejected")
     
     async def notify_central_healthy(self):
         """Notify Central that this CP health is restored."""
+        reason = "Health check restored"
+        health_data = {
+            "cp_id": self.cp_id,
+            "status": "HEALTHY",
+            "reason": reason,
+            "ts": utc_now().isoformat()
+        }
+        
+        accepted = await self.send_to_central("healthy", {"cp_id": self.cp_id, "reason": reason}, "/cp/fault", health_data)
+        if accepted is None:
+            logger.error("Error notifying Central of health restoration: Central unreachable")
+        elif accepted:
+            logger.info(f"CP {self.cp_id}: Health restoration notification sent to Central")
+        else:
+            logger.error("Failed to notify Central of health restoration: rejected")
+    
+    async def probe_engine(self) -> bytes:
+        """
+        Send one PING to the CP Engine and return its response line.
+        
+        In persistent mode the probe connection stays open between probes
+        and is only re-established after an error; a timed-out or failed
+        probe closes it so a late reply cannot be read by the next probe.
+        """
+        if not self.config.persistent_probe:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.config.cp_e_host, self.config.cp_e_port),
+                timeout=2.0
+            )
+            self.probe_connections += 1
+            try:
+                start = time.perf_counter()
+                writer.write(b"PING\n")
+                await writer.drain()
+                response = await asyncio.wait_for(reader.readline(), timeout=self.config.probe_timeout)
+            finally:
+                writer.close()
+                await writer.wait_closed()
+            self._record_probe(time.perf_counter() - start, response)
+            return response
+        
+        if self._probe_writer is None or self._probe_writer.is_closing():
+            self._probe_reader, self._probe_writer = await asyncio.wait_for(
+                asyncio.open_connection(self.config.cp_e_host, self.config.cp_e_port),
+                timeout=2.0
+            )
+            self.probe_connections += 1
+        
         try:
-            central_url = f"http://{self.config.central_host}:{self.config.central_port}"
-            health_data = {
-                "cp_id": self.cp_id,
-                "status": "HEALTHY",
-                "reason": "Health check restored",
-                "ts": utc_now().isoformat()
-            }
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{central_url}/cp/fault",
-                    json=health_data,
-                    timeout=5.0
-                )
-                
-                if response.status_code == 200:
-                    logger.info(f"CP {self.cp_id}: Health restoration notification sent to Central")
-                else:
-                    logger.error(f"Failed to notify Central of health restoration: {response.status_code}")
+            start = time.perf_counter()
+            self._probe_writer.write(b"PING\n")
+            await self._probe_writer.drain()
+            response = await asyncio.wait_for(self._probe_reader.readline(), timeout=self.config.probe_timeout)
+            if not response:
+                raise ConnectionResetError("CP Engine closed the health connection")
+        except BaseException:
+            await self.close_probe()
+            raise
         
-        except Exception as e:
-            logger.error(f"Error notifying Central of health restoration: {e}")
+        self._record_probe(time.perf_counter() - start, response)
+        return response
+    
+    def _record_probe(self, rtt: float, response: bytes):
+        self.probe_rtt.record(rtt)
+        self.last_probe_rtt = rtt
+        # Response format: OK:<engine state>
+        self.engine_state = response.decode('utf-8', 'replace').strip().partition(":")[2] or None
+    
+    async def close_probe(self):
+        """Close the persistent probe connection, if open."""
+        writer, self._probe_writer, self._probe_reader = self._probe_writer, None, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
     
     async def health_check_loop(self):
         """Periodically check CP Engine health via TCP."""
@@ -176,22 +401,9 @@ class CPMonitor:
                     await asyncio.sleep(self.config.health_interval)
                     continue
                 
-                # Attempt TCP connection to CP Engine health endpoint
+                # Probe the CP Engine health endpoint
                 try:
-                    reader, writer = await asyncio.wait_for(
-                        asyncio.open_connection(self.config.cp_e_host, self.config.cp_e_port),
-                        timeout=2.0
-                    )
-                    
-                    # Send ping
-                    writer.write(b"PING\n")
-                    await writer.drain()
-                    
-                    # Read response
-                    response = await asyncio.wait_for(reader.read(100), timeout=1.0)
-                    
-                    writer.close()
-                    await writer.wait_closed()
+                    response = await self.probe_engine()
                     
                     if response.startswith(b"OK"):
                         if not self.is_healthy:
@@ -253,6 +465,7 @@ async def main():
     parser.add_argument("--cp-e-port", type=int, help="CP Engine port")
     parser.add_argument("--central-host", type=str, help="Central host")
     parser.add_argument("--central-port", type=int, help="Central HTTP port")
+    parser.add_argument("--central-control-port", type=int, help="Central TCP control port (0 uses HTTP)")
     parser.add_argument("--health-interval", type=float, help="Health check interval (seconds)")
     parser.add_argument("--log-level", type=str, help="Log level")
     
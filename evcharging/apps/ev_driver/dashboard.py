@@ -4,12 +4,19 @@ from datetime import datetime
 from typing import List, Literal, Optional, TYPE_CHECKING
 
 from fastapi import FastAPI, HTTPException, Query, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
+from evcharging.common.geo import parse_lat_lon
+from evcharging.common.snapshot import event_stream
+
 if TYPE_CHECKING:  # pragma: no cover
     from evcharging.apps.ev_driver.main import EVDriver
 
+# Cursor pagination of notifications and session history
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+
 
 class Location(BaseModel):
     address: str
@@ -60,6 +67,7 @@ class SessionSummary(BaseModel):
 
 class SessionHistoryEntry(SessionSummary):
     receipt_url: Optional[str] = None
+    seq: int = Field(default=0, description="Increasing position in the history; cursor for ?after=")
 
 
 class RequestPayload(BaseModel):
@@ -78,6 +86,7 @@ class Notification(BaseModel):
     message: str
     type: Literal["SESSION", "QUEUE", "ALERT"]
     read: bool = False
+    seq: int = Field(default=0, description="Increasing position in the feed; cursor for ?after=")
 
 
 class BroadcastAlert(BaseModel):
@@ -112,15 +121,38 @@ def create_driver_dashboard_app(driver: "EVDriver") -> FastAPI:
         connector_type: Optional[str] = Query(None, description="Filter by connector type"),
         min_power_kw: Optional[float] = Query(None, ge=0, description="Filter by minimum power"),
         only_available: bool = Query(False, description="Return only FREE points"),
+        near: Optional[str] = Query(None, description="Sort by distance from 'lat,lon' (degrees)"),
+        radius_km: Optional[float] = Query(None, gt=0, description="With near: only points within this distance"),
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="Maximum points returned"),
     ):
+        origin = None
+        if near is not None:
+            try:
+                origin = parse_lat_lon(near)
+            except ValueError as e:
+                raise HTTPException(status_code=422, detail=f"Invalid near: {e}")
+        elif radius_km is not None:
+            raise HTTPException(status_code=422, detail="radius_km requires near")
         points = await driver.dashboard_charging_points(
             city=city,
             connector_type=connector_type,
             min_power_kw=min_power_kw,
             only_available=only_available,
+            near=origin,
+            radius_km=radius_km,
+            limit=limit,
         )
         return points
 
+    @app.get("/events")
+    async def events():
+        """Server-Sent Events: CP details and the current session as they change."""
+        return StreamingResponse(
+            event_stream(driver.snapshot),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
     @app.get("/charging-points/{cp_id}", response_model=ChargingPointDetail)
     async def get_charging_point(cp_id: str):
         try:
@@ -164,10 +196,14 @@ def create_driver_dashboard_app(driver: "EVDriver") -> FastAPI:
         return summary
 
     @app.get("/drivers/{driver_id}/sessions/history", response_model=List[SessionHistoryEntry])
-    async def session_history(driver_id: str):
+    async def session_history(
+        driver_id: str,
+        after: int = Query(0, ge=0, description="Return entries with seq greater than this"),
+        limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT, description="Maximum entries returned"),
+    ):
         if driver_id != driver.driver_id:
             raise HTTPException(status_code=404, detail="Driver not found")
-        return await driver.dashboard_session_history()
+        return await driver.dashboard_session_history(after=after, limit=limit)
 
     # ------------------------------------------------------------------
     # Favorites & personalization
@@ -196,10 +232,14 @@ def create_driver_dashboard_app(driver: "EVDriver") -> FastAPI:
     # ------------------------------------------------------------------
 
     @app.get("/drivers/{driver_id}/notifications", response_model=List[Notification])
-    async def list_notifications(driver_id: str):
+    async def list_notifications(
+        driver_id: str,
+        after: int = Query(0, ge=0, description="Return notifications with seq greater than this"),
+        limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT, description="Maximum notifications returned"),
+    ):
         if driver_id != driver.driver_id:
             raise HTTPException(status_code=404, detail="Driver not found")
-        return await driver.dashboard_notifications()
+        return await driver.dashboard_notifications(after=after, limit=limit)
 
     @app.get("/drivers/{driver_id}/alerts", response_model=List[BroadcastAlert])
     async def list_alerts(driver_id: str):
@@ -681,6 +721,8 @@ def create_driver_dashboard_app(driver: "EVDriver") -> FastAPI:
                 let chargingPoints = [];
                 let favorites = new Set();
                 let activeSession = null;
+                // Every CP known from the /events stream, filtered client-side
+                const allPoints = new Map();
                 
                 function showNotification(message, type = 'info') {{
                     const container = document.getElementById('notifications');
@@ -697,25 +739,6 @@ def create_driver_dashboard_app(driver: "EVDriver") -> FastAPI:
                     }}, 5000);
                 }}
                 
-                async function loadChargingPoints() {{
-                    try {{
-                        const response = await fetch('/charging-points');
-                        if (!response.ok) {{
-                            throw new Error(`HTTP error! status: ${{response.status}}`);
-                        }}
-                        const data = await response.json();
-                        console.log('Loaded charging points:', data);
-                        if (!Array.isArray(data)) {{
-                            throw new Error('Expected array of charging points');
-                        }}
-                        chargingPoints = data;
-                        renderChargingPoints();
-                    }} catch (error) {{
-                        console.error('Error loading charging points:', error);
-                        showNotification('Failed to load charging points', 'error');
-                    }}
-                }}
-                
                 async function loadFavorites() {{
                     try {{
                         const response = await fetch(`/drivers/${{driverId}}/favorites`);
@@ -832,7 +855,7 @@ def create_driver_dashboard_app(driver: "EVDriver") -> FastAPI:
                         const data = await response.json();
                         activeSession = data;
                         renderActiveSession();
-                        loadChargingPoints(); // Refresh to update button states
+                        refilter(); // Update button states, keeping the filters
                     }} catch (error) {{
                         console.error('Error loading active session:', error);
                     }}
@@ -986,35 +1009,15 @@ def create_driver_dashboard_app(driver: "EVDriver") -> FastAPI:
                     }}
                 }}
                 
-                async function applyFilters() {{
-                    const city = document.getElementById('filter-city').value;
-                    const connector = document.getElementById('filter-connector').value;
-                    const minPower = document.getElementById('filter-min-power').value;
-                    const status = document.getElementById('filter-status').value;
-                    
-                    const params = new URLSearchParams();
-                    if (city) params.append('city', city);
-                    if (connector) params.append('connector_type', connector);
-                    if (minPower) params.append('min_power_kw', minPower);
-                    if (status === 'FREE') params.append('only_available', 'true');
-                    
-                    try {{
-                        const response = await fetch(`/charging-points?${{params}}`);
-                        if (!response.ok) {{
-                            throw new Error(`HTTP error! status: ${{response.status}}`);
-                        }}
-                        const data = await response.json();
-                        console.log('Filtered charging points:', data);
-                        if (!Array.isArray(data)) {{
-                            throw new Error('Expected array of charging points');
-                        }}
-                        chargingPoints = data;
-                        renderChargingPoints();
-                        showNotification(`Found ${{data.length}} charging points`, 'info');
-                    }} catch (error) {{
-                        console.error('Error applying filters:', error);
-                        showNotification('Error applying filters: ' + error.message, 'error');
-                    }}
+                // Filters run over the points already streamed from /events
+                function refilter() {{
+                    chargingPoints = [...allPoints.values()].filter(matchesFilters);
+                    renderChargingPoints();
+                }}
+                
+                function applyFilters() {{
+                    refilter();
+                    showNotification(`Found ${{chargingPoints.length}} charging points`, 'info');
                 }}
                 
                 function clearFilters() {{
@@ -1022,28 +1025,44 @@ def create_driver_dashboard_app(driver: "EVDriver") -> FastAPI:
                     document.getElementById('filter-connector').value = '';
                     document.getElementById('filter-min-power').value = '';
                     document.getElementById('filter-status').value = '';
-                    loadChargingPoints();
+                    refilter();
                 }}
                 
                 function updateTimestamp() {{
                     document.getElementById('last-update').textContent = new Date().toLocaleTimeString();
                 }}
                 
-                // Initialize
-                loadChargingPoints();
-                loadActiveSession();
-                loadFavorites();
-                updateTimestamp();
-                
-                // Auto-refresh every 2 seconds
-                setInterval(() => {{
-                    loadChargingPoints();
-                    loadActiveSession();
+                // Same rules as the /charging-points query filters
+                function matchesFilters(cp) {{
+                    const city = document.getElementById('filter-city').value;
+                    const connector = document.getElementById('filter-connector').value;
+                    const minPower = document.getElementById('filter-min-power').value;
+                    const status = document.getElementById('filter-status').value;
+                    if (city && cp.location.city.toLowerCase() !== city.toLowerCase()) return false;
+                    if (connector && cp.connector_type.toLowerCase() !== connector.toLowerCase()) return false;
+                    if (minPower && cp.power_kw < parseFloat(minPower)) return false;
+                    if (status === 'FREE' && cp.status !== 'FREE') return false;
+                    return true;
+                }}
+                
+                // Apply a snapshot (replace) or a batch of changed CPs from /events
+                function applyEvent(data, replace) {{
+                    if (replace) allPoints.clear();
+                    data.charging_points.forEach(cp => allPoints.set(cp.cp_id, cp));
+                    refilter();
+                    if (data.charging_points.some(cp => favorites.has(cp.cp_id))) {{
+                        renderFavorites([...allPoints.values()].filter(cp => favorites.has(cp.cp_id)));
+                    }}
+                    activeSession = data.current_session;
+                    renderActiveSession();
                     updateTimestamp();
-                }}, 2000);
+                }}
                 
-                // Refresh favorites every 10 seconds
-                setInterval(loadFavorites, 10000);
+                // Initialize; afterwards the driver pushes only what changed
+                loadFavorites();
+                const events = new EventSource('/events');
+                events.addEventListener('snapshot', e => applyEvent(JSON.parse(e.data), true));
+                events.addEventListener('changes', e => applyEvent(JSON.parse(e.data), false));
             </script>
         </body>
         </html>
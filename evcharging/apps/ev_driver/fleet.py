@@ -0,0 +1,203 @@
+"""
+EV Driver Fleet Host - runs many drivers in a single process.
+
+Responsibilities:
+- Create N headless EVDriver instances on one event loop
+- Share a single Kafka producer between all drivers
+- Consume the driver.updates partitions of its driver IDs once and route
+  each update to its driver by driver_id
+- Run every driver's scripted requests concurrently
+"""
+
+import asyncio
+import argparse
+import random
+import sys
+from loguru import logger
+
+from evcharging.common.config import DriverConfig, DriverFleetConfig, TOPICS
+from evcharging.common.kafka import KafkaProducerHelper, KafkaConsumerHelper, ensure_topics
+from evcharging.common.messages import DriverUpdate
+
+from evcharging.apps.ev_driver.main import EVDriver
+
+
+class DriverFleetHost:
+    """Hosts a fleet of drivers sharing one producer and one consumer."""
+
+    def __init__(self, config: DriverFleetConfig):
+        self.config = config
+        self.producer: KafkaProducerHelper | None = None
+        self.consumer: KafkaConsumerHelper | None = None
+        self.drivers: dict[str, EVDriver] = {}
+        self.routed_updates = 0
+        self.dropped_updates = 0
+        self._running = False
+
+    def driver_ids(self) -> list[str]:
+        """Return the driver IDs hosted by this fleet."""
+        start = self.config.driver_start_index
+        return [
+            f"{self.config.driver_id_prefix}{i:03d}"
+            for i in range(start, start + self.config.driver_count)
+        ]
+
+    def driver_config(self, driver_id: str) -> DriverConfig:
+        """Build the configuration for one hosted driver."""
+        return DriverConfig(
+            driver_id=driver_id,
+            kafka_bootstrap=self.config.kafka_bootstrap,
+            requests_file=self.config.requests_file,
+            request_interval=self.config.request_interval,
+            update_partitions=self.config.update_partitions
+        )
+
+    def create_drivers(self):
+        """Instantiate one driver per driver ID, all bound to the shared producer."""
+        for driver_id in self.driver_ids():
+            self.drivers[driver_id] = EVDriver(self.driver_config(driver_id), producer=self.producer)
+
+    async def start(self):
+        """Start the shared Kafka clients and every hosted driver."""
+        logger.info(f"Starting driver fleet {self.config.fleet_id} with {self.config.driver_count} drivers")
+
+        await ensure_topics(
+            self.config.kafka_bootstrap,
+            list(TOPICS.values()),
+            partitions={TOPICS["DRIVER_UPDATES"]: self.config.update_partitions}
+        )
+
+        self.producer = KafkaProducerHelper(
+            self.config.kafka_bootstrap,
+            linger_ms=self.config.kafka_linger_ms
+        )
+        await self.producer.start()
+
+        self.consumer = KafkaConsumerHelper(
+            self.config.kafka_bootstrap,
+            topics=[TOPICS["DRIVER_UPDATES"]],
+            group_id=f"driver-fleet-{self.config.fleet_id}",
+            auto_offset_reset="latest",
+            value_models={TOPICS["DRIVER_UPDATES"]: DriverUpdate},
+            assign_keys=self.driver_ids()
+        )
+        await self.consumer.start()
+
+        self.create_drivers()
+        await asyncio.gather(*(driver.start() for driver in self.drivers.values()))
+
+        self._running = True
+        logger.info(f"Driver fleet {self.config.fleet_id} started: {len(self.drivers)} drivers")
+
+    async def stop(self):
+        """Stop all drivers, then the shared Kafka clients."""
+        logger.info(f"Stopping driver fleet {self.config.fleet_id}")
+        self._running = False
+
+        await asyncio.gather(
+            *(driver.stop() for driver in self.drivers.values() if driver._running),
+            return_exceptions=True
+        )
+
+        if self.consumer:
+            await self.consumer.stop()
+        if self.producer:
+            await self.producer.stop()
+
+        logger.info(f"Driver fleet {self.config.fleet_id} stopped")
+
+    async def route_update(self, update: DriverUpdate):
+        """Deliver an update to the driver it is addressed to."""
+        driver = self.drivers.get(update.driver_id)
+        if driver is None:
+            self.dropped_updates += 1
+            return  # Shares a partition with our drivers but not hosted here
+        self.routed_updates += 1
+        await driver.handle_update(update)
+
+    async def process_updates(self):
+        """Consume driver.updates once for the whole fleet."""
+        try:
+            async for batch in self.consumer.consume_batches():
+                if not self._running:
+                    break
+                for msg in batch:
+                    try:
+                        await self.route_update(msg["value"])
+                    except Exception as e:
+                        logger.error(f"Error routing update: {e}")
+        except Exception as e:
+            if self._running:
+                logger.error(f"Error in fleet update loop: {e}")
+
+    async def run_requests(self):
+        """Run every driver's scripted requests, staggering their first request."""
+        async def run_driver(driver: EVDriver):
+            await asyncio.sleep(random.uniform(0, self.config.request_jitter))
+            await driver.run_requests()
+
+        await asyncio.gather(*(run_driver(driver) for driver in self.drivers.values()))
+
+    def stats(self) -> dict:
+        return {
+            "drivers": len(self.drivers),
+            "pending_requests": sum(len(d.pending_requests) for d in self.drivers.values()),
+            "completed_requests": sum(d.completed_total for d in self.drivers.values()),
+            "routed_updates": self.routed_updates,
+            "dropped_updates": self.dropped_updates,
+        }
+
+
+async def main():
+    """Main entry point for the driver fleet host."""
+    parser = argparse.ArgumentParser(description="EV Driver Fleet Host")
+    parser.add_argument("--kafka-bootstrap", type=str, help="Kafka bootstrap servers")
+    parser.add_argument("--fleet-id", type=str, help="Fleet host ID")
+    parser.add_argument("--driver-count", type=int, help="Number of drivers to host")
+    parser.add_argument("--driver-start-index", type=int, help="Number of the first driver ID")
+    parser.add_argument("--requests-file", type=str, help="File with CP IDs every driver requests")
+    parser.add_argument("--request-interval", type=float, help="Interval between requests (seconds)")
+    parser.add_argument("--log-level", type=str, help="Log level")
+
+    args = parser.parse_args()
+
+    config_dict = {k: v for k, v in vars(args).items() if v is not None and k != 'log_level'}
+    config = DriverFleetConfig(**config_dict)
+
+    log_level = args.log_level if args.log_level else config.log_level
+
+    logger.remove()
+    logger.add(
+        sys.stderr,
+        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <magenta>DRIVER_FLEET:{extra[fleet_id]}</magenta> | <level>{message}</level>",
+        level=log_level
+    )
+    logger.configure(extra={"fleet_id": config.fleet_id})
+
+    host = DriverFleetHost(config)
+    update_task: asyncio.Task | None = None
+
+    try:
+        await host.start()
+        update_task = asyncio.create_task(host.process_updates(), name="driver-fleet-updates")
+        await host.run_requests()
+        logger.info(f"Driver fleet {config.fleet_id} finished its requests: {host.stats()}")
+        await update_task
+
+    except KeyboardInterrupt:
+        logger.info("Shutting down...")
+    except Exception as e:
+        logger.error(f"Fatal error: {e}")
+        raise
+    finally:
+        if update_task and not update_task.done():
+            update_task.cancel()
+            try:
+                await update_task
+            except asyncio.CancelledError:
+                pass
+        await host.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
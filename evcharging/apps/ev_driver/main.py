@@ -10,10 +10,13 @@ Responsibilities:
 
 import asyncio
 import argparse
+import json
 import sys
+import time
+from collections import deque
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Deque, Dict, List, Optional
 
 import httpx
 from loguru import logger
@@ -22,8 +25,10 @@ from uvicorn import Config, Server
 from evcharging.common.config import DriverConfig, TOPICS
 from evcharging.common.kafka import KafkaProducerHelper, KafkaConsumerHelper, ensure_topics
 from evcharging.common.messages import DriverRequest, DriverUpdate, MessageStatus
+from evcharging.common.ring_store import RingStore
+from evcharging.common.snapshot import DashboardSnapshot
 from evcharging.common.utils import generate_id, utc_now
-from evcharging.common.charging_points import get_metadata
+from evcharging.common.charging_points import ChargingPointRegistry, get_registry
 from evcharging.apps.ev_driver.dashboard import (
     create_driver_dashboard_app,
     ChargingPointDetail,
@@ -35,70 +40,115 @@ from evcharging.apps.ev_driver.dashboard import (
 )
 
 
+def _assign_seq(record, seq: int):
+    record.seq = seq
+
+
 class EVDriver:
-    """Driver client for requesting charging sessions."""
+    """
+    Driver client for requesting charging sessions.
+    
+    Standalone drivers own their Kafka producer and a consumer assigned only
+    the driver.updates partition their driver ID hashes to. When a producer
+    is passed in, the driver is hosted (see fleet.py): it shares that
+    producer, has no consumer or Central sync loop of its own and receives
+    updates through handle_update() from the host.
+    """
     
-    def __init__(self, config: DriverConfig):
+    def __init__(self, config: DriverConfig, producer: KafkaProducerHelper | None = None):
         self.config = config
         self.driver_id = config.driver_id
-        self.producer: KafkaProducerHelper | None = None
+        self.hosted = producer is not None
+        self.producer: KafkaProducerHelper | None = producer
         self.consumer: KafkaConsumerHelper | None = None
         self.pending_requests: dict[str, DriverRequest] = {}
-        self.completed_requests: list[str] = []
+        self.completed_requests: Deque[str] = deque(maxlen=config.history_capacity)
+        self.completed_total = 0
         self.session_state: Dict[str, SessionSummary] = {}
-        self.session_history: List[SessionHistoryEntry] = []
-        self.notifications: List[Notification] = []
+        self.session_history: RingStore[SessionHistoryEntry] = RingStore(
+            config.history_capacity, set_seq=_assign_seq
+        )
+        # Repeated alerts (e.g. a CP still offline on every poll) are stored once
+        self.notifications: RingStore[Notification] = RingStore(
+            config.notification_capacity,
+            dedup_key=lambda note: (note.type, note.message),
+            set_seq=_assign_seq
+        )
         self.alerts: List[BroadcastAlert] = []
         self.favorites: set[str] = set()
         self.charging_points: Dict[str, ChargingPointDetail] = {}
         self._state_lock = asyncio.Lock()
         self._poll_task: Optional[asyncio.Task] = None
         self._dashboard_task: Optional[asyncio.Task] = None
+        self._registry_task: Optional[asyncio.Task] = None
+        # CP metadata; the built-in registry is shared by every driver in the process
+        self.registry = (
+            ChargingPointRegistry(config.cp_registry_file) if config.cp_registry_file else get_registry()
+        )
         self._running = False
         self.central_http_url = config.central_http_url.rstrip("/")
         self.dashboard_port = config.dashboard_port
+        # Last Central snapshot version applied (for /cp/changes)
+        self.central_version: Optional[int] = None
+        self.central_epoch: Optional[str] = None
+        self.central_events_received = 0
+        # Pushed to the dashboard's /events stream
+        self.snapshot = DashboardSnapshot(self._render_cp, self._render_summary)
     
     async def start(self):
         """Initialize and start the driver client."""
         logger.info(f"Starting Driver client: {self.driver_id}")
         
+        self._running = True
+        # Read CP metadata off the event loop; lookups on the loop never load it
+        await asyncio.to_thread(self.registry.load)
+        if self.hosted:
+            return
+        
         # Ensure Kafka topics exist
         await ensure_topics(
             self.config.kafka_bootstrap,
-            list(TOPICS.values())
+            list(TOPICS.values()),
+            partitions={TOPICS["DRIVER_UPDATES"]: self.config.update_partitions}
         )
         
         # Initialize Kafka producer
         self.producer = KafkaProducerHelper(self.config.kafka_bootstrap)
         await self.producer.start()
         
-        # Initialize Kafka consumer for updates
+        # Initialize Kafka consumer for updates, reading only our key's partition
         self.consumer = KafkaConsumerHelper(
             self.config.kafka_bootstrap,
             topics=[TOPICS["DRIVER_UPDATES"]],
             group_id=f"driver-{self.driver_id}",
-            auto_offset_reset="latest"
+            auto_offset_reset="latest",
+            value_models={TOPICS["DRIVER_UPDATES"]: DriverUpdate},
+            assign_keys=[self.driver_id]
         )
         await self.consumer.start()
         
         logger.info(f"Driver {self.driver_id} started successfully")
-        self._running = True
-        self._poll_task = asyncio.create_task(self._poll_central_loop(), name="driver-poll-central")
+        self._poll_task = asyncio.create_task(self._sync_central_loop(), name="driver-sync-central")
+        if self.config.cp_registry_reload_interval > 0:
+            self._registry_task = asyncio.create_task(
+                self.registry.watch(self.config.cp_registry_reload_interval), name="driver-cp-registry"
+            )
     
     async def stop(self):
         """Stop the driver client gracefully."""
         logger.info(f"Stopping Driver: {self.driver_id}")
         self._running = False
-        if self._poll_task and not self._poll_task.done():
-            self._poll_task.cancel()
-            try:
-                await self._poll_task
-            except asyncio.CancelledError:
-                pass
+        for task in (self._poll_task, self._registry_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
         
         if self.consumer:
             await self.consumer.stop()
-        if self.producer:
+        if self.producer and not self.hosted:
             await self.producer.stop()
         
         logger.info(f"Driver {self.driver_id} stopped")
@@ -185,24 +235,26 @@ class EVDriver:
         # Mark as completed if terminal state
         if update.status in {MessageStatus.COMPLETED, MessageStatus.DENIED, MessageStatus.FAILED}:
             self.completed_requests.append(request_id)
+            self.completed_total += 1
             del self.pending_requests[request_id]
     
     async def process_updates(self):
         """Listen for status updates from Central."""
-        async for msg in self.consumer.consume():
-            try:
-                topic = msg["topic"]
-                value = msg["value"]
-                
-                if topic == TOPICS["DRIVER_UPDATES"]:
-                    update = DriverUpdate(**value)
+        async for batch in self.consumer.consume_batches():
+            for msg in batch:
+                try:
+                    topic = msg["topic"]
+                    value = msg["value"]
                     
-                    # Filter by driver ID
-                    if update.driver_id == self.driver_id:
-                        await self.handle_update(update)
-            
-            except Exception as e:
-                logger.error(f"Error processing update: {e}")
+                    if topic == TOPICS["DRIVER_UPDATES"]:
+                        update: DriverUpdate = value
+                        
+                        # Other drivers' keys can share our partition
+                        if update.driver_id == self.driver_id:
+                            await self.handle_update(update)
+                
+                except Exception as e:
+                    logger.error(f"Error processing update: {e}")
     
     async def run_requests(self):
         """Execute charging requests from file."""
@@ -237,34 +289,88 @@ class EVDriver:
                 logger.info(f"Waiting {self.config.request_interval}s before next request...")
                 await asyncio.sleep(self.config.request_interval)
         
-        logger.info(f"✨ All requests completed. Total: {len(self.completed_requests)}/{len(cp_ids)}")
+        logger.info(f"✨ All requests completed. Total: {self.completed_total}/{len(cp_ids)}")
     
     # ------------------------------------------------------------------
     # Dashboard state helpers
     # ------------------------------------------------------------------
 
-    async def _poll_central_loop(self):
-        """Poll EV Central dashboard endpoint to keep CP state fresh."""
-        logger.info("Driver: starting central polling loop")
+    async def _sync_central_loop(self):
+        """Keep CP state fresh: follow Central's /events, else poll /cp/changes."""
+        logger.info("Driver: starting central sync loop")
         async with httpx.AsyncClient(timeout=5.0) as client:
             while self._running:
-                try:
-                    resp = await client.get(f"{self.central_http_url}/cp")
-                    resp.raise_for_status()
-                    payload = resp.json()
-                    await self._update_charging_points(payload.get("charging_points", []))
-                except asyncio.CancelledError:
-                    raise
-                except Exception as exc:
-                    logger.debug(f"Driver: central polling error: {exc}")
-                await asyncio.sleep(1.5)
-        logger.info("Driver: central polling loop stopped")
+                received = self.central_events_received
+                if self.config.central_events:
+                    try:
+                        await self._follow_central_events(client)
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as exc:
+                        logger.debug(f"Driver: central event stream unavailable: {exc}")
+                if self.config.central_events and self.central_events_received > received:
+                    # The stream worked and dropped; reconnect shortly
+                    await asyncio.sleep(1.0)
+                    continue
+                retry_in = self.config.central_events_retry if self.config.central_events else None
+                await self._poll_central_changes(client, retry_in)
+        logger.info("Driver: central sync loop stopped")
+
+    async def _follow_central_events(self, client: httpx.AsyncClient):
+        """Apply Central's SSE snapshot/changes events until the stream ends."""
+        # Central sends a keep-alive every 15 s; a silent stream is dead
+        timeout = httpx.Timeout(5.0, read=45.0)
+        async with client.stream("GET", f"{self.central_http_url}/events", timeout=timeout) as resp:
+            resp.raise_for_status()
+            data: list[str] = []
+            async for line in resp.aiter_lines():
+                if line.startswith("data:"):
+                    data.append(line[5:].lstrip())
+                elif not line and data:
+                    # Both event types carry CP views; snapshot has all of them
+                    await self._apply_central_payload(json.loads("\n".join(data)))
+                    self.central_events_received += 1
+                    data = []
+
+    async def _poll_central_changes(self, client: httpx.AsyncClient, duration: Optional[float] = None):
+        """Poll Central's delta feed, for ``duration`` seconds or until stopped."""
+        deadline = None if duration is None else time.monotonic() + duration
+        while self._running and (deadline is None or time.monotonic() < deadline):
+            try:
+                await self._poll_central_once(client)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.debug(f"Driver: central polling error: {exc}")
+            await asyncio.sleep(self.config.central_poll_interval)
+
+    async def _poll_central_once(self, client: httpx.AsyncClient):
+        # After one full load, fetch only the CPs changed since the last version
+        if self.central_version is not None:
+            resp = await client.get(
+                f"{self.central_http_url}/cp/changes",
+                params={"since": self.central_version, "epoch": self.central_epoch}
+            )
+            resp.raise_for_status()
+            payload = resp.json()
+            if not payload.get("resync"):
+                await self._apply_central_payload(payload)
+                return
+        resp = await client.get(f"{self.central_http_url}/cp")
+        resp.raise_for_status()
+        await self._apply_central_payload(resp.json())
+
+    async def _apply_central_payload(self, payload: dict):
+        await self._update_charging_points(payload.get("charging_points", []))
+        self.central_version, self.central_epoch = payload.get("version"), payload.get("epoch")
 
     async def _update_charging_points(self, central_points: List[dict]):
+        """Apply CP views from Central (the full list or only changed CPs)."""
         async with self._state_lock:
+            changed: Dict[str, tuple[str, dict]] = {}
             for item in central_points:
                 cp_id = item["cp_id"]
-                meta = get_metadata(cp_id)
+                meta = self.registry.get(cp_id)
                 if not meta:
                     continue
                 status = self._map_engine_status(item)
@@ -296,30 +402,42 @@ class EVDriver:
                         10
                     )
                 self.charging_points[cp_id] = detail
+                self.snapshot.mark_changed(cp_id)
+                changed[cp_id] = (status, telemetry)
 
-                energy = telemetry.get("kwh") if telemetry else None
-                cost = telemetry.get("euros") if telemetry else None
-
-                for req_id, summary in list(self.session_state.items()):
-                    if summary.cp_id == cp_id and summary.status == "CHARGING":
+            # One pass over this driver's sessions for all changed CPs
+            sessions_changed = False
+            for req_id, summary in list(self.session_state.items()):
+                if summary.cp_id not in changed:
+                    continue
+                status, telemetry = changed[summary.cp_id]
+                if summary.status == "CHARGING":
+                    energy = telemetry.get("kwh") if telemetry else None
+                    cost = telemetry.get("euros") if telemetry else None
+                    if (energy, cost) != (summary.energy_kwh, summary.cost_eur):
                         self.session_state[req_id] = summary.model_copy(
-                            update={
-                                "energy_kwh": energy,
-                                "cost_eur": cost,
-                            }
+                            update={"energy_kwh": energy, "cost_eur": cost}
                         )
+                        sessions_changed = True
+                elif status == "OFFLINE" and summary.status in {"PENDING", "APPROVED"}:
+                    note = Notification(
+                        notification_id=generate_id("note"),
+                        created_at=utc_now(),
+                        message=f"Charging point {summary.cp_id} is currently offline.",
+                        type="ALERT",
+                        read=False,
+                    )
+                    self.notifications.append(note)
+            if sessions_changed:
+                self.snapshot.mark_summary_changed()
 
-                if status == "OFFLINE":
-                    for summary in self.session_state.values():
-                        if summary.cp_id == cp_id and summary.status in {"PENDING", "APPROVED"}:
-                            note = Notification(
-                                notification_id=generate_id("note"),
-                                created_at=utc_now(),
-                                message=f"Charging point {cp_id} is currently offline.",
-                                type="ALERT",
-                                read=False,
-                            )
-                            self.notifications.append(note)
+    def _render_cp(self, cp_id: str) -> Optional[dict]:
+        cp = self.charging_points.get(cp_id)
+        return cp.model_dump(mode="json") if cp else None
+
+    def _render_summary(self) -> dict:
+        session = self._current_session()
+        return {"current_session": session.model_dump(mode="json") if session else None}
 
     def _map_engine_status(self, point: dict) -> str:
         state = point.get("engine_state")
@@ -336,6 +454,7 @@ class EVDriver:
     async def _record_request_state(self, summary: SessionSummary):
         async with self._state_lock:
             self.session_state[summary.request_id] = summary
+            self.snapshot.mark_summary_changed()
 
     async def _apply_status_update(self, update: DriverUpdate):
         status_map = {
@@ -363,6 +482,7 @@ class EVDriver:
                 }
             )
             self.session_state[update.request_id] = updated
+            self.snapshot.mark_summary_changed()
 
             note = Notification(
                 notification_id=generate_id("note"),
@@ -385,27 +505,55 @@ class EVDriver:
     # ------------------------------------------------------------------
 
     async def dashboard_charging_points(self, **filters) -> List[ChargingPointDetail]:
-        async with self._state_lock:
-            points = list(self.charging_points.values())
+        """
+        Known CPs matching the filters.
+
+        City, connector and power filters are answered from the registry's
+        indexes. With ``near=(lat, lon)`` the CPs are found through the
+        spatial index, nearest first with ``location.distance_km`` set,
+        optionally within ``radius_km``; ``limit`` caps the number returned
+        either way.
+        """
         city = filters.get("city")
         connector_type = filters.get("connector_type")
         min_power_kw = filters.get("min_power_kw")
         only_available = filters.get("only_available")
-        if city:
-            points = [p for p in points if p.location.city.lower() == city.lower()]
-        if connector_type:
-            points = [p for p in points if p.connector_type.lower() == connector_type.lower()]
-        if min_power_kw is not None:
-            points = [p for p in points if p.power_kw >= min_power_kw]
-        if only_available:
-            points = [p for p in points if p.status == "FREE"]
-        return points
+        near = filters.get("near")
+        limit = filters.get("limit")
+        indexed = bool(city or connector_type or min_power_kw is not None)
+        candidates = self.registry.find(city, connector_type, min_power_kw) if indexed else None
+
+        async with self._state_lock:
+            points = self.charging_points
+            if near is None:
+                found = (
+                    (points[cp_id] for cp_id in candidates if cp_id in points)
+                    if candidates is not None else iter(points.values())
+                )
+                return [p for p in found if not only_available or p.status == "FREE"][:limit]
+            allowed = set(candidates) if candidates is not None else None
+            nearest = self.registry.geo_index().nearest(
+                near[0], near[1],
+                k=limit,
+                radius_km=filters.get("radius_km"),
+                predicate=lambda cp_id: (
+                    cp_id in points
+                    and (allowed is None or cp_id in allowed)
+                    and (not only_available or points[cp_id].status == "FREE")
+                )
+            )
+            return [
+                points[cp_id].model_copy(update={
+                    "location": points[cp_id].location.model_copy(update={"distance_km": round(distance, 3)})
+                })
+                for cp_id, distance in nearest
+            ]
 
     async def dashboard_charging_point(self, cp_id: str) -> ChargingPointDetail:
         async with self._state_lock:
             cp = self.charging_points.get(cp_id)
         if not cp:
-            meta = get_metadata(cp_id)
+            meta = self.registry.get(cp_id)
             if not meta:
                 raise KeyError(cp_id)
             cp = ChargingPointDetail(
@@ -432,19 +580,21 @@ class EVDriver:
 
     async def dashboard_current_session(self) -> Optional[SessionSummary]:
         async with self._state_lock:
-            active = [
-                s for s in self.session_state.values()
-                if s.status in {"PENDING", "APPROVED", "CHARGING"}
-            ]
-        return active[0] if active else None
+            return self._current_session()
+
+    def _current_session(self) -> Optional[SessionSummary]:
+        for summary in self.session_state.values():
+            if summary.status in {"PENDING", "APPROVED", "CHARGING"}:
+                return summary
+        return None
 
-    async def dashboard_session_history(self) -> List[SessionHistoryEntry]:
+    async def dashboard_session_history(self, after: int = 0, limit: Optional[int] = None) -> List[SessionHistoryEntry]:
         async with self._state_lock:
-            return list(self.session_history)
+            return self.session_history.page(after, limit)
 
-    async def dashboard_notifications(self) -> List[Notification]:
+    async def dashboard_notifications(self, after: int = 0, limit: Optional[int] = None) -> List[Notification]:
         async with self._state_lock:
-            return list(self.notifications)
+            return self.notifications.page(after, limit)
 
     async def dashboard_alerts(self) -> List[BroadcastAlert]:
         async with self._state_lock:
@@ -474,6 +624,7 @@ class EVDriver:
                 return False
             cancelled = summary.model_copy(update={"status": "CANCELLED", "completed_at": utc_now()})
             self.session_state[request_id] = cancelled
+            self.snapshot.mark_summary_changed()
             self.pending_requests.pop(request_id, None)
             self.notifications.append(
                 Notification(
@@ -493,6 +644,7 @@ class EVDriver:
                 if summary.session_id == session_id:
                     stopped = summary.model_copy(update={"status": "STOPPED", "completed_at": utc_now()})
                     self.session_state[req_id] = stopped
+                    self.snapshot.mark_summary_changed()
                     self.session_history.append(SessionHistoryEntry(**stopped.model_dump(), receipt_url=None))
                     self.notifications.append(
                         Notification(
@@ -1,11 +1,35 @@
 """
-Static metadata for charging points used by driver dashboards.
+Charging point metadata registry used by driver dashboards.
 
-In a full deployment this would come from an asset registry service.
+Metadata is loaded from a CSV or JSON Lines file (by default the built-in
+data/charging_points.csv), kept column-wise in memory with indexes on city,
+connector type, power and location, and can be reloaded while the service
+runs. Services load and reload it in a worker thread; lookups made on the
+event loop never read the file.
 """
 
+import asyncio
+import csv
+import json
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from loguru import logger
+
+from evcharging.common.geo import GeoIndex
+
+DEFAULT_REGISTRY_FILE = Path(__file__).parent / "data" / "charging_points.csv"
+
+# Lower bounds (kW) of the power_kw index buckets
+POWER_BUCKETS = (0.0, 11.0, 22.0, 50.0, 150.0, 350.0)
+
+REQUIRED_FIELDS = ("cp_id", "name", "address", "city", "latitude", "longitude", "connector_type", "power_kw")
 
 
 @dataclass(frozen=True)
@@ -21,121 +45,281 @@ class ChargingPointMetadata:
     amenities: List[str]
 
 
-METADATA: Dict[str, ChargingPointMetadata] = {
-    "CP-001": ChargingPointMetadata(
-        cp_id="CP-001",
-        name="Central Plaza A1",
-        address="123 Main St",
-        city="Metropolis",
-        latitude=40.7128,
-        longitude=-74.0060,
-        connector_type="Type 2",
-        power_kw=22.0,
-        amenities=["Restrooms", "Coffee", "WiFi"],
-    ),
-    "CP-002": ChargingPointMetadata(
-        cp_id="CP-002",
-        name="Harbor Fast Charge",
-        address="5 Harbor Ave",
-        city="Metropolis",
-        latitude=40.7000,
-        longitude=-74.0100,
-        connector_type="CCS",
-        power_kw=150.0,
-        amenities=["24/7", "Restrooms"],
-    ),
-    "CP-003": ChargingPointMetadata(
-        cp_id="CP-003",
-        name="Airport Lot C",
-        address="Airport Rd",
-        city="Metropolis",
-        latitude=40.6890,
-        longitude=-74.1745,
-        connector_type="Type 2",
-        power_kw=11.0,
-        amenities=["Parking", "Security"],
-    ),
-    "CP-004": ChargingPointMetadata(
-        cp_id="CP-004",
-        name="Shopping Mall West",
-        address="789 Retail Blvd",
-        city="Metropolis",
-        latitude=40.7200,
-        longitude=-74.0200,
-        connector_type="CCS",
-        power_kw=50.0,
-        amenities=["Shopping", "Restaurants", "WiFi"],
-    ),
-    "CP-005": ChargingPointMetadata(
-        cp_id="CP-005",
-        name="Downtown Garage B",
-        address="42 Park St",
-        city="Metropolis",
-        latitude=40.7150,
-        longitude=-74.0080,
-        connector_type="Type 2",
-        power_kw=22.0,
-        amenities=["Covered", "24/7", "Security"],
-    ),
-    "CP-006": ChargingPointMetadata(
-        cp_id="CP-006",
-        name="Highway Rest Stop",
-        address="Mile 45 Interstate",
-        city="Metropolis",
-        latitude=40.6800,
-        longitude=-74.1500,
-        connector_type="CCS",
-        power_kw=150.0,
-        amenities=["24/7", "Restrooms", "Vending"],
-    ),
-    "CP-007": ChargingPointMetadata(
-        cp_id="CP-007",
-        name="University Campus",
-        address="100 College Ave",
-        city="Metropolis",
-        latitude=40.7300,
-        longitude=-74.0300,
-        connector_type="Type 2",
-        power_kw=11.0,
-        amenities=["Student Access", "WiFi"],
-    ),
-    "CP-008": ChargingPointMetadata(
-        cp_id="CP-008",
-        name="Tech Park North",
-        address="250 Innovation Dr",
-        city="Metropolis",
-        latitude=40.7400,
-        longitude=-74.0400,
-        connector_type="CCS",
-        power_kw=50.0,
-        amenities=["Business Hours", "WiFi"],
-    ),
-    "CP-009": ChargingPointMetadata(
-        cp_id="CP-009",
-        name="Sports Arena",
-        address="500 Stadium Way",
-        city="Metropolis",
-        latitude=40.7050,
-        longitude=-74.0150,
-        connector_type="Type 2",
-        power_kw=22.0,
-        amenities=["Event Parking", "Restrooms"],
-    ),
-    "CP-010": ChargingPointMetadata(
-        cp_id="CP-010",
-        name="Beachfront Plaza",
-        address="1 Ocean Drive",
-        city="Metropolis",
-        latitude=40.6700,
-        longitude=-74.0050,
-        connector_type="CCS",
-        power_kw=150.0,
-        amenities=["Scenic View", "24/7", "Restrooms"],
-    ),
-}
+def _power_bucket(power_kw: float) -> int:
+    return max(0, bisect_right(POWER_BUCKETS, power_kw) - 1)
+
+
+class _RegistryData:
+    """
+    One immutable load of the registry file, stored column-wise.
+
+    Rows are numbered in file order. Strings that repeat across rows (city,
+    connector type, amenity lists) are shared, and coordinates and power
+    are kept in float arrays, so 100k CPs cost a few hundred bytes each
+    rather than one dataclass and several lists per CP. The GeoIndex is
+    built with the rest, in the thread doing the load.
+    """
+
+    def __init__(self, rows: Iterable[dict], source: str):
+        self.source = source
+        self.cp_ids: List[str] = []
+        self.names: List[str] = []
+        self.addresses: List[str] = []
+        self.cities: List[str] = []
+        self.connector_types: List[str] = []
+        # Lower-cased index keys per row, for checking filters row by row
+        self.city_keys: List[str] = []
+        self.connector_keys: List[str] = []
+        self.amenities: List[Tuple[str, ...]] = []
+        self.latitudes = array("d")
+        self.longitudes = array("d")
+        self.power_kw = array("d")
+        self.rows: Dict[str, int] = {}
+        self.by_city: Dict[str, List[int]] = {}
+        self.by_connector: Dict[str, List[int]] = {}
+        self.by_power: Dict[int, List[int]] = {}
+
+        shared: Dict[object, object] = {}
+        for line, row in enumerate(rows, 1):
+            missing = [f for f in REQUIRED_FIELDS if row.get(f) in (None, "")]
+            if missing:
+                raise ValueError(f"{source}: row {line} is missing {', '.join(missing)}")
+            cp_id = str(row["cp_id"])
+            if cp_id in self.rows:
+                raise ValueError(f"{source}: row {line} repeats cp_id {cp_id}")
+            try:
+                latitude, longitude = float(row["latitude"]), float(row["longitude"])
+                power_kw = float(row["power_kw"])
+            except (TypeError, ValueError):
+                raise ValueError(f"{source}: row {line} has a non-numeric latitude, longitude or power_kw")
+            amenities = row.get("amenities") or ()
+            if isinstance(amenities, str):
+                amenities = [a.strip() for a in amenities.split(";") if a.strip()]
+            city = str(row["city"])
+            connector_type = str(row["connector_type"])
+
+            index = len(self.cp_ids)
+            self.rows[cp_id] = index
+            self.cp_ids.append(cp_id)
+            self.names.append(str(row["name"]))
+            self.addresses.append(str(row["address"]))
+            self.cities.append(shared.setdefault(city, city))
+            self.connector_types.append(shared.setdefault(connector_type, connector_type))
+            amenities = tuple(amenities)
+            self.amenities.append(shared.setdefault(amenities, amenities))
+            self.latitudes.append(latitude)
+            self.longitudes.append(longitude)
+            self.power_kw.append(power_kw)
+            city_key = shared.setdefault(("city", city), city.lower())
+            connector_key = shared.setdefault(("connector", connector_type), connector_type.lower())
+            self.city_keys.append(city_key)
+            self.connector_keys.append(connector_key)
+            self.by_city.setdefault(city_key, []).append(index)
+            self.by_connector.setdefault(connector_key, []).append(index)
+            self.by_power.setdefault(_power_bucket(power_kw), []).append(index)
+        self.geo_index = GeoIndex(zip(self.cp_ids, self.latitudes, self.longitudes))
+
+    def __len__(self) -> int:
+        return len(self.cp_ids)
+
+    def metadata(self, index: int) -> ChargingPointMetadata:
+        return ChargingPointMetadata(
+            cp_id=self.cp_ids[index],
+            name=self.names[index],
+            address=self.addresses[index],
+            city=self.cities[index],
+            latitude=self.latitudes[index],
+            longitude=self.longitudes[index],
+            connector_type=self.connector_types[index],
+            power_kw=self.power_kw[index],
+            amenities=list(self.amenities[index]),
+        )
+
+
+_NOT_LOADED = _RegistryData((), "<not loaded>")
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def _read_rows(path: Path) -> Iterator[dict]:
+    """Stream the rows of a CSV file, or of a JSON Lines file (.jsonl / .ndjson)."""
+    with path.open(newline="", encoding="utf-8") as f:
+        if path.suffix.lower() in {".jsonl", ".ndjson"}:
+            yield from (json.loads(line) for line in f if line.strip())
+        else:
+            yield from csv.DictReader(f)
+
+
+class ChargingPointRegistry:
+    """
+    Charging point metadata loaded from a file, with secondary indexes.
+
+    Nothing is read until ``load()`` or the first lookup made outside an
+    event loop. On the event loop, lookups before the load has finished see
+    an empty registry instead of blocking on the file, so services call
+    ``load()`` through ``asyncio.to_thread`` (``watch()`` does) at startup.
+    ``reload()`` builds a complete new _RegistryData, GeoIndex included,
+    and then replaces the current one with a single assignment, so lookups
+    running meanwhile see either the old or the new file, never a mix. A
+    failed reload keeps the previous data.
+    """
+
+    def __init__(self, path: Union[str, Path, None] = None):
+        self.path = Path(path) if path else DEFAULT_REGISTRY_FILE
+        self._data: Optional[_RegistryData] = None
+        self._load_lock = threading.Lock()
+        self._file_stamp: Optional[Tuple[int, int]] = None
+        self.loads = 0
+        self.load_ms = 0.0
+
+    def __len__(self) -> int:
+        return len(self._loaded())
+
+    def __contains__(self, cp_id: str) -> bool:
+        return cp_id in self._loaded().rows
+
+    def get(self, cp_id: str) -> Optional[ChargingPointMetadata]:
+        """Metadata for a charging point, if it is in the registry."""
+        data = self._loaded()
+        index = data.rows.get(cp_id)
+        return None if index is None else data.metadata(index)
+
+    def cp_ids(self) -> List[str]:
+        return list(self._loaded().cp_ids)
+
+    def find(
+        self,
+        city: Optional[str] = None,
+        connector_type: Optional[str] = None,
+        min_power_kw: Optional[float] = None
+    ) -> List[str]:
+        """
+        IDs of CPs matching every given filter (case-insensitive), in file order.
+
+        Starts from the smallest matching index list and checks the other
+        filters against the columns, so the cost follows the most selective
+        filter rather than the registry size.
+        """
+        data = self._loaded()
+        # (rows matching, file-ordered rows, per-row check) for each given filter
+        options = []
+        if city:
+            city_key = city.lower()
+            rows = data.by_city.get(city_key, [])
+            options.append((len(rows), lambda rows=rows: rows, lambda i: data.city_keys[i] == city_key))
+        if connector_type:
+            connector_key = connector_type.lower()
+            rows = data.by_connector.get(connector_key, [])
+            options.append((len(rows), lambda rows=rows: rows, lambda i: data.connector_keys[i] == connector_key))
+        if min_power_kw is not None:
+            power = data.power_kw
+            first = _power_bucket(min_power_kw)
+            buckets = [rows for bucket, rows in data.by_power.items() if bucket >= first]
+            options.append((
+                sum(map(len, buckets)),
+                lambda: sorted(i for rows in buckets for i in rows if power[i] >= min_power_kw),
+                lambda i: power[i] >= min_power_kw,
+            ))
+        if not options:
+            return list(data.cp_ids)
+
+        options.sort(key=lambda option: option[0])
+        checks = [check for _, _, check in options[1:]]
+        return [data.cp_ids[i] for i in options[0][1]() if all(check(i) for check in checks)]
+
+    def geo_index(self) -> GeoIndex:
+        """Spatial index over all CP locations, built with each load."""
+        return self._loaded().geo_index
+
+    def load(self):
+        """Read the registry file if it has not been loaded yet."""
+        self._loaded()
+
+    def reload(self) -> bool:
+        """Re-read the file and swap it in; returns False (keeping the old data) on error."""
+        try:
+            data = self._read()
+        except (OSError, ValueError) as e:
+            logger.error(f"CP registry reload from {self.path} failed: {e}")
+            return False
+        self._data = data
+        logger.info(f"CP registry reloaded: {len(data)} charging points from {self.path}")
+        return True
+
+    def reload_if_changed(self) -> bool:
+        """Reload if the file's size or modification time changed since the last load."""
+        if self._data is None:
+            return False  # Not loaded yet; the first lookup reads the current file
+        try:
+            if self._stamp() == self._file_stamp:
+                return False
+        except OSError:
+            return False
+        return self.reload()
+
+    async def watch(self, interval: float):
+        """Load the file in a worker thread, then hot-reload it whenever it changes."""
+        await asyncio.to_thread(self.load)
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self.reload_if_changed)
+
+    def stats(self) -> dict:
+        return {
+            "path": str(self.path),
+            "loaded": self._data is not None,
+            "charging_points": len(self._data) if self._data is not None else 0,
+            "loads": self.loads,
+            "load_ms": round(self.load_ms, 1),
+        }
+
+    def _loaded(self) -> _RegistryData:
+        data = self._data
+        if data is None:
+            if _on_event_loop():
+                return _NOT_LOADED
+            with self._load_lock:
+                if self._data is None:
+                    self._data = self._read()
+                data = self._data
+        return data
+
+    def _read(self) -> _RegistryData:
+        start = time.perf_counter()
+        stamp = self._stamp()
+        data = _RegistryData(_read_rows(self.path), str(self.path))
+        self._file_stamp = stamp
+        self.loads += 1
+        self.load_ms = (time.perf_counter() - start) * 1e3
+        return data
+
+    def _stamp(self) -> Tuple[int, int]:
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+
+_default_registry: Optional[ChargingPointRegistry] = None
+
+
+def get_registry() -> ChargingPointRegistry:
+    """The registry for the built-in data file (loaded on first lookup)."""
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = ChargingPointRegistry()
+    return _default_registry
 
 
 def get_metadata(cp_id: str) -> Optional[ChargingPointMetadata]:
     """Return metadata for a charging point, if available."""
-    return METADATA.get(cp_id)
+    return get_registry().get(cp_id)
+
 
+def get_geo_index() -> GeoIndex:
+    """Spatial index over all charging point locations."""
+    return get_registry().geo_index()
@@ -15,6 +15,24 @@ class CentralConfig(BaseSettings):
     http_port: int = Field(default=8000, description="HTTP dashboard port")
     kafka_bootstrap: str = Field(default="kafka:9092", description="Kafka bootstrap servers")
     db_url: Optional[str] = Field(default=None, description="Database URL (optional)")
+    db_write_behind: bool = Field(default=True, description="Queue DB writes for a background writer thread")
+    db_batch_size: int = Field(default=500, description="Maximum rows per write-behind commit")
+    db_flush_interval_ms: int = Field(default=50, description="Maximum delay before queued rows are committed (ms)")
+    db_queue_size: int = Field(default=10000, description="Queued DB writes allowed before energy and health rows are dropped")
+    session_flush_interval: float = Field(default=5.0, description="Interval for flushing coalesced session energy (seconds)")
+    monitor_timeout: float = Field(default=5.0, description="Seconds without a monitor heartbeat before the CP is marked DISCONNECTED")
+    liveness_tick: float = Field(default=0.5, description="Interval for expiring timed-out monitor heartbeats (seconds)")
+    change_log_size: int = Field(default=10000, description="CPs tracked in the GET /cp/changes log before clients of older versions must resync")
+    events_coalesce_ms: int = Field(default=100, description="Minimum delay between pushes on one /events stream; changes in between are merged (ms)")
+    dispatcher_workers: int = Field(default=8, description="Worker coroutines processing messages, sharded by cp_id")
+    dispatcher_queue_size: int = Field(default=1000, description="Queued messages per dispatcher worker")
+    command_partitions: int = Field(default=16, description="Partitions of central.commands; engines read only those their CP IDs hash to")
+    update_partitions: int = Field(default=16, description="Partitions of driver.updates; drivers read only those their driver IDs hash to")
+    consume_batch_size: int = Field(default=500, description="Maximum Kafka records fetched per wakeup")
+    consume_batch_timeout_ms: int = Field(default=100, description="Maximum wait for a Kafka batch (ms)")
+    kafka_linger_ms: int = Field(default=0, description="Producer linger time before sending a batch (ms)")
+    kafka_max_batch_size: int = Field(default=16384, description="Producer maximum batch size per partition (bytes)")
+    kafka_compression: Optional[str] = Field(default=None, description="Producer compression (gzip, snappy, lz4, zstd)")
     log_level: str = Field(default="INFO", description="Logging level")
     
     model_config = SettingsConfigDict(
@@ -35,6 +53,11 @@ class CPEngineConfig(BaseSettings):
     telemetry_interval: float = Field(default=1.0, description="Telemetry emission interval (seconds)")
     kw_rate: float = Field(default=22.0, description="Power delivery rate in kW")
     euro_rate: float = Field(default=0.30, description="Cost per kWh in euros")
+    telemetry_codec: str = Field(default="json", description="Codec for cp.telemetry records (json, msgpack, struct-telemetry)")
+    command_partitions: int = Field(default=16, description="Partitions of central.commands; engines read only those their CP IDs hash to")
+    kafka_linger_ms: int = Field(default=0, description="Producer linger time before sending a batch (ms)")
+    kafka_max_batch_size: int = Field(default=16384, description="Producer maximum batch size per partition (bytes)")
+    kafka_compression: Optional[str] = Field(default=None, description="Producer compression (gzip, snappy, lz4, zstd)")
     
     model_config = SettingsConfigDict(
         env_prefix="CP_ENGINE_",
@@ -44,6 +67,34 @@ class CPEngineConfig(BaseSettings):
     )
 
 
+class CPFleetConfig(BaseSettings):
+    """Configuration for the CP fleet host (many CP Engines in one process)."""
+    
+    fleet_id: str = Field(default="fleet-1", description="Fleet host ID (used for the consumer group)")
+    kafka_bootstrap: str = Field(default="kafka:9092", description="Kafka bootstrap servers")
+    cp_count: int = Field(default=100, description="Number of CP Engines to host")
+    cp_id_prefix: str = Field(default="CP-", description="Prefix for generated CP IDs")
+    cp_start_index: int = Field(default=1, description="Number of the first generated CP ID")
+    health_port_base: int = Field(default=0, description="First health check port, one per CP (0 disables health servers)")
+    log_level: str = Field(default="INFO", description="Logging level")
+    telemetry_interval: float = Field(default=1.0, description="Telemetry emission interval (seconds)")
+    kw_rate: float = Field(default=22.0, description="Power delivery rate in kW")
+    euro_rate: float = Field(default=0.30, description="Cost per kWh in euros")
+    telemetry_codec: str = Field(default="json", description="Codec for cp.telemetry records (json, msgpack, struct-telemetry)")
+    command_partitions: int = Field(default=16, description="Partitions of central.commands; engines read only those their CP IDs hash to")
+    command_workers: int = Field(default=8, description="Concurrent command handler shards")
+    kafka_linger_ms: int = Field(default=5, description="Producer linger time before sending a batch (ms)")
+    kafka_max_batch_size: int = Field(default=65536, description="Producer maximum batch size per partition (bytes)")
+    kafka_compression: Optional[str] = Field(default=None, description="Producer compression (gzip, snappy, lz4, zstd)")
+    
+    model_config = SettingsConfigDict(
+        env_prefix="CP_FLEET_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore"
+    )
+
+
 class CPMonitorConfig(BaseSettings):
     """Configuration for CP Monitor service."""
     
@@ -52,8 +103,16 @@ class CPMonitorConfig(BaseSettings):
     cp_e_port: int = Field(default=8001, description="CP Engine port")
     central_host: str = Field(default="localhost", description="Central host")
     central_port: int = Field(default=8000, description="Central HTTP port")
+    central_control_port: int = Field(default=9999, description="Central TCP control port for register/heartbeat/fault on one pipelined connection (0 uses HTTP)")
     health_interval: float = Field(default=1.0, description="Health check interval (seconds)")
     log_level: str = Field(default="INFO", description="Logging level")
+    persistent_probe: bool = Field(default=True, description="Keep one health probe connection open to the CP Engine")
+    probe_timeout: float = Field(default=1.0, description="Health probe response timeout (seconds)")
+    central_http2: bool = Field(default=False, description="Use HTTP/2 to Central (requires the h2 package)")
+    central_keepalive_expiry: float = Field(default=30.0, description="Idle time before the pooled Central connection is closed (seconds)")
+    reconnect_backoff_base: float = Field(default=0.5, description="Initial reconnect backoff to Central (seconds, jittered)")
+    reconnect_backoff_max: float = Field(default=10.0, description="Maximum reconnect backoff to Central (seconds)")
+    metrics_log_interval: float = Field(default=60.0, description="Interval between connection/RTT metric log lines (seconds, 0 disables)")
     
     model_config = SettingsConfigDict(
         env_prefix="CP_MONITOR_",
@@ -63,6 +122,33 @@ class CPMonitorConfig(BaseSettings):
     )
 
 
+class CPMonitorFleetConfig(BaseSettings):
+    """Configuration for the CP Monitor fleet host (many monitors in one process)."""
+    
+    fleet_id: str = Field(default="monitors-1", description="Monitor fleet host ID")
+    cp_count: int = Field(default=100, description="Number of CPs to monitor")
+    cp_id_prefix: str = Field(default="CP-", description="Prefix for generated CP IDs")
+    cp_start_index: int = Field(default=1, description="Number of the first generated CP ID")
+    cp_e_host: str = Field(default="localhost", description="Host of the CP Engine fleet")
+    cp_e_port_base: int = Field(default=9000, description="Health port of the first engine; engine i uses base + i")
+    central_host: str = Field(default="localhost", description="Central host")
+    central_port: int = Field(default=8000, description="Central HTTP port")
+    central_connections: int = Field(default=8, description="Pooled HTTP connections to Central shared by all monitors")
+    health_interval: float = Field(default=1.0, description="Health check and heartbeat interval (seconds)")
+    aggregate_heartbeats: bool = Field(default=True, description="Send one batched heartbeat per interval instead of one per CP")
+    heartbeat_batch_max: int = Field(default=5000, description="Maximum heartbeats per batched POST")
+    persistent_probe: bool = Field(default=True, description="Keep one health probe connection open per engine")
+    probe_timeout: float = Field(default=1.0, description="Health probe response timeout (seconds)")
+    log_level: str = Field(default="INFO", description="Logging level")
+    
+    model_config = SettingsConfigDict(
+        env_prefix="CP_MONITOR_FLEET_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore"
+    )
+
+
 class DriverConfig(BaseSettings):
     """Configuration for Driver client."""
     
@@ -73,6 +159,14 @@ class DriverConfig(BaseSettings):
     log_level: str = Field(default="INFO", description="Logging level")
     dashboard_port: int = Field(default=8100, description="HTTP dashboard port")
     central_http_url: str = Field(default="http://localhost:8000", description="EV Central HTTP base URL")
+    central_events: bool = Field(default=True, description="Follow Central's /events stream instead of polling")
+    central_events_retry: float = Field(default=30.0, description="Polling period before retrying an unavailable /events stream (seconds)")
+    central_poll_interval: float = Field(default=1.5, description="Interval for polling /cp/changes when not streaming (seconds)")
+    update_partitions: int = Field(default=16, description="Partitions of driver.updates; drivers read only those their driver IDs hash to")
+    notification_capacity: int = Field(default=200, description="Notifications kept; older ones are dropped")
+    history_capacity: int = Field(default=500, description="Finished sessions (and completed request IDs) kept; older ones are dropped")
+    cp_registry_file: Optional[str] = Field(default=None, description="CSV or JSON Lines file with CP metadata (built-in list if unset)")
+    cp_registry_reload_interval: float = Field(default=30.0, description="Interval for checking the CP registry file for changes (seconds, 0 disables)")
     
     model_config = SettingsConfigDict(
         env_prefix="DRIVER_",
@@ -82,6 +176,29 @@ class DriverConfig(BaseSettings):
     )
 
 
+class DriverFleetConfig(BaseSettings):
+    """Configuration for the driver fleet host (many drivers in one process)."""
+    
+    fleet_id: str = Field(default="drivers-1", description="Fleet host ID (used for the consumer group)")
+    kafka_bootstrap: str = Field(default="kafka:9092", description="Kafka bootstrap servers")
+    driver_count: int = Field(default=100, description="Number of drivers to host")
+    driver_id_prefix: str = Field(default="driver-", description="Prefix for generated driver IDs")
+    driver_start_index: int = Field(default=1, description="Number of the first generated driver ID")
+    requests_file: Optional[str] = Field(default=None, description="File with CP IDs every hosted driver requests")
+    request_interval: float = Field(default=4.0, description="Interval between requests (seconds)")
+    request_jitter: float = Field(default=1.0, description="Random delay before each driver's first request (seconds)")
+    update_partitions: int = Field(default=16, description="Partitions of driver.updates; drivers read only those their driver IDs hash to")
+    kafka_linger_ms: int = Field(default=5, description="Producer linger time before sending a batch (ms)")
+    log_level: str = Field(default="INFO", description="Logging level")
+    
+    model_config = SettingsConfigDict(
+        env_prefix="DRIVER_FLEET_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore"
+    )
+
+
 # Kafka topic names
 TOPICS = {
     "CENTRAL_COMMANDS": "central.commands",
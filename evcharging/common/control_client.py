@@ -0,0 +1,136 @@
+"""
+Client for the EV Central TCP control channel.
+
+Keeps one persistent connection to Central's TCPControlServer and
+pipelines framed JSON requests over it. Each request gets an id; a reader
+task matches responses back to the waiting callers, so many requests can
+be in flight at once.
+"""
+
+import asyncio
+import itertools
+import json
+from typing import Any, Optional
+from loguru import logger
+
+from evcharging.common.framing import FrameParser, frame_message
+from evcharging.common.messages import CPRegistration
+
+
+class ControlError(RuntimeError):
+    """Raised when Central rejects a control request."""
+
+
+class ControlClient:
+    """Pipelined request/response client for the TCP control plane."""
+
+    def __init__(self, host: str, port: int, timeout: float = 5.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._pending: dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self):
+        """Open the connection and start matching responses."""
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port),
+            timeout=self.timeout
+        )
+        self._reader_task = asyncio.create_task(self._read_responses())
+        logger.debug(f"Control channel connected to {self.host}:{self.port}")
+
+    async def close(self):
+        """Close the connection and fail any requests still in flight."""
+        if self._reader_task:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+            self._reader_task = None
+        if self._writer:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
+            self._writer = None
+        self._fail_pending(ConnectionError("Control channel closed"))
+
+    async def request(self, cmd: str, **params: Any) -> dict:
+        """
+        Send one command and wait for its result.
+
+        Raises:
+            ControlError: Central rejected the request
+            ConnectionError: The channel is not connected or was lost
+            asyncio.TimeoutError: No response within ``timeout``
+        """
+        if not self.connected:
+            raise ConnectionError("Control channel not connected")
+
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            self._writer.write(frame_message(json.dumps({"id": request_id, "cmd": cmd, **params})))
+            await self._writer.drain()
+            response = await asyncio.wait_for(future, timeout=self.timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+        if not response.get("ok"):
+            raise ControlError(response.get("error", "Request failed"))
+        return response.get("result", {})
+
+    async def register(self, registration: CPRegistration) -> dict:
+        return await self.request("register", **registration.model_dump(mode='json'))
+
+    async def heartbeat(self, cp_id: str) -> dict:
+        return await self.request("heartbeat", cp_id=cp_id)
+
+    async def fault(self, cp_id: str, reason: str) -> dict:
+        return await self.request("fault", cp_id=cp_id, reason=reason)
+
+    async def healthy(self, cp_id: str, reason: str = "") -> dict:
+        return await self.request("healthy", cp_id=cp_id, reason=reason)
+
+    async def query(self, cp_id: Optional[str] = None) -> list[dict]:
+        params = {"cp_id": cp_id} if cp_id else {}
+        return (await self.request("query", **params))["charging_points"]
+
+    async def _read_responses(self):
+        parser = FrameParser()
+        try:
+            while True:
+                data = await self._reader.read(64 * 1024)
+                if not data:
+                    break
+                parser.feed(data)
+                for message in parser.messages():
+                    try:
+                        response = json.loads(message)
+                        future = self._pending.get(response.get("id"))
+                    except (ValueError, AttributeError):
+                        logger.warning(f"Malformed control response: {message[:100]}")
+                        continue
+                    if future is not None and not future.done():
+                        future.set_result(response)
+        except ConnectionError as e:
+            logger.debug(f"Control channel lost: {e}")
+        self._fail_pending(ConnectionError("Control channel lost"))
+        if self._writer:
+            self._writer.close()
+
+    def _fail_pending(self, error: Exception):
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
@@ -1,29 +1,299 @@
 """
 Database persistence layer for fault history and events.
 Uses SQLite for simplicity and portability.
+
+Writes can optionally go through a write-behind queue that is drained by a
+dedicated thread, so callers on the asyncio loop never wait for fsync.
 """
 
+import queue
 import sqlite3
+import threading
+import time
 from datetime import datetime
-from typing import List, Optional, Dict
+from itertools import groupby
+from typing import List, Optional, Dict, Any
 from contextlib import contextmanager
 from pathlib import Path
 
+from loguru import logger
+
 from evcharging.common.utils import utc_now
 
 
+class _FlushMarker:
+    """Queue marker that is signalled once every earlier write is committed."""
+    
+    def __init__(self):
+        self.event = threading.Event()
+
+
+_STOP = object()
+
+
+class WriteBehindWriter:
+    """
+    Background SQLite writer draining a queue of statements.
+    
+    A single long-lived WAL-mode connection is owned by the writer thread.
+    Rows are committed with ``executemany`` once ``batch_size`` rows are
+    pending or ``flush_interval_ms`` has elapsed since the first pending row,
+    whichever comes first. ``submit`` never blocks, since it is called from
+    the event loop. Rows submitted as ``droppable`` (ones a later write
+    supersedes, such as energy readings and health snapshots) are dropped
+    and counted in ``stats()`` once ``max_queue_size`` rows are pending;
+    every other row is always queued, in order, so session lifecycle and
+    fault events are never lost.
+    """
+    
+    def __init__(
+        self,
+        db_path: str,
+        batch_size: int = 500,
+        flush_interval_ms: int = 50,
+        max_queue_size: int = 10000
+    ):
+        """
+        Start the writer thread.
+        
+        Args:
+            db_path: Path to SQLite database file
+            batch_size: Maximum rows committed per transaction
+            flush_interval_ms: Maximum time a row waits before being committed
+            max_queue_size: Pending rows allowed before droppable rows are dropped
+        """
+        self.db_path = db_path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0, flush_interval_ms) / 1000.0
+        self.max_queue_size = max_queue_size
+        # Unbounded so critical rows never wait; the bound applies to droppable rows
+        self._queue: queue.Queue = queue.Queue()
+        self._closed = False
+        
+        # Metrics (each counter is only written by one side)
+        self.enqueued = 0
+        self.dropped = 0
+        self.rows_written = 0
+        self.batches = 0
+        self.errors = 0
+        self.max_queue_depth = 0
+        
+        self._thread = threading.Thread(
+            target=self._run,
+            name="fault-db-writer",
+            daemon=True
+        )
+        self._thread.start()
+    
+    def submit(self, sql: str, params: tuple, droppable: bool = False) -> bool:
+        """Queue a write statement; returns False if a droppable row was dropped."""
+        if self._closed:
+            raise RuntimeError("Write-behind writer is closed")
+        
+        if droppable and self._queue.qsize() >= self.max_queue_size:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning(f"Write-behind queue full, {self.dropped} rows dropped so far")
+            return False
+        self._queue.put_nowait((sql, params))
+        self.enqueued += 1
+        return True
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every previously submitted write is committed.
+        
+        Blocks the calling thread, so call it through ``asyncio.to_thread``
+        from the event loop.
+        
+        Returns:
+            True if the queue was drained before the timeout
+        """
+        if self._closed or not self._thread.is_alive():
+            return True
+        marker = _FlushMarker()
+        self._queue.put_nowait(marker)
+        return marker.event.wait(timeout)
+    
+    def close(self, timeout: Optional[float] = 10.0):
+        """Flush pending writes and stop the writer thread."""
+        if self._closed:
+            return
+        self.flush(timeout)
+        self._closed = True
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return queue and throughput metrics."""
+        return {
+            "queue_depth": self._queue.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "max_queue_size": self.max_queue_size,
+            "enqueued": self.enqueued,
+            "rows_written": self.rows_written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
+    
+    def _run(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            while True:
+                item = self._queue.get()
+                batch: list[tuple[str, tuple]] = []
+                markers: list[_FlushMarker] = []
+                stop = False
+                deadline = time.monotonic() + self.flush_interval
+                
+                while True:
+                    if item is _STOP:
+                        stop = True
+                        break
+                    if isinstance(item, _FlushMarker):
+                        markers.append(item)
+                        break
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                
+                if batch:
+                    depth = len(batch) + self._queue.qsize()
+                    if depth > self.max_queue_depth:
+                        self.max_queue_depth = depth
+                    self._commit(conn, batch)
+                for marker in markers:
+                    marker.event.set()
+                if stop:
+                    break
+        finally:
+            conn.close()
+    
+    def _commit(self, conn: sqlite3.Connection, batch: list[tuple[str, tuple]]):
+        """Commit a batch in one transaction, grouping consecutive statements."""
+        try:
+            with conn:
+                for sql, rows in groupby(batch, key=lambda item: item[0]):
+                    conn.executemany(sql, [params for _, params in rows])
+            self.rows_written += len(batch)
+            self.batches += 1
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.error(f"Write-behind batch of {len(batch)} rows failed: {e}")
+
+
+class SessionEnergyCoalescer:
+    """
+    Coalesces per-session energy readings before they reach the database.
+    
+    Only the latest (kWh, cost) pair per session is kept in memory, so the
+    database write rate depends on the number of active sessions and the
+    flush cadence rather than on the telemetry rate.
+    """
+    
+    def __init__(self, db: "FaultHistoryDB"):
+        """
+        Initialize the coalescer.
+        
+        Args:
+            db: Database receiving the flushed readings
+        """
+        self.db = db
+        self._pending: Dict[str, tuple[float, float]] = {}
+        self.readings_received = 0
+        self.rows_flushed = 0
+        self.flushes = 0
+    
+    def record(self, session_id: str, kwh: float, cost: float):
+        """Remember the latest reading for a session, replacing older ones."""
+        self._pending[session_id] = (kwh, cost)
+        self.readings_received += 1
+    
+    def flush(self, session_id: Optional[str] = None) -> int:
+        """
+        Write dirty readings to the database.
+        
+        Args:
+            session_id: Flush only this session (None for all dirty sessions)
+            
+        Returns:
+            Number of sessions written
+        """
+        if session_id is not None:
+            reading = self._pending.pop(session_id, None)
+            rows = [(reading[0], reading[1], session_id)] if reading else []
+        else:
+            rows = [(kwh, cost, sid) for sid, (kwh, cost) in self._pending.items()]
+            self._pending.clear()
+        
+        if rows:
+            self.db.update_session_energies(rows)
+            self.rows_flushed += len(rows)
+            self.flushes += 1
+        return len(rows)
+    
+    def discard(self, session_id: str):
+        """Drop any unflushed reading for a session."""
+        self._pending.pop(session_id, None)
+    
+    def stats(self) -> Dict[str, int]:
+        """Return coalescing metrics."""
+        return {
+            "dirty_sessions": len(self._pending),
+            "readings_received": self.readings_received,
+            "rows_flushed": self.rows_flushed,
+            "flushes": self.flushes,
+        }
+
+
 class FaultHistoryDB:
-    """Database manager for fault history and events."""
+    """
+    Database manager for fault history and events.
     
-    def __init__(self, db_path: str = "ev_charging.db"):
+    The get_* read helpers first flush queued write-behind rows, which waits
+    for the writer thread; call them through ``asyncio.to_thread`` from the
+    event loop.
+    """
+    
+    def __init__(
+        self,
+        db_path: str = "ev_charging.db",
+        write_behind: bool = False,
+        batch_size: int = 500,
+        flush_interval_ms: int = 50,
+        max_queue_size: int = 10000
+    ):
         """
         Initialize database connection.
         
         Args:
             db_path: Path to SQLite database file
+            write_behind: Queue writes for a background writer thread
+            batch_size: Maximum rows per write-behind transaction
+            flush_interval_ms: Maximum delay before queued rows are committed
+            max_queue_size: Queued rows allowed before droppable writes are dropped
         """
         self.db_path = db_path
         self._init_database()
+        self._writer: Optional[WriteBehindWriter] = None
+        if write_behind:
+            self._writer = WriteBehindWriter(
+                db_path,
+                batch_size=batch_size,
+                flush_interval_ms=flush_interval_ms,
+                max_queue_size=max_queue_size
+            )
     
     def _init_database(self):
         """Create database tables if they don't exist."""
@@ -110,6 +380,42 @@ class FaultHistoryDB:
         finally:
             conn.close()
     
+    def _write(self, sql: str, params: tuple, droppable: bool = False):
+        """Execute a write statement, directly or through the write-behind queue."""
+        if self._writer:
+            self._writer.submit(sql, params, droppable)
+            return
+        
+        with self._get_connection() as conn:
+            conn.execute(sql, params)
+            conn.commit()
+    
+    def _write_many(self, sql: str, rows: List[tuple], droppable: bool = False):
+        """Execute a write statement for many parameter rows."""
+        if self._writer:
+            for params in rows:
+                self._writer.submit(sql, params, droppable)
+            return
+        
+        with self._get_connection() as conn:
+            conn.executemany(sql, rows)
+            conn.commit()
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until all queued writes are committed."""
+        if self._writer:
+            return self._writer.flush(timeout)
+        return True
+    
+    def close(self):
+        """Flush queued writes and release the writer thread."""
+        if self._writer:
+            self._writer.close()
+    
+    def get_writer_stats(self) -> Optional[Dict[str, Any]]:
+        """Return write-behind queue metrics, or None when writes are synchronous."""
+        return self._writer.stats() if self._writer else None
+    
     def record_fault_event(self, cp_id: str, event_type: str, reason: str = ""):
         """
         Record a fault or recovery event.
@@ -121,13 +427,10 @@ class FaultHistoryDB:
         """
         timestamp = utc_now().isoformat()
         
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO fault_events (cp_id, event_type, reason, timestamp)
-                VALUES (?, ?, ?, ?)
-            """, (cp_id, event_type, reason, timestamp))
-            conn.commit()
+        self._write("""
+            INSERT INTO fault_events (cp_id, event_type, reason, timestamp)
+            VALUES (?, ?, ?, ?)
+        """, (cp_id, event_type, reason, timestamp))
     
     def record_health_snapshot(
         self,
@@ -149,14 +452,11 @@ class FaultHistoryDB:
         """
         timestamp = utc_now().isoformat()
         
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO cp_health_history 
-                (cp_id, is_healthy, state, circuit_state, failure_count, timestamp)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (cp_id, is_healthy, state, circuit_state, failure_count, timestamp))
-            conn.commit()
+        self._write("""
+            INSERT INTO cp_health_history 
+            (cp_id, is_healthy, state, circuit_state, failure_count, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (cp_id, is_healthy, state, circuit_state, failure_count, timestamp), droppable=True)
     
     def start_charging_session(
         self,
@@ -174,14 +474,11 @@ class FaultHistoryDB:
         """
         start_time = utc_now().isoformat()
         
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO charging_sessions 
-                (session_id, cp_id, driver_id, start_time, status)
-                VALUES (?, ?, ?, ?, 'ACTIVE')
-            """, (session_id, cp_id, driver_id, start_time))
-            conn.commit()
+        self._write("""
+            INSERT INTO charging_sessions 
+            (session_id, cp_id, driver_id, start_time, status)
+            VALUES (?, ?, ?, ?, 'ACTIVE')
+        """, (session_id, cp_id, driver_id, start_time))
     
     def end_charging_session(
         self,
@@ -201,14 +498,11 @@ class FaultHistoryDB:
         """
         end_time = utc_now().isoformat()
         
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE charging_sessions
-                SET end_time = ?, total_kwh = ?, total_cost = ?, status = ?
-                WHERE session_id = ?
-            """, (end_time, total_kwh, total_cost, status, session_id))
-            conn.commit()
+        self._write("""
+            UPDATE charging_sessions
+            SET end_time = ?, total_kwh = ?, total_cost = ?, status = ?
+            WHERE session_id = ?
+        """, (end_time, total_kwh, total_cost, status, session_id))
     
     def update_session_energy(
         self,
@@ -224,14 +518,24 @@ class FaultHistoryDB:
             kwh: Current total energy delivered
             cost: Current total cost
         """
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE charging_sessions
-                SET total_kwh = ?, total_cost = ?
-                WHERE session_id = ? AND status = 'ACTIVE'
-            """, (kwh, cost, session_id))
-            conn.commit()
+        self._write("""
+            UPDATE charging_sessions
+            SET total_kwh = ?, total_cost = ?
+            WHERE session_id = ? AND status = 'ACTIVE'
+        """, (kwh, cost, session_id), droppable=True)
+    
+    def update_session_energies(self, rows: List[tuple[float, float, str]]):
+        """
+        Update the current energy and cost of many active sessions.
+        
+        Args:
+            rows: (kwh, cost, session_id) tuples
+        """
+        self._write_many("""
+            UPDATE charging_sessions
+            SET total_kwh = ?, total_cost = ?
+            WHERE session_id = ? AND status = 'ACTIVE'
+        """, rows, droppable=True)
     
     def get_fault_history(
         self,
@@ -248,6 +552,7 @@ class FaultHistoryDB:
         Returns:
             List of fault event dictionaries
         """
+        self.flush()
         with self._get_connection() as conn:
             cursor = conn.cursor()
             
@@ -282,6 +587,7 @@ class FaultHistoryDB:
         Returns:
             List of health snapshot dictionaries
         """
+        self.flush()
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
@@ -310,6 +616,7 @@ class FaultHistoryDB:
         Returns:
             List of charging session dictionaries
         """
+        self.flush()
         with self._get_connection() as conn:
             cursor = conn.cursor()
             
@@ -340,6 +647,7 @@ class FaultHistoryDB:
         Returns:
             Dictionary with fault statistics
         """
+        self.flush()
         with self._get_connection() as conn:
             cursor = conn.cursor()
             
@@ -0,0 +1,141 @@
+"""
+Keyed asynchronous dispatcher.
+Shards work items by key across worker coroutines, so items sharing a key are
+handled in order while items with different keys progress concurrently.
+"""
+
+import asyncio
+import zlib
+from typing import Any, Awaitable, Callable, Optional
+from loguru import logger
+
+
+class KeyedDispatcher:
+    """Dispatch items to N workers, each with its own bounded queue."""
+
+    def __init__(
+        self,
+        handler: Callable[[Any], Awaitable[None]],
+        num_workers: int = 8,
+        queue_size: int = 1000,
+        name: str = "dispatcher"
+    ):
+        """
+        Initialize the dispatcher.
+
+        Args:
+            handler: Coroutine function invoked for every item
+            num_workers: Number of shards (one worker coroutine each)
+            queue_size: Maximum queued items per shard before submit waits
+            name: Name used for worker tasks and log messages
+        """
+        self.handler = handler
+        self.num_workers = max(1, num_workers)
+        self.queue_size = queue_size
+        self.name = name
+        self._queues: list[asyncio.Queue] = []
+        self._workers: list[asyncio.Task] = []
+        self._accepting = False
+
+        # Per-shard metrics
+        self._max_depth = [0] * self.num_workers
+        self._processed = [0] * self.num_workers
+        self._errors = [0] * self.num_workers
+
+    def start(self):
+        """Create the shard queues and worker tasks."""
+        if self._workers:
+            return
+        self._queues = [asyncio.Queue(maxsize=self.queue_size) for _ in range(self.num_workers)]
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"{self.name}-{i}")
+            for i in range(self.num_workers)
+        ]
+        self._accepting = True
+
+    def shard_for(self, key: str) -> int:
+        """Return the shard index for a key (stable across processes)."""
+        return zlib.crc32(key.encode("utf-8")) % self.num_workers
+
+    async def submit(self, key: str, item: Any, on_done: Optional[Callable[[bool], None]] = None):
+        """
+        Queue an item on its key's shard, waiting if the shard is full.
+
+        ``on_done(handled)`` is called exactly once per item, so callers can
+        track a group of items without ``join()``: with True once the handler
+        has run (even if it failed), or with False if ``drain()`` gave up on
+        the item before it was handled.
+        """
+        if not self._accepting:
+            raise RuntimeError(f"{self.name} is not accepting work")
+
+        shard = self.shard_for(key)
+        queue = self._queues[shard]
+        await queue.put((item, on_done))
+        depth = queue.qsize()
+        if depth > self._max_depth[shard]:
+            self._max_depth[shard] = depth
+
+    async def join(self):
+        """Wait until every queued item has been handled."""
+        await asyncio.gather(*(queue.join() for queue in self._queues))
+
+    async def drain(self, timeout: Optional[float] = None):
+        """Stop accepting work, finish queued items and stop the workers."""
+        self._accepting = False
+        if not self._workers:
+            return
+
+        try:
+            await asyncio.wait_for(self.join(), timeout)
+        except asyncio.TimeoutError:
+            pending = sum(queue.qsize() for queue in self._queues)
+            logger.warning(f"{self.name}: drain timed out with {pending} items pending")
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        # Release anything the workers never reached, reporting it unhandled
+        for queue in self._queues:
+            while not queue.empty():
+                _, on_done = queue.get_nowait()
+                queue.task_done()
+                if on_done is not None:
+                    on_done(False)
+
+    def stats(self) -> dict:
+        """Return per-shard queue depth and throughput metrics."""
+        return {
+            "workers": self.num_workers,
+            "queue_size": self.queue_size,
+            "shards": [
+                {
+                    "shard": i,
+                    "depth": self._queues[i].qsize() if self._queues else 0,
+                    "max_depth": self._max_depth[i],
+                    "processed": self._processed[i],
+                    "errors": self._errors[i],
+                }
+                for i in range(self.num_workers)
+            ],
+        }
+
+    async def _worker(self, index: int):
+        queue = self._queues[index]
+        while True:
+            item, on_done = await queue.get()
+            handled = False
+            try:
+                await self.handler(item)
+                self._processed[index] += 1
+                handled = True
+            except Exception as e:
+                self._errors[index] += 1
+                handled = True
+                logger.error(f"{self.name}[{index}]: error handling {type(item).__name__}: {e}")
+            finally:
+                queue.task_done()
+                if on_done is not None:
+                    on_done(handled)
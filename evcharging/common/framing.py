@@ -7,31 +7,71 @@ Format:
 - DATA: Message payload (JSON or text)
 - ETX (0x03): End of text marker
 - LRC: Longitudinal Redundancy Check (XOR of all DATA bytes)
+
+FrameParser is the streaming parser used on sockets; parse_framed_message
+is the one-shot variant for a complete buffer.
 """
 
-from typing import Optional
+from typing import Iterable, Iterator, Optional
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
 
 
 # Control characters
 STX = b'\x02'  # Start of Text
 ETX = b'\x03'  # End of Text
 
+# Below this size a plain byte loop beats the big-int setup cost
+_LRC_LOOP_MAX = 128
+# Above this size NumPy (when installed) beats big-int XOR
+_LRC_NUMPY_MIN = 16 * 1024
+# Payloads are XORed together as little-endian ints of this many bytes...
+_LRC_CHUNK = 4096
+# ...and the accumulator is then folded in half down to one byte:
+# 16384, 8192, ..., 8 bits (shift, mask) pairs
+_LRC_FOLDS = [
+    (1 << exponent, (1 << (1 << exponent)) - 1)
+    for exponent in range((_LRC_CHUNK * 8).bit_length() - 2, 2, -1)
+]
+
 
 def calculate_lrc(data: bytes) -> int:
     """
     Calculate Longitudinal Redundancy Check.
     LRC is the XOR of all data bytes.
     
+    Small payloads use a byte loop. Larger ones are XORed 4 KB at a time
+    as big integers (XOR is bytewise, so byte order does not matter) and
+    the 4 KB accumulator is folded down to a byte; very large payloads use
+    NumPy when it is installed.
+    
     Args:
-        data: Bytes to calculate LRC for
+        data: Bytes (or any buffer) to calculate LRC for
         
     Returns:
         LRC value as integer
     """
-    lrc = 0
-    for byte in data:
-        lrc ^= byte
-    return lrc
+    size = len(data)
+    if size <= _LRC_LOOP_MAX:
+        lrc = 0
+        for byte in data:
+            lrc ^= byte
+        return lrc
+    
+    if np is not None and size >= _LRC_NUMPY_MIN:
+        return int(np.bitwise_xor.reduce(np.frombuffer(data, dtype=np.uint8)))
+    
+    from_bytes = int.from_bytes
+    acc = 0
+    with memoryview(data) as view:
+        for i in range(0, size, _LRC_CHUNK):
+            acc ^= from_bytes(view[i:i + _LRC_CHUNK], 'little')
+    for bits, mask in _LRC_FOLDS:
+        acc = (acc >> bits) ^ (acc & mask)
+    return acc
 
 
 def frame_message(message: str) -> bytes:
@@ -49,13 +89,35 @@ def frame_message(message: str) -> bytes:
     data = message.encode('utf-8')
     lrc = calculate_lrc(data)
     
-    return STX + data + ETX + bytes([lrc])
+    return b''.join((STX, data, ETX, bytes((lrc,))))
+
+
+def frame_messages(messages: Iterable[str]) -> bytes:
+    """
+    Frame many messages into one buffer for a single socket write.
+    
+    The frames are joined in one allocation sized for all of them, instead
+    of one bytes object (and one write) per message.
+    
+    Args:
+        messages: String messages to frame, in order
+        
+    Returns:
+        Concatenated framed messages as bytes
+    """
+    parts = []
+    for message in messages:
+        data = message.encode('utf-8')
+        parts += (STX, data, ETX, bytes((calculate_lrc(data),)))
+    return b''.join(parts)
 
 
 def parse_framed_message(buffer: bytes) -> tuple[Optional[str], bytes]:
     """
     Parse a framed message from a buffer.
     
+    Corrupt frames (bad LRC or invalid UTF-8) are skipped.
+    
     Args:
         buffer: Buffer containing potentially framed messages
         
@@ -64,62 +126,185 @@ def parse_framed_message(buffer: bytes) -> tuple[Optional[str], bytes]:
         - message is None if no complete frame found
         - remaining_buffer contains unparsed bytes
     """
-    # Look for STX
-    stx_idx = buffer.find(STX)
-    if stx_idx == -1:
-        # No STX found, discard buffer up to this point
-        return None, buffer[-100:]  # Keep last 100 bytes in case STX was split
-    
-    # Look for ETX after STX
-    search_start = stx_idx + 1
-    etx_idx = buffer.find(ETX, search_start)
-    
-    if etx_idx == -1:
-        # No complete frame yet
-        return None, buffer[stx_idx:]
-    
-    # Check if we have the LRC byte
-    if len(buffer) < etx_idx + 2:
-        # LRC not received yet
-        return None, buffer[stx_idx:]
-    
-    # Extract components
-    data = buffer[stx_idx + 1:etx_idx]
-    received_lrc = buffer[etx_idx + 1]
-    
-    # Verify LRC
-    calculated_lrc = calculate_lrc(data)
-    if calculated_lrc != received_lrc:
-        # LRC mismatch - frame corrupted
-        # Discard this frame and continue searching
+    while True:
+        # Look for STX
+        stx_idx = buffer.find(STX)
+        if stx_idx == -1:
+            # No STX found, discard buffer up to this point
+            return None, buffer[-100:]  # Keep last 100 bytes in case STX was split
+        
+        # Look for ETX after STX
+        etx_idx = buffer.find(ETX, stx_idx + 1)
+        if etx_idx == -1 or len(buffer) < etx_idx + 2:
+            # No complete frame (or LRC) yet
+            return None, buffer[stx_idx:]
+        
+        # Extract components
+        data = buffer[stx_idx + 1:etx_idx]
+        received_lrc = buffer[etx_idx + 1]
         remaining = buffer[etx_idx + 2:]
-        return parse_framed_message(remaining)
+        
+        # Verify LRC; on mismatch discard this frame and continue searching
+        if calculate_lrc(data) != received_lrc:
+            buffer = remaining
+            continue
+        
+        try:
+            return data.decode('utf-8'), remaining
+        except UnicodeDecodeError:
+            # Invalid UTF-8 - discard frame
+            buffer = remaining
+
+
+class FrameParser:
+    """
+    Incremental <STX><DATA><ETX><LRC> parser for byte streams.
     
-    # Valid frame found
-    try:
-        message = data.decode('utf-8')
-        remaining = buffer[etx_idx + 2:]
-        return message, remaining
-    except UnicodeDecodeError:
-        # Invalid UTF-8 - discard frame
-        remaining = buffer[etx_idx + 2:]
-        return parse_framed_message(remaining)
+    Received data is appended to one bytearray and parsed in place from a
+    read cursor. The search for ETX resumes where the previous call stopped,
+    so a frame arriving in many small reads is scanned once. Consumed bytes
+    are released from the front of the buffer on the next feed().
+    
+    Frames are returned as memoryviews into the buffer (no copy). A view is
+    only valid until the next feed(); decode or copy it before then. If a
+    view is still held, feed() moves the unparsed tail to a fresh buffer
+    rather than failing.
+    
+    Frames whose payload exceeds ``max_frame_size`` are dropped and parsing
+    resynchronizes on the next STX, which bounds memory on hostile input.
+    """
+    
+    def __init__(self, max_frame_size: int = 64 * 1024):
+        if max_frame_size <= 0:
+            raise ValueError("max_frame_size must be positive")
+        self.max_frame_size = max_frame_size
+        self._buf = bytearray()
+        self._pos = 0       # First unparsed byte
+        self._start = -1    # STX of the frame being assembled, -1 if none
+        self._scan = 0      # Where the next ETX search resumes
+        self.frames_parsed = 0
+        self.frames_dropped = 0
+        self.bytes_discarded = 0
+    
+    def __len__(self) -> int:
+        """Number of buffered, unparsed bytes."""
+        return len(self._buf) - self._pos
+    
+    @property
+    def pending(self) -> bytes:
+        """Copy of the buffered, unparsed bytes."""
+        return bytes(self._buf[self._pos:])
+    
+    def feed(self, data: bytes):
+        """Append received bytes to the buffer."""
+        if self._pos:
+            try:
+                del self._buf[:self._pos]
+            except BufferError:
+                # A returned frame view is still alive; leave it its buffer
+                self._buf = self._buf[self._pos:]
+            if self._start >= 0:
+                self._start -= self._pos
+            self._scan -= self._pos
+            self._pos = 0
+        self._buf += data
+    
+    def next_frame(self) -> Optional[memoryview]:
+        """Return the payload of the next valid frame, or None if incomplete."""
+        spans = self._parse(1)
+        if not spans:
+            return None
+        start, end = spans[0]
+        return memoryview(self._buf)[start:end]
+    
+    def frames(self) -> Iterator[memoryview]:
+        """Yield the payloads of all complete frames in the buffer."""
+        view = memoryview(self._buf)
+        for start, end in self._parse():
+            yield view[start:end]
+    
+    def messages(self) -> Iterator[str]:
+        """Yield all complete frames decoded as UTF-8, skipping invalid ones."""
+        messages = []
+        with memoryview(self._buf) as view:
+            for start, end in self._parse():
+                try:
+                    messages.append(str(view[start:end], 'utf-8'))
+                except UnicodeDecodeError:
+                    self.frames_dropped += 1
+        return iter(messages)
+    
+    def _parse(self, max_frames: Optional[int] = None) -> list[tuple[int, int]]:
+        """
+        Scan for complete frames with a valid LRC from the read cursor.
+        
+        Returns the payload bounds of up to ``max_frames`` frames and leaves
+        the cursor after the last one. Scanning state is kept in locals and
+        written back once, since this runs for every read on every socket.
+        """
+        buf = self._buf
+        size = len(buf)
+        pos, start, scan = self._pos, self._start, self._scan
+        max_frame_size = self.max_frame_size
+        spans = []
+        with memoryview(buf) as view:
+            while max_frames is None or len(spans) < max_frames:
+                if start < 0:
+                    stx_idx = buf.find(STX, pos)
+                    if stx_idx == -1:
+                        # Nothing here can start a frame
+                        self.bytes_discarded += size - pos
+                        pos = scan = size
+                        break
+                    self.bytes_discarded += stx_idx - pos
+                    pos = start = stx_idx
+                    scan = stx_idx + 1
+                
+                # ETX may sit at most max_frame_size bytes after STX + 1
+                limit = start + max_frame_size + 2
+                etx_idx = buf.find(ETX, scan, limit)
+                if etx_idx == -1:
+                    if size >= limit:
+                        # Oversized frame: drop it and resync on the next STX
+                        self.frames_dropped += 1
+                        pos = start + 1
+                        start = -1
+                        continue
+                    scan = size
+                    break
+                
+                if etx_idx + 1 >= size:
+                    # LRC not received yet
+                    scan = etx_idx
+                    break
+                
+                data_start = start + 1
+                pos = scan = etx_idx + 2
+                start = -1
+                if calculate_lrc(view[data_start:etx_idx]) != buf[etx_idx + 1]:
+                    self.frames_dropped += 1
+                    continue
+                spans.append((data_start, etx_idx))
+        
+        self._pos, self._start, self._scan = pos, start, scan
+        self.frames_parsed += len(spans)
+        return spans
 
 
 class MessageFramer:
     """Helper class for framing/parsing messages in a stateful way."""
     
-    def __init__(self):
-        self.buffer = b''
+    def __init__(self, max_frame_size: int = 64 * 1024):
+        self.parser = FrameParser(max_frame_size)
+    
+    @property
+    def buffer(self) -> bytes:
+        """Unparsed bytes currently buffered."""
+        return self.parser.pending
     
     def add_data(self, data: bytes):
         """Add received data to internal buffer."""
-        self.buffer += data
-        
-        # Limit buffer size to prevent memory issues
-        if len(self.buffer) > 10000:
-            # Keep only last 1000 bytes
-            self.buffer = self.buffer[-1000:]
+        self.parser.feed(data)
     
     def get_message(self) -> Optional[str]:
         """
@@ -128,8 +313,16 @@ class MessageFramer:
         Returns:
             Message string if a complete frame is available, None otherwise
         """
-        message, self.buffer = parse_framed_message(self.buffer)
-        return message
+        # Parse one frame per call so later frames stay buffered
+        while True:
+            frame = self.parser.next_frame()
+            if frame is None:
+                return None
+            with frame:
+                try:
+                    return str(frame, 'utf-8')
+                except UnicodeDecodeError:
+                    self.parser.frames_dropped += 1
     
     def get_all_messages(self) -> list[str]:
         """
@@ -138,13 +331,7 @@ class MessageFramer:
         Returns:
             List of message strings
         """
-        messages = []
-        while True:
-            message = self.get_message()
-            if message is None:
-                break
-            messages.append(message)
-        return messages
+        return list(self.parser.messages())
 
 
 # Example usage
@@ -0,0 +1,307 @@
+"""
+Great-circle distances and a grid index for nearest-charger search.
+Answers k-nearest and radius queries over many charging points by visiting
+only the grid cells around the query point.
+"""
+
+import heapq
+import math
+from collections import Counter
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Average points per occupied cell when the cell size is chosen automatically
+TARGET_POINTS_PER_CELL = 16
+MIN_CELL_DEG = 0.001
+MAX_CELL_DEG = 10.0
+AUTO_CELL_PASSES = 4
+# Coarser levels group PYRAMID_FACTOR x PYRAMID_FACTOR cells, up to a top level this small
+PYRAMID_FACTOR = 4
+PYRAMID_TOP_NODES = 64
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in km between two points given in degrees."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def parse_lat_lon(value: str) -> Tuple[float, float]:
+    """Parse "lat,lon" in degrees; raises ValueError if malformed or out of range."""
+    parts = value.split(",")
+    if len(parts) != 2:
+        raise ValueError("expected 'lat,lon'")
+    lat, lon = float(parts[0]), float(parts[1])
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+        raise ValueError("latitude must be within ±90 and longitude within ±180")
+    return lat, lon
+
+
+class _Cell:
+    """Points of one grid cell, with their trig terms precomputed column-wise."""
+
+    __slots__ = ("keys", "phis", "lambdas", "cos_phis")
+
+    def __init__(self):
+        self.keys: List[Hashable] = []
+        self.phis: List[float] = []
+        self.lambdas: List[float] = []
+        self.cos_phis: List[float] = []
+
+    def add(self, key: Hashable, lat: float, lon: float):
+        phi = math.radians(lat)
+        self.keys.append(key)
+        self.phis.append(phi)
+        self.lambdas.append(math.radians(lon))
+        self.cos_phis.append(math.cos(phi))
+
+    def haversines(self, phi: float, lam: float, cos_phi: float) -> List[float]:
+        """Haversine of the central angle from (phi, lam) to every point of the cell."""
+        sin, half = math.sin, 0.5
+        return [
+            sin((p - phi) * half) ** 2 + cos_phi * c * sin((l - lam) * half) ** 2
+            for p, l, c in zip(self.phis, self.lambdas, self.cos_phis)
+        ]
+
+
+class GeoIndex:
+    """
+    Uniform lat/lon grid over points, for k-nearest and radius queries.
+
+    A query scans square rings of cells outward from the query's cell and
+    computes haversine distances for whole cells at a time from precomputed
+    radians and cosines. After ring r every unvisited point is at least r
+    cell widths away; that lower bound, turned into a great-circle distance
+    that stays valid at the highest latitude of the ring, stops the scan
+    once the k-th best distance (or the radius) is within it. Cost therefore
+    follows the density around the query, not the total number of points.
+
+    Far from every point the rings would keep growing through empty cells,
+    so once most probed cells are empty the search continues best-first down a pyramid of ever coarser blocks of
+    occupied cells, expanding whichever block or cell has the smallest
+    distance bound.
+    """
+
+    def __init__(self, points: Iterable[Tuple[Hashable, float, float]], cell_deg: Optional[float] = None):
+        """
+        Build the index.
+
+        Args:
+            points: (key, latitude, longitude) triples, in degrees
+            cell_deg: Cell size in degrees; chosen from point density if None
+        """
+        points = list(points)
+        # Whole columns around the globe, so wrapped column numbers line up
+        self._columns = max(1, round(360.0 / (cell_deg or self._auto_cell_deg(points))))
+        self.cell_deg = 360.0 / self._columns
+        self._cells: Dict[Tuple[int, int], _Cell] = {}
+        self._positions: Dict[Hashable, Tuple[float, float]] = {}
+        for key, lat, lon in points:
+            cell_key = self._cell_of(lat, lon)
+            cell = self._cells.get(cell_key)
+            if cell is None:
+                cell = self._cells[cell_key] = _Cell()
+            cell.add(key, lat, lon)
+            self._positions[key] = (lat, lon)
+
+        # _levels[i] maps each occupied block of level i + 1 to its level i children
+        self._levels: List[Dict[Tuple[int, int], List[Tuple[int, int]]]] = []
+        nodes = list(self._cells)
+        while len(nodes) > PYRAMID_TOP_NODES:
+            parents: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+            for row, col in nodes:
+                parents.setdefault((row // PYRAMID_FACTOR, col // PYRAMID_FACTOR), []).append((row, col))
+            self._levels.append(parents)
+            nodes = list(parents)
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._positions
+
+    def position(self, key: Hashable) -> Optional[Tuple[float, float]]:
+        return self._positions.get(key)
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        k: Optional[int] = None,
+        radius_km: Optional[float] = None,
+        predicate: Optional[Callable[[Hashable], bool]] = None
+    ) -> List[Tuple[Hashable, float]]:
+        """
+        Points closest to (lat, lon) as (key, distance_km), nearest first.
+
+        Args:
+            k: Return at most this many points
+            radius_km: Return only points within this distance
+            predicate: Only points whose key passes count towards k
+        """
+        if k is not None and k <= 0:
+            return []
+        phi, lam = math.radians(lat), math.radians(lon)
+        cos_phi = math.cos(phi)
+        row0, col0 = self._cell_of(lat, lon)
+        # Compare haversines rather than distances inside the scan
+        hav_radius = math.inf if radius_km is None else math.sin(min(radius_km / EARTH_RADIUS_KM, math.pi) / 2) ** 2
+        best: List[Tuple[float, int, Hashable]] = []  # max-heap of (-hav, tiebreak, key)
+        counter = 0
+
+        def scan(cell: _Cell):
+            nonlocal counter
+            for key, hav in zip(cell.keys, cell.haversines(phi, lam, cos_phi)):
+                if hav > hav_radius or (predicate is not None and not predicate(key)):
+                    continue
+                counter += 1
+                if k is None or len(best) < k:
+                    heapq.heappush(best, (-hav, counter, key))
+                elif hav < -best[0][0]:
+                    heapq.heapreplace(best, (-hav, counter, key))
+
+        def done(bound: float) -> bool:
+            return bound > hav_radius or (k is not None and len(best) == k and -best[0][0] <= bound)
+
+        visited = 0
+        ring = 0
+        while visited < len(self._cells):
+            if (2 * ring + 1) ** 2 > 4 * visited + PYRAMID_TOP_NODES:
+                # The rings are probing mostly empty cells: search the
+                # pyramid best-first instead, skipping cells already scanned
+                top = len(self._levels)
+                nodes = self._levels[-1] if self._levels else self._cells
+                frontier = [(self._node_bound(lat, lon, cos_phi, top, row, col), top, row, col) for row, col in nodes]
+                heapq.heapify(frontier)
+                while frontier:
+                    bound, level, row, col = heapq.heappop(frontier)
+                    if done(bound):
+                        break
+                    if level:
+                        for child_row, child_col in self._levels[level - 1][row, col]:
+                            heapq.heappush(frontier, (
+                                self._node_bound(lat, lon, cos_phi, level - 1, child_row, child_col),
+                                level - 1, child_row, child_col
+                            ))
+                    elif self._ring_distance(row0, col0, row, col) >= ring:
+                        scan(self._cells[row, col])
+                break
+            for cell_key in self._ring(row0, col0, ring):
+                cell = self._cells.get(cell_key)
+                if cell is not None:
+                    visited += 1
+                    scan(cell)
+            if done(self._ring_bound(lat, ring)):
+                break
+            ring += 1
+
+        results = sorted((-neg_hav, key) for neg_hav, _, key in best)
+        return [
+            (key, 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(hav))))
+            for hav, key in results
+        ]
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "points": len(self._positions),
+            "cells": len(self._cells),
+            "cell_deg": self.cell_deg,
+        }
+
+    def _cell_of(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg) % self._columns
+
+    def _ring_distance(self, row0: int, col0: int, row: int, col: int) -> int:
+        """Ring number of (row, col) around (row0, col0), columns wrapping around."""
+        offset = (col - col0) % self._columns
+        return max(abs(row - row0), min(offset, self._columns - offset))
+
+    def _ring(self, row0: int, col0: int, ring: int) -> Iterable[Tuple[int, int]]:
+        """Cells at Chebyshev distance ``ring`` from (row0, col0), columns wrapping around."""
+        columns = self._columns
+        if ring == 0:
+            return ((row0, col0),)
+        if 2 * ring + 1 < columns:
+            cells = [(row0 + dr, (col0 + dc) % columns)
+                     for dr in (-ring, ring) for dc in range(-ring, ring + 1)]
+            cells += [(row0 + dr, (col0 + dc) % columns)
+                      for dr in range(-ring + 1, ring) for dc in (-ring, ring)]
+            return cells
+        # The ring reaches all the way round: use circular column distance
+        def column_distance(col: int) -> int:
+            offset = (col - col0) % columns
+            return min(offset, columns - offset)
+
+        return [
+            (row0 + dr, col)
+            for dr in range(-ring, ring + 1)
+            for col in range(columns)
+            if max(abs(dr), column_distance(col)) == ring
+        ]
+
+    def _ring_bound(self, lat: float, ring: int) -> float:
+        """
+        Haversine lower bound for any point outside rings 0..ring.
+
+        Such a point is at least ring cell widths from the query in latitude,
+        so hav(d) >= hav(dphi), or in longitude while within the ring's rows,
+        so both latitudes are at most phi_max and
+        hav(d) >= cos(phi_max)^2 * hav(dlambda). The second bound is the
+        smaller one.
+        """
+        delta = math.radians(ring * self.cell_deg)
+        if delta >= math.pi:
+            return math.inf
+        phi_max = min(math.pi / 2, math.radians(abs(lat) + (ring + 1) * self.cell_deg))
+        return math.cos(phi_max) ** 2 * math.sin(delta / 2) ** 2
+
+    def _node_bound(self, lat: float, lon: float, cos_phi: float, level: int, row: int, col: int) -> float:
+        """
+        Haversine lower bound from (lat, lon) to any point of a pyramid node.
+
+        Level 0 nodes are cells. Uses the smallest latitude and (circular)
+        longitude differences to the node's extent, and the cosine of its
+        highest latitude.
+        """
+        size = self.cell_deg * PYRAMID_FACTOR ** level
+        south, north = row * size, (row + 1) * size
+        dlat = max(0.0, south - lat, lat - north)
+        west = col * size
+        if (lon - west) % 360.0 <= size:
+            dlon = 0.0
+        else:
+            dlon = min((west - lon) % 360.0, (lon - west - size) % 360.0)
+        cos_max = math.cos(math.radians(min(90.0, max(abs(south), abs(north)))))
+        return (
+            math.sin(math.radians(dlat) / 2) ** 2
+            + cos_phi * cos_max * math.sin(math.radians(dlon) / 2) ** 2
+        )
+
+    @staticmethod
+    def _auto_cell_deg(points: List[Tuple[Hashable, float, float]]) -> float:
+        """
+        Cell size giving about TARGET_POINTS_PER_CELL points in the cell of a typical point.
+
+        Starts from the bounding-box average, then shrinks the cells while
+        the occupancy seen by an average point (sum of squared cell counts
+        over the point count) is well above target, so clustered points
+        such as cities do not end up in a few oversized cells.
+        """
+        if len(points) < 2:
+            return MAX_CELL_DEG
+        lats = [lat for _, lat, _ in points]
+        lons = [lon for _, _, lon in points]
+        area = max(max(lats) - min(lats), MIN_CELL_DEG) * max(max(lons) - min(lons), MIN_CELL_DEG)
+        cell = min(MAX_CELL_DEG, max(MIN_CELL_DEG, math.sqrt(area * TARGET_POINTS_PER_CELL / len(points))))
+        for _ in range(AUTO_CELL_PASSES):
+            counts = Counter((math.floor(lat / cell), math.floor(lon / cell)) for lat, lon in zip(lats, lons))
+            occupancy = sum(c * c for c in counts.values()) / len(points)
+            if occupancy <= 2 * TARGET_POINTS_PER_CELL or cell <= MIN_CELL_DEG:
+                break
+            cell = max(MIN_CELL_DEG, cell / math.sqrt(occupancy / TARGET_POINTS_PER_CELL))
+        return cell
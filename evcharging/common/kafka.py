@@ -1,84 +1,478 @@
 """
 Kafka producer and consumer helpers using aiokafka.
 Provides async utilities for message streaming.
+
+Record values are encoded by a pluggable codec. Every record carries a
+``content-type`` header naming its codec, so consumers decode each record
+with the codec it was produced with; records without the header are JSON.
 """
 
 import asyncio
 import json
+import struct
+from datetime import datetime, timedelta, timezone
 from typing import AsyncIterator, Optional, Callable, Any
 from aiokafka import AIOKafkaProducer, AIOKafkaConsumer
-from aiokafka.admin import AIOKafkaAdminClient, NewTopic
+from aiokafka import codec as kafka_codec
+from aiokafka.admin import AIOKafkaAdminClient, NewPartitions, NewTopic
 from aiokafka.errors import TopicAlreadyExistsError
+from aiokafka.partitioner import murmur2
+from aiokafka.structs import TopicPartition
 from loguru import logger
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
+
+from evcharging.common.messages import CPTelemetry
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+
+CONTENT_TYPE_HEADER = "content-type"
+
+
+def serialize_value(message: BaseModel | dict) -> bytes:
+    """
+    Serialize a message to JSON bytes.
+    
+    Pydantic models are serialized directly to JSON without an
+    intermediate dict.
+    """
+    if isinstance(message, BaseModel):
+        return message.model_dump_json().encode('utf-8')
+    return json.dumps(message).encode('utf-8')
+
+
+class Codec:
+    """Base class for record value codecs."""
+    
+    name: str = ""
+    content_type: str = ""
+    
+    def accepts(self, message: BaseModel | dict) -> bool:
+        """Return True if this codec can encode the message."""
+        return True
+    
+    def encode(self, message: BaseModel | dict) -> bytes:
+        raise NotImplementedError
+    
+    def decode(self, raw: bytes, model: Optional[type[BaseModel]] = None) -> BaseModel | Any:
+        raise NotImplementedError
+
+
+class JSONCodec(Codec):
+    """UTF-8 JSON, the default and fallback codec."""
+    
+    name = "json"
+    content_type = "application/json"
+    
+    def encode(self, message: BaseModel | dict) -> bytes:
+        return serialize_value(message)
+    
+    def decode(self, raw: bytes, model: Optional[type[BaseModel]] = None) -> BaseModel | Any:
+        if model is not None:
+            return model.model_validate_json(raw)
+        return json.loads(raw)
+
+
+class MsgpackCodec(Codec):
+    """MessagePack maps with native timestamps (requires ``msgpack``)."""
+    
+    name = "msgpack"
+    content_type = "application/msgpack"
+    
+    def encode(self, message: BaseModel | dict) -> bytes:
+        value = message.model_dump() if isinstance(message, BaseModel) else message
+        return msgpack.packb(value, datetime=True)
+    
+    def decode(self, raw: bytes, model: Optional[type[BaseModel]] = None) -> BaseModel | Any:
+        value = msgpack.unpackb(raw, timestamp=3)
+        if model is not None:
+            return model.model_validate(value)
+        return value
+
+
+class TelemetryStructCodec(Codec):
+    """
+    Fixed-layout binary codec for ``CPTelemetry``.
+    
+    Layout (little endian): kw, kwh, euros as float64, ts as int64
+    microseconds since the epoch, the byte lengths of cp_id, driver_id and
+    session_id as uint8 (255 marks None), then the UTF-8 strings.
+    """
+    
+    name = "struct-telemetry"
+    content_type = "application/x-evcharging-telemetry.v1"
+    
+    _HEADER = struct.Struct("<dddqBBB")
+    _NONE = 0xFF
+    _EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    
+    def accepts(self, message: BaseModel | dict) -> bool:
+        return isinstance(message, CPTelemetry)
+    
+    def encode(self, message: BaseModel | dict) -> bytes:
+        if not isinstance(message, CPTelemetry):
+            raise TypeError(f"{self.name} codec only encodes CPTelemetry")
+        strings = []
+        lengths = []
+        for text in (message.cp_id, message.driver_id, message.session_id):
+            if text is None:
+                lengths.append(self._NONE)
+                continue
+            data = text.encode('utf-8')
+            if len(data) >= self._NONE:
+                raise ValueError(f"{self.name} codec: string field too long ({len(data)} bytes)")
+            lengths.append(len(data))
+            strings.append(data)
+        ts = message.ts if message.ts.tzinfo else message.ts.replace(tzinfo=timezone.utc)
+        ts_us = (ts - self._EPOCH) // timedelta(microseconds=1)
+        header = self._HEADER.pack(message.kw, message.kwh, message.euros, ts_us, *lengths)
+        return header + b"".join(strings)
+    
+    def decode(self, raw: bytes, model: Optional[type[BaseModel]] = None) -> CPTelemetry:
+        kw, kwh, euros, ts_us, *lengths = self._HEADER.unpack_from(raw)
+        offset = self._HEADER.size
+        strings = []
+        for length in lengths:
+            if length == self._NONE:
+                strings.append(None)
+                continue
+            end = offset + length
+            strings.append(raw[offset:end].decode('utf-8'))
+            offset = end
+        if offset != len(raw):
+            raise ValueError(f"{self.name} codec: expected {offset} bytes, got {len(raw)}")
+        cp_id, driver_id, session_id = strings
+        return CPTelemetry.model_validate({
+            "cp_id": cp_id,
+            "kw": kw,
+            "kwh": kwh,
+            "euros": euros,
+            "driver_id": driver_id,
+            "session_id": session_id,
+            "ts": self._EPOCH + timedelta(microseconds=ts_us),
+        })
+
+
+_CODECS_BY_NAME: dict[str, Codec] = {}
+_CODECS_BY_CONTENT_TYPE: dict[str, Codec] = {}
+
+
+def register_codec(codec: Codec):
+    """Make a codec available by name and by content type."""
+    _CODECS_BY_NAME[codec.name] = codec
+    _CODECS_BY_CONTENT_TYPE[codec.content_type] = codec
+
+
+def get_codec(name: str) -> Codec:
+    """Look up a codec by name."""
+    try:
+        return _CODECS_BY_NAME[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown codec '{name}'. Available: {sorted(_CODECS_BY_NAME)}"
+        ) from None
+
+
+def available_codecs() -> list[str]:
+    """Return the names of all registered codecs."""
+    return sorted(_CODECS_BY_NAME)
+
+
+JSON_CODEC = JSONCodec()
+register_codec(JSON_CODEC)
+register_codec(TelemetryStructCodec())
+if msgpack is not None:
+    register_codec(MsgpackCodec())
+
+
+_COMPRESSION_AVAILABLE: dict[str, Callable[[], bool]] = {
+    "gzip": kafka_codec.has_gzip,
+    "snappy": kafka_codec.has_snappy,
+    "lz4": kafka_codec.has_lz4,
+    "zstd": kafka_codec.has_zstd,
+}
+
+
+def resolve_compression(compression_type: Optional[str]) -> Optional[str]:
+    """
+    Validate a compression type, falling back to gzip if its library is missing.
+    
+    Returns:
+        The compression type to use, or None for no compression
+    """
+    if not compression_type or compression_type.lower() == "none":
+        return None
+    compression_type = compression_type.lower()
+    if compression_type not in _COMPRESSION_AVAILABLE:
+        raise ValueError(
+            f"Unknown compression type '{compression_type}'. "
+            f"Available: {sorted(_COMPRESSION_AVAILABLE)}"
+        )
+    if not _COMPRESSION_AVAILABLE[compression_type]():
+        logger.warning(f"Compression '{compression_type}' unavailable (library missing), using gzip")
+        return "gzip"
+    return compression_type
+
+
+DeliveryFailureCallback = Callable[[str, Optional[str], BaseException], None]
 
 
 class KafkaProducerHelper:
-    """Async Kafka producer with JSON serialization."""
+    """
+    Async Kafka producer with per-topic value codecs (JSON by default).
     
-    def __init__(self, bootstrap_servers: str):
+    Messages a topic's codec cannot encode (e.g. a dict sent to a topic
+    using a struct codec) fall back to JSON.
+    
+    ``linger_ms``, ``max_batch_size`` and ``compression_type`` tune
+    batching on the wire. Every send is tracked until the broker
+    acknowledges it, so in-flight and failed deliveries can be monitored
+    and reported to registered failure callbacks.
+    """
+    
+    def __init__(
+        self,
+        bootstrap_servers: str,
+        codecs: Optional[dict[str, str]] = None,
+        linger_ms: int = 0,
+        max_batch_size: int = 16384,
+        compression_type: Optional[str] = None
+    ):
         self.bootstrap_servers = bootstrap_servers
         self.producer: Optional[AIOKafkaProducer] = None
+        self.codecs: dict[str, Codec] = {
+            topic: get_codec(name) for topic, name in (codecs or {}).items()
+        }
+        self.linger_ms = linger_ms
+        self.max_batch_size = max_batch_size
+        self.compression_type = resolve_compression(compression_type)
+        self._failure_callbacks: list[DeliveryFailureCallback] = []
+        
+        # Delivery metrics
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.sent = 0
+        self.delivered = 0
+        self.failed = 0
     
     async def start(self):
         """Initialize and start the producer."""
         self.producer = AIOKafkaProducer(
             bootstrap_servers=self.bootstrap_servers,
-            value_serializer=lambda v: json.dumps(v).encode('utf-8'),
             key_serializer=lambda k: k.encode('utf-8') if k else None,
+            linger_ms=self.linger_ms,
+            max_batch_size=self.max_batch_size,
+            compression_type=self.compression_type,
         )
         await self.producer.start()
-        logger.info(f"Kafka producer started: {self.bootstrap_servers}")
+        logger.info(
+            f"Kafka producer started: {self.bootstrap_servers} "
+            f"(linger={self.linger_ms}ms, batch={self.max_batch_size}B, "
+            f"compression={self.compression_type or 'none'})"
+        )
     
     async def stop(self):
-        """Stop the producer."""
+        """Stop the producer, delivering any buffered messages first."""
         if self.producer:
             await self.producer.stop()
             logger.info("Kafka producer stopped")
     
-    async def send(self, topic: str, message: BaseModel | dict, key: Optional[str] = None):
-        """Send a message to a topic."""
+    async def flush(self):
+        """Wait until all buffered messages have been sent."""
+        if self.producer:
+            await self.producer.flush()
+    
+    def add_failure_callback(self, callback: DeliveryFailureCallback):
+        """Register a callback invoked as ``callback(topic, key, error)`` on failed delivery."""
+        self._failure_callbacks.append(callback)
+    
+    async def send(self, topic: str, message: BaseModel | dict, key: Optional[str] = None) -> asyncio.Future:
+        """
+        Send a message to a topic.
+        
+        Waits only until the record is buffered by the client (which may
+        take a while if the buffer is full or metadata is missing).
+        
+        Returns:
+            Future resolved with the record metadata once the broker acknowledges it
+        """
         if not self.producer:
             raise RuntimeError("Producer not started")
         
-        if isinstance(message, BaseModel):
-            value = json.loads(message.model_dump_json())
-        else:
-            value = message
+        value, headers = self.encode(topic, message)
+        delivery = await self.producer.send(topic, value=value, key=key, headers=headers)
+        self._track(topic, key, delivery)
+        logger.debug("Sent to {}: {}", topic, value)
+        return delivery
+    
+    def send_nowait(self, topic: str, message: BaseModel | dict, key: Optional[str] = None) -> asyncio.Future:
+        """
+        Send a message without waiting, for pipelined fire-and-forget produce.
         
-        await self.producer.send(topic, value=value, key=key)
-        logger.debug(f"Sent to {topic}: {value}")
+        Encoding happens immediately, so invalid messages still raise here.
+        Failures are counted and passed to the failure callbacks, so callers
+        may ignore the returned future.
+        
+        Returns:
+            Future resolved with the record metadata once the broker acknowledges it
+        """
+        if not self.producer:
+            raise RuntimeError("Producer not started")
+        
+        value, headers = self.encode(topic, message)
+        task = asyncio.ensure_future(self._send_encoded(topic, value, key, headers))
+        # Retrieve the outcome so ignored futures never log "exception was never retrieved"
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+    
+    def stats(self) -> dict:
+        """Return delivery counters and producer settings."""
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "sent": self.sent,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "linger_ms": self.linger_ms,
+            "max_batch_size": self.max_batch_size,
+            "compression_type": self.compression_type,
+        }
+    
+    def encode(self, topic: str, message: BaseModel | dict) -> tuple[bytes, list[tuple[str, bytes]]]:
+        """Encode a message with the topic's codec, returning value and headers."""
+        codec = self.codecs.get(topic, JSON_CODEC)
+        if not codec.accepts(message):
+            codec = JSON_CODEC
+        return codec.encode(message), [(CONTENT_TYPE_HEADER, codec.content_type.encode('utf-8'))]
+    
+    async def _send_encoded(self, topic: str, value: bytes, key: Optional[str], headers):
+        try:
+            delivery = await self.producer.send(topic, value=value, key=key, headers=headers)
+        except Exception as e:
+            self.sent += 1
+            self._delivery_failed(topic, key, e)
+            raise
+        self._track(topic, key, delivery)
+        return await delivery
+    
+    def _track(self, topic: str, key: Optional[str], delivery: asyncio.Future):
+        self.sent += 1
+        self.in_flight += 1
+        if self.in_flight > self.max_in_flight:
+            self.max_in_flight = self.in_flight
+        
+        def on_done(fut: asyncio.Future):
+            self.in_flight -= 1
+            if fut.cancelled():
+                self._delivery_failed(topic, key, asyncio.CancelledError())
+            elif fut.exception() is not None:
+                self._delivery_failed(topic, key, fut.exception())
+            else:
+                self.delivered += 1
+        
+        delivery.add_done_callback(on_done)
+    
+    def _delivery_failed(self, topic: str, key: Optional[str], error: BaseException):
+        self.failed += 1
+        for callback in self._failure_callbacks:
+            try:
+                callback(topic, key, error)
+            except Exception as e:
+                logger.error(f"Delivery failure callback raised: {e}")
+
+
+def partition_for_key(key: str, num_partitions: int) -> int:
+    """
+    Return the partition a keyed record is produced to.
+    
+    Matches aiokafka's (and the Java client's) default partitioner: murmur2
+    of the UTF-8 key, masked to a positive int, modulo the partition count.
+    """
+    return (murmur2(key.encode('utf-8')) & 0x7FFFFFFF) % num_partitions
+
+
+def partitions_for_keys(keys: list[str], num_partitions: int) -> list[int]:
+    """Return the sorted set of partitions the given keys hash to."""
+    return sorted({partition_for_key(key, num_partitions) for key in keys})
 
 
 class KafkaConsumerHelper:
-    """Async Kafka consumer with JSON deserialization."""
+    """
+    Async Kafka consumer decoding values by their content-type header.
+    
+    Topics listed in ``value_models`` are validated straight from the raw
+    record bytes into the given pydantic model; other topics yield plain
+    values. Records that fail to decode are logged and skipped.
+    
+    With ``assign_keys`` the consumer does not join a consumer group.
+    Instead it is manually assigned only the partitions those record keys
+    hash to, so a consumer interested in a few keys reads roughly
+    ``len(partitions) / num_partitions`` of the topic. Records for other
+    keys that share a partition still arrive and must be filtered.
+    """
     
     def __init__(
         self,
         bootstrap_servers: str,
         topics: list[str],
         group_id: str,
-        auto_offset_reset: str = "latest"
+        auto_offset_reset: str = "latest",
+        enable_auto_commit: bool = True,
+        value_models: Optional[dict[str, type[BaseModel]]] = None,
+        assign_keys: Optional[list[str]] = None
     ):
         self.bootstrap_servers = bootstrap_servers
         self.topics = topics
         self.group_id = group_id
         self.auto_offset_reset = auto_offset_reset
+        self.enable_auto_commit = enable_auto_commit
+        self.value_models = value_models or {}
+        self.assign_keys = assign_keys
         self.consumer: Optional[AIOKafkaConsumer] = None
     
     async def start(self):
         """Initialize and start the consumer."""
+        # Keyed consumers are assigned partitions explicitly instead of subscribing
+        subscribe = self.topics if self.assign_keys is None else ()
         self.consumer = AIOKafkaConsumer(
-            *self.topics,
+            *subscribe,
             bootstrap_servers=self.bootstrap_servers,
             group_id=self.group_id,
             auto_offset_reset=self.auto_offset_reset,
-            value_deserializer=lambda m: json.loads(m.decode('utf-8')),
+            enable_auto_commit=self.enable_auto_commit,
             key_deserializer=lambda k: k.decode('utf-8') if k else None,
         )
         await self.consumer.start()
+        
+        if self.assign_keys is not None:
+            await self.consumer.topics()  # Refresh cluster metadata
+            partition_counts = {}
+            for topic in self.topics:
+                partitions = self.consumer.partitions_for_topic(topic)
+                if not partitions:
+                    raise RuntimeError(f"Cannot assign partitions: topic '{topic}' not found")
+                partition_counts[topic] = len(partitions)
+            assignment = self.key_assignment(partition_counts)
+            self.consumer.assign(assignment)
+            logger.info(
+                f"Kafka consumer started: {len(assignment)} partitions of {self.topics} "
+                f"for {len(self.assign_keys)} keys, group={self.group_id}"
+            )
+            return
+        
         logger.info(f"Kafka consumer started: topics={self.topics}, group={self.group_id}")
     
+    def key_assignment(self, partition_counts: dict[str, int]) -> list[TopicPartition]:
+        """Return the topic partitions holding ``assign_keys``, given each topic's partition count."""
+        return [
+            TopicPartition(topic, partition)
+            for topic in self.topics
+            for partition in partitions_for_keys(self.assign_keys, partition_counts[topic])
+        ]
+    
     async def stop(self):
         """Stop the consumer."""
         if self.consumer:
@@ -91,28 +485,134 @@ class KafkaConsumerHelper:
             raise RuntimeError("Consumer not started")
         
         async for msg in self.consumer:
-            logger.debug(f"Received from {msg.topic}: {msg.value}")
-            yield {
-                "topic": msg.topic,
-                "key": msg.key,
-                "value": msg.value,
-                "partition": msg.partition,
-                "offset": msg.offset,
-            }
-
-
-async def ensure_topics(bootstrap_servers: str, topics: list[str], num_partitions: int = 1):
-    """Ensure Kafka topics exist, creating them if necessary."""
+            # Arguments are only formatted when DEBUG is enabled
+            logger.debug("Received from {}: {}", msg.topic, msg.value)
+            record = self._to_record(msg)
+            if record is not None:
+                yield record
+    
+    async def consume_batches(
+        self,
+        max_records: int = 500,
+        timeout_ms: int = 100,
+        commit: bool = False
+    ) -> AsyncIterator[list[dict]]:
+        """
+        Consume records in per-partition batches using ``getmany()``.
+        
+        Each yielded list holds records from a single partition in offset
+        order. With ``commit=True`` the partition offset is committed only
+        once the caller resumes iteration, i.e. after the batch has been fully
+        handled, which gives at-least-once delivery. This requires the
+        consumer to be created with ``enable_auto_commit=False``.
+        
+        Args:
+            max_records: Maximum records fetched per wakeup (all partitions)
+            timeout_ms: Maximum time to wait for records
+            commit: Commit offsets after each batch is handled
+        """
+        if not self.consumer:
+            raise RuntimeError("Consumer not started")
+        if commit and self.enable_auto_commit:
+            raise ValueError("Manual commit requires enable_auto_commit=False")
+        
+        while True:
+            batches = await self.consumer.getmany(timeout_ms=timeout_ms, max_records=max_records)
+            for tp, messages in batches.items():
+                if not messages:
+                    continue
+                logger.debug("Received {} records from {}", len(messages), tp)
+                records = [self._to_record(msg) for msg in messages]
+                yield [record for record in records if record is not None]
+                if commit:
+                    await self.consumer.commit({tp: messages[-1].offset + 1})
+    
+    async def commit(self):
+        """Commit the offsets of all records consumed so far."""
+        if not self.consumer:
+            raise RuntimeError("Consumer not started")
+        await self.consumer.commit()
+    
+    async def commit_offset(self, topic: str, partition: int, offset: int):
+        """Commit one partition's position (the offset of the next record to read)."""
+        if not self.consumer:
+            raise RuntimeError("Consumer not started")
+        await self.consumer.commit({TopicPartition(topic, partition): offset})
+    
+    def decode_value(self, topic: str, raw: bytes, headers=()) -> BaseModel | Any:
+        """Decode a raw record value using the codec named in its headers."""
+        codec = JSON_CODEC
+        for name, header_value in headers or ():
+            if name == CONTENT_TYPE_HEADER:
+                content_type = header_value.decode('utf-8')
+                codec = _CODECS_BY_CONTENT_TYPE.get(content_type)
+                if codec is None:
+                    raise ValueError(f"Unsupported content type '{content_type}'")
+                break
+        return codec.decode(raw, self.value_models.get(topic))
+    
+    def _to_record(self, msg) -> Optional[dict]:
+        try:
+            value = self.decode_value(msg.topic, msg.value, msg.headers)
+        except (ValidationError, ValueError, struct.error, IndexError) as e:
+            logger.error(f"Dropping undecodable record {msg.topic}[{msg.partition}]@{msg.offset}: {e}")
+            return None
+        return {
+            "topic": msg.topic,
+            "key": msg.key,
+            "value": value,
+            "partition": msg.partition,
+            "offset": msg.offset,
+        }
+
+
+async def ensure_topics(
+    bootstrap_servers: str,
+    topics: list[str],
+    num_partitions: int = 1,
+    partitions: Optional[dict[str, int]] = None
+):
+    """
+    Ensure Kafka topics exist with at least the requested partition count.
+    
+    Missing topics are created; existing topics with fewer partitions are
+    grown (Kafka cannot shrink a topic). Growing a topic remaps keys to
+    partitions, so keyed consumers must be restarted afterwards.
+    
+    Args:
+        bootstrap_servers: Kafka bootstrap servers
+        topics: Topics to ensure
+        num_partitions: Default partition count
+        partitions: Per-topic partition counts overriding ``num_partitions``
+    """
+    partitions = partitions or {}
+    wanted = {topic: partitions.get(topic, num_partitions) for topic in topics}
     admin = AIOKafkaAdminClient(bootstrap_servers=bootstrap_servers)
     await admin.start()
     
     try:
-        new_topics = [
-            NewTopic(name=topic, num_partitions=num_partitions, replication_factor=1)
-            for topic in topics
-        ]
-        await admin.create_topics(new_topics, validate_only=False)
-        logger.info(f"Created topics: {topics}")
+        current = {
+            meta["topic"]: len(meta["partitions"])
+            for meta in await admin.describe_topics(list(wanted))
+            if meta["error_code"] == 0
+        }
+        missing = [topic for topic in wanted if topic not in current]
+        if missing:
+            await admin.create_topics(
+                [NewTopic(name=topic, num_partitions=wanted[topic], replication_factor=1) for topic in missing],
+                validate_only=False
+            )
+            logger.info(f"Created topics: {missing}")
+        
+        grow = {
+            topic: NewPartitions(total_count=wanted[topic])
+            for topic, count in current.items() if count < wanted[topic]
+        }
+        if grow:
+            await admin.create_partitions(grow)
+            logger.info(f"Grew topic partitions: { {t: p.total_count for t, p in grow.items()} }")
+        elif not missing:
+            logger.debug(f"Topics already exist: {topics}")
     except TopicAlreadyExistsError:
         logger.debug(f"Topics already exist: {topics}")
     except Exception as e:
@@ -0,0 +1,85 @@
+"""
+Deadline-based liveness tracking.
+Detects keys (e.g. CP Monitors) that stopped sending heartbeats without
+scanning every tracked key.
+"""
+
+import heapq
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class LivenessTracker:
+    """
+    Track a heartbeat deadline per key and report keys whose deadline passed.
+
+    Deadlines live in a dict; a min-heap holds at most one entry per key,
+    ordered by the deadline it had when it was pushed. A heartbeat only
+    updates the dict (O(1)). When an entry reaches the top of the heap and
+    its key has since been touched, it is pushed back with the new deadline
+    instead of expiring, so ``expire()`` costs O((expired + extended) log n)
+    and keys that keep sending heartbeats are revisited at most once per
+    timeout period, not once per heartbeat.
+    """
+
+    def __init__(self, timeout: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the tracker.
+
+        Args:
+            timeout: Seconds without a heartbeat before a key expires
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.timeout = timeout
+        self.clock = clock
+        self._deadlines: Dict[Hashable, float] = {}
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        # Tie-breaker so keys themselves never need to be comparable
+        self._counter = 0
+        self.expired_total = 0
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._deadlines
+
+    def touch(self, key: Hashable):
+        """Record a heartbeat for key, pushing its deadline out by ``timeout``."""
+        deadline = self.clock() + self.timeout
+        if key not in self._deadlines:
+            self._push(deadline, key)
+        self._deadlines[key] = deadline
+
+    def expire(self, now: Optional[float] = None) -> List[Hashable]:
+        """Remove and return every key whose deadline is at or before now."""
+        if now is None:
+            now = self.clock()
+        heap = self._heap
+        deadlines = self._deadlines
+        expired = []
+        while heap and heap[0][0] <= now:
+            _, _, key = heapq.heappop(heap)
+            deadline = deadlines[key]
+            if deadline > now:
+                self._push(deadline, key)  # touched since this entry was pushed
+                continue
+            del deadlines[key]
+            expired.append(key)
+        self.expired_total += len(expired)
+        return expired
+
+    def next_deadline(self) -> Optional[float]:
+        """Earliest deadline in the heap (may belong to a touched key), or None."""
+        return self._heap[0][0] if self._heap else None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "tracked": len(self._deadlines),
+            "heap_entries": len(self._heap),
+            "expired_total": self.expired_total,
+        }
+
+    def _push(self, deadline: float, key: Hashable):
+        self._counter += 1
+        heapq.heappush(self._heap, (deadline, self._counter, key))
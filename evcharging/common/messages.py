@@ -142,6 +142,25 @@ class CPRegistration(BaseModel):
     ts: datetime = Field(default_factory=utc_now, description="Timestamp")
 
 
+class MonitorHeartbeat(BaseModel):
+    """CP Monitor liveness report, sent alone or in a batch to Central."""
+    cp_id: str = Field(..., description="Charging point identifier")
+    ts: datetime = Field(default_factory=utc_now, description="Timestamp")
+    health_rtt_ms: Optional[float] = Field(None, description="Last CP Engine health probe round-trip time")
+    engine_state: Optional[str] = Field(None, description="CP Engine state reported by the last health probe")
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "cp_id": "CP-001",
+                "ts": "2025-10-13T12:00:05Z",
+                "health_rtt_ms": 0.42,
+                "engine_state": "ACTIVATED"
+            }
+        }
+    )
+
+
 def get_json_schemas() -> dict:
     """Export JSON schemas for all message types."""
     return {
@@ -151,4 +170,5 @@ def get_json_schemas() -> dict:
         "CPStatus": CPStatus.model_json_schema(),
         "CPTelemetry": CPTelemetry.model_json_schema(),
         "CPRegistration": CPRegistration.model_json_schema(),
+        "MonitorHeartbeat": MonitorHeartbeat.model_json_schema(),
     }
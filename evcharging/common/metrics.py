@@ -0,0 +1,49 @@
+"""
+Lightweight in-process metrics.
+Rolling latency windows for request/probe round-trip times.
+"""
+
+import math
+from collections import deque
+from typing import Optional
+
+
+def _nearest_rank(ordered: list[float], p: float) -> float:
+    return ordered[max(1, math.ceil(p / 100 * len(ordered))) - 1]
+
+
+class RollingLatency:
+    """
+    Keeps the most recent ``window`` latency samples (seconds).
+
+    Percentiles are computed on demand from the window, so recording is
+    O(1) and reading is O(window log window); reads are expected to be rare
+    (logging, metrics endpoints) compared to samples.
+    """
+
+    def __init__(self, window: int = 1000):
+        self.samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, seconds: float):
+        """Add one latency sample."""
+        self.samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Return the p-th percentile (0-100, nearest rank) of the window."""
+        if not self.samples:
+            return None
+        return _nearest_rank(sorted(self.samples), p)
+
+    def stats(self) -> dict:
+        """Return count and p50/p99/max of the window in milliseconds."""
+        if not self.samples:
+            return {"count": self.count, "p50_ms": None, "p99_ms": None, "max_ms": None}
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "p50_ms": round(_nearest_rank(ordered, 50) * 1000, 3),
+            "p99_ms": round(_nearest_rank(ordered, 99) * 1000, 3),
+            "max_ms": round(ordered[-1] * 1000, 3),
+        }
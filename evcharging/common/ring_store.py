@@ -0,0 +1,89 @@
+"""
+Bounded, sequence-numbered record store.
+Keeps the newest ``capacity`` records of an append-only feed (notifications,
+session history) and serves them by cursor, so memory and response sizes
+stay flat however long the process runs.
+"""
+
+from collections import deque
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, Generic, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class RingStore(Generic[T]):
+    """
+    Ring buffer of records with monotonically increasing sequence numbers.
+
+    Every stored record gets the next ``seq`` (starting at 1); once the
+    buffer is full the oldest record is dropped. Sequence numbers are never
+    reused, so ``page(after=seq)`` is a stable cursor: records are
+    contiguous in seq, and the start of a page is found by arithmetic
+    instead of a search. With ``dedup_key``, a record whose key equals the
+    newest record's key is not stored.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        dedup_key: Optional[Callable[[T], Any]] = None,
+        set_seq: Optional[Callable[[T, int], None]] = None
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            capacity: Maximum number of records kept
+            dedup_key: Key of a record for dropping identical consecutive records
+            set_seq: Called with each stored record and its assigned seq
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.dedup_key = dedup_key
+        self.set_seq = set_seq
+        self._records: Deque[T] = deque(maxlen=capacity)
+        self.last_seq = 0
+        self.evicted_total = 0
+        self.deduplicated_total = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._records)
+
+    @property
+    def first_seq(self) -> int:
+        """Seq of the oldest record held (last_seq + 1 when empty)."""
+        return self.last_seq - len(self._records) + 1
+
+    def append(self, record: T) -> Optional[int]:
+        """Store a record and return its seq, or None if it was deduplicated."""
+        if self.dedup_key is not None and self._records:
+            if self.dedup_key(self._records[-1]) == self.dedup_key(record):
+                self.deduplicated_total += 1
+                return None
+        if len(self._records) == self.capacity:
+            self.evicted_total += 1
+        self.last_seq += 1
+        if self.set_seq is not None:
+            self.set_seq(record, self.last_seq)
+        self._records.append(record)
+        return self.last_seq
+
+    def page(self, after: int = 0, limit: Optional[int] = None) -> List[T]:
+        """Records with seq greater than ``after``, oldest first, at most ``limit``."""
+        start = max(0, after - self.first_seq + 1)
+        stop = None if limit is None else start + limit
+        return list(islice(self._records, start, stop))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._records),
+            "capacity": self.capacity,
+            "last_seq": self.last_seq,
+            "evicted_total": self.evicted_total,
+            "deduplicated_total": self.deduplicated_total,
+        }
@@ -0,0 +1,210 @@
+"""
+Versioned, pre-serialized snapshot of charging point state.
+
+Backs Central's GET /cp, /cp/changes and /events, and the driver
+dashboard's /events. The owner calls ``mark_changed(cp_id)`` whenever a
+displayed field of a charging point changes (``mark_summary_changed()``
+for the top-level summary fields). Each call bumps the snapshot version; the CP's
+view is re-rendered and re-serialized lazily on the next read, so reads
+between changes return the same cached bytes and ETag.
+
+A change log holding the latest change version of each CP backs
+``changes_since()``, so pollers can fetch only the CPs that changed after
+the version they hold. Its size follows the number of CPs, not the update
+rate, so a CP streaming telemetry cannot push the others out of it.
+Push subscribers (``event_stream()``) register a wake-up event that is set
+on every change and then read the same delta, so idle streams cost nothing
+and bursts of changes are coalesced into one read.
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+class DashboardSnapshot:
+    """Incrementally maintained GET /cp payload with a version-based ETag."""
+
+    def __init__(
+        self,
+        render_cp: Callable[[str], Optional[dict]],
+        render_summary: Callable[[], dict],
+        change_log_size: int = 10000
+    ):
+        """
+        Initialize the snapshot.
+
+        Args:
+            render_cp: Returns the view dict for a CP ID (None if removed)
+            render_summary: Returns top-level fields sent alongside the CP list
+            change_log_size: CPs kept in the change log before the oldest changes are forgotten
+        """
+        self.render_cp = render_cp
+        self.render_summary = render_summary
+        self.version = 0
+        # Distinguishes versions across restarts, which both start from 0
+        self.epoch = format(time.time_ns() // 1_000_000, "x")
+        self._views: Dict[str, dict] = {}
+        self._fragments: Dict[str, bytes] = {}
+        # Insertion-ordered, so new CPs are appended in the order they appeared
+        self._dirty: Dict[str, None] = {}
+        self._body = b""
+        self._body_version = -1
+        # cp_id -> version of its latest change, oldest first; None for summary-only changes
+        self.change_log_size = change_log_size
+        self._changes: "OrderedDict[Optional[str], int]" = OrderedDict()
+        # Changes up to this version may have been evicted from the log
+        self._log_floor = 0
+        self._subscribers: set[asyncio.Event] = set()
+
+        # Metrics
+        self.cp_renders = 0
+        self.body_builds = 0
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.epoch}-{self.version}"'
+
+    def mark_changed(self, cp_id: str):
+        """Record that a CP's displayed state changed."""
+        self._dirty[cp_id] = None
+        self._bump(cp_id)
+
+    def mark_summary_changed(self):
+        """Record a change to the summary fields that did not come with a CP change."""
+        self._bump(None)
+
+    def views(self) -> List[dict]:
+        """Current CP views in registration order (shared; do not mutate)."""
+        self._refresh()
+        return list(self._views.values())
+
+    def body(self) -> bytes:
+        """Serialized {"charging_points": [...], **summary, epoch, version} for the current version."""
+        if self._body_version != self.version:
+            self._refresh()
+            parts = [b'{"charging_points":[', b",".join(self._fragments.values()), b"]"]
+            summary = {**self.render_summary(), "epoch": self.epoch, "version": self.version}
+            for key, value in summary.items():
+                parts += [b",", _dumps(key), b":", _dumps(value)]
+            parts.append(b"}")
+            self._body = b"".join(parts)
+            self._body_version = self.version
+            self.body_builds += 1
+        return self._body
+
+    def changes_since(self, since: int, epoch: Optional[str] = None) -> dict:
+        """
+        Views of the CPs changed after version ``since``.
+
+        Returns {"resync": True, ...} instead when the change log no longer
+        reaches back to ``since``, or ``since``/``epoch`` belong to another
+        Central run; the client should then reload GET /cp.
+        """
+        result = {"epoch": self.epoch, "version": self.version}
+        if (epoch is not None and epoch != self.epoch) or since > self.version or since < self._log_floor:
+            result["resync"] = True
+            return result
+
+        changed: Dict[str, None] = {}
+        for cp_id, version in reversed(self._changes.items()):
+            if version <= since:
+                break
+            changed[cp_id] = None
+        self._refresh()
+        result["resync"] = False
+        result["charging_points"] = [
+            self._views[cp_id] for cp_id in reversed(changed) if cp_id in self._views
+        ]
+        result.update(self.render_summary())
+        return result
+
+    def subscribe(self) -> asyncio.Event:
+        """Return an event that is set whenever the snapshot changes."""
+        wake = asyncio.Event()
+        self._subscribers.add(wake)
+        return wake
+
+    def unsubscribe(self, wake: asyncio.Event):
+        self._subscribers.discard(wake)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "version": self.version,
+            "charging_points": len(self._views),
+            "dirty": len(self._dirty),
+            "change_log": len(self._changes),
+            "subscribers": len(self._subscribers),
+            "cp_renders": self.cp_renders,
+            "body_builds": self.body_builds,
+        }
+
+    def _bump(self, cp_id: Optional[str]):
+        self.version += 1
+        self._changes[cp_id] = self.version
+        self._changes.move_to_end(cp_id)
+        while len(self._changes) > self.change_log_size:
+            _, evicted = self._changes.popitem(last=False)
+            self._log_floor = evicted
+        for wake in self._subscribers:
+            wake.set()
+
+    def _refresh(self):
+        for cp_id in self._dirty:
+            view = self.render_cp(cp_id)
+            if view is None:
+                self._views.pop(cp_id, None)
+                self._fragments.pop(cp_id, None)
+                continue
+            self._views[cp_id] = view
+            self._fragments[cp_id] = _dumps(view)
+            self.cp_renders += 1
+        self._dirty.clear()
+
+
+def _sse(event: str, data: bytes) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+
+
+async def event_stream(
+    snapshot: DashboardSnapshot,
+    coalesce: float = 0.1,
+    keepalive: float = 15.0
+) -> AsyncIterator[bytes]:
+    """
+    Server-Sent Events for a snapshot.
+
+    Sends a ``snapshot`` event with the full body on connect (and whenever
+    the change log no longer covers the stream), then one ``changes`` event
+    per burst of changes in the ``changes_since()`` format. Changes arriving
+    within ``coalesce`` seconds of each other are merged; an idle stream
+    only sends a keep-alive comment every ``keepalive`` seconds.
+    """
+    wake = snapshot.subscribe()
+    try:
+        version = snapshot.version
+        yield _sse("snapshot", snapshot.body())
+        while True:
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            # Let a burst of changes accumulate into one event
+            await asyncio.sleep(coalesce)
+            wake.clear()
+            delta = snapshot.changes_since(version)
+            if delta["resync"]:
+                version = snapshot.version
+                yield _sse("snapshot", snapshot.body())
+                continue
+            version = delta["version"]
+            yield _sse("changes", _dumps(delta))
+    finally:
+        snapshot.unsubscribe(wake)
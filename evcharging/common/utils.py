@@ -1,12 +1,16 @@
 """
 Utility functions for EV Charging simulation.
-Includes ID generation, timestamps, and LRC calculation stub.
+Includes ID generation, timestamps, and framing helpers.
 """
 
+import random
 import uuid
 from datetime import datetime, timezone
 from typing import Optional
 
+# LRC and framing live in framing.py; re-exported here for existing callers
+from evcharging.common.framing import calculate_lrc, frame_message
+
 
 def generate_id(prefix: str = "") -> str:
     """Generate a unique identifier with optional prefix."""
@@ -19,40 +23,15 @@ def utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
-def calculate_lrc(data: bytes) -> int:
-    """
-    Calculate Longitudinal Redundancy Check using XOR.
-    
-    TODO: Implement full <STX><DATA><ETX><LRC> framing for TCP protocol.
-    
-    Args:
-        data: Byte data to calculate LRC for
-    
-    Returns:
-        LRC value (XOR of all bytes)
-    """
-    lrc = 0
-    for byte in data:
-        lrc ^= byte
-    return lrc
-
-
-def frame_message(data: str) -> bytes:
+def jittered_backoff(attempt: int, base: float = 0.5, cap: float = 10.0) -> float:
     """
-    Frame a message with STX, ETX, and LRC.
+    Delay before retry number ``attempt`` (1-based), with full jitter.
     
-    TODO: Complete implementation for production use.
-    
-    Format: <STX><DATA><ETX><LRC>
-    STX = 0x02, ETX = 0x03
+    The delay is drawn uniformly from [0, min(cap, base * 2**(attempt-1))],
+    so many clients that lost the same server do not reconnect in lockstep.
+    The exponent is clamped so long outages cannot overflow the float.
     """
-    STX = 0x02
-    ETX = 0x03
-    
-    data_bytes = data.encode('utf-8')
-    lrc = calculate_lrc(data_bytes)
-    
-    return bytes([STX]) + data_bytes + bytes([ETX, lrc])
+    return random.uniform(0, min(cap, base * 2 ** min(max(attempt - 1, 0), 32)))
 
 
 def unframe_message(framed: bytes) -> Optional[str]:
@@ -0,0 +1,41 @@
+"""
+Shared fixtures for the unit tests.
+Provides an in-memory producer in place of KafkaProducerHelper and a
+Central controller wired to it.
+"""
+
+import pytest
+
+from evcharging.apps.ev_central.main import EVCentralController
+from evcharging.common.config import CentralConfig
+
+
+class FakeProducer:
+    """Records (topic, message, key) for every send instead of publishing."""
+
+    def __init__(self):
+        self.sent = []
+        self.stopped = False
+
+    async def send(self, topic, message, key=None):
+        self.sent.append((topic, message, key))
+
+    def send_nowait(self, topic, message, key=None):
+        self.sent.append((topic, message, key))
+
+    async def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def producer():
+    return FakeProducer()
+
+
+@pytest.fixture
+def controller(tmp_path, monkeypatch, producer):
+    monkeypatch.chdir(tmp_path)
+    ctrl = EVCentralController(CentralConfig(db_write_behind=False))
+    ctrl.producer = producer
+    yield ctrl
+    ctrl.db.close()
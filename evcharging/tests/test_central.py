@@ -0,0 +1,343 @@
+"""
+Unit tests for the EV Central controller.
+Runs the controller against an in-memory producer instead of Kafka.
+"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from evcharging.apps.ev_central.dashboard import create_dashboard_app
+from evcharging.apps.ev_central.request_index import ActiveRequestIndex
+from evcharging.common.config import TOPICS
+from evcharging.common.messages import (
+    CPRegistration, CPStatus, CPTelemetry, DriverRequest, MessageStatus
+)
+from evcharging.common.states import CPState
+
+
+def register(controller, cp_id):
+    controller.register_cp(CPRegistration(cp_id=cp_id, cp_e_host="localhost", cp_e_port=8001))
+
+
+def driver_updates(controller):
+    return [m for t, m, _ in controller.producer.sent if t == TOPICS["DRIVER_UPDATES"]]
+
+
+def start_session(controller, cp_id="CP-001", driver_id="driver-1", request_id="req-1"):
+    asyncio.run(controller.handle_driver_request(
+        DriverRequest(request_id=request_id, driver_id=driver_id, cp_id=cp_id)
+    ))
+    asyncio.run(controller.handle_cp_status(CPStatus(cp_id=cp_id, state="SUPPLYING")))
+    return controller.charging_points[cp_id].current_session
+
+
+def test_driver_request_accepted(controller):
+    """Test that an available CP accepts a request and is commanded to supply."""
+    register(controller, "CP-001")
+    session_id = start_session(controller)
+
+    assert session_id is not None
+    assert driver_updates(controller)[0].status == MessageStatus.ACCEPTED
+    assert controller.charging_points["CP-001"].state == CPState.SUPPLYING
+
+
+def test_unknown_cp_denied(controller):
+    """Test that requests for unknown CPs are denied."""
+    asyncio.run(controller.handle_driver_request(
+        DriverRequest(request_id="req-1", driver_id="driver-1", cp_id="CP-404")
+    ))
+    assert driver_updates(controller)[0].status == MessageStatus.DENIED
+
+
+def test_telemetry_is_coalesced_until_session_end(controller):
+    """Test that telemetry only reaches the DB on flush or session end."""
+    register(controller, "CP-001")
+    session_id = start_session(controller)
+
+    for i in range(1, 6):
+        asyncio.run(controller.handle_cp_telemetry(CPTelemetry(
+            cp_id="CP-001", kw=22.0, kwh=i * 0.1, euros=i * 0.03,
+            driver_id="driver-1", session_id=session_id
+        )))
+
+    assert controller.energy_coalescer.stats()["dirty_sessions"] == 1
+    assert controller.db.get_session_history(cp_id="CP-001")[0]["total_kwh"] is None
+
+    asyncio.run(controller.handle_cp_status(CPStatus(cp_id="CP-001", state="ACTIVATED")))
+
+    session = controller.db.get_session_history(cp_id="CP-001")[0]
+    assert session["status"] == "COMPLETED"
+    assert session["total_kwh"] == pytest.approx(0.5)
+    assert controller.energy_coalescer.stats()["dirty_sessions"] == 0
+    assert driver_updates(controller)[-1].status == MessageStatus.COMPLETED
+
+
+def test_batched_monitor_heartbeats(controller):
+    """Test that one batch updates liveness for every CP it carries."""
+    register(controller, "CP-001")
+    client = TestClient(create_dashboard_app(controller))
+    response = client.post("/cp/heartbeat/batch", json=[
+        {"cp_id": "CP-001", "health_rtt_ms": 0.4, "engine_state": "ACTIVATED"},
+        {"cp_id": "CP-002"},
+    ])
+
+    assert response.json() == {"success": True, "recorded": 2}
+    assert controller.charging_points["CP-001"].monitor_rtt_ms == 0.4
+    assert controller.charging_points["CP-001"].monitor_engine_state == "ACTIVATED"
+    # Unknown CPs are auto-registered, as with single heartbeats
+    assert controller.charging_points["CP-002"].monitor_status == "OK"
+
+
+def test_monitor_timeout_marks_cp_disconnected(controller):
+    """Test that expiring a monitor's deadline disconnects only that CP."""
+    now = [0.0]
+    controller.liveness.clock = lambda: now[0]
+    register(controller, "CP-001")
+    register(controller, "CP-002")
+    now[0] = 3.0
+    controller.record_monitor_ping("CP-002")
+    now[0] = 6.0
+
+    # Reads never change monitor state; the liveness tick does
+    assert controller.get_dashboard_data()["charging_points"][0]["monitor_status"] == "OK"
+    assert controller.expire_monitors() == 1
+
+    assert controller.charging_points["CP-001"].monitor_status == "DOWN"
+    assert controller.charging_points["CP-001"].state == CPState.DISCONNECTED
+    assert controller.charging_points["CP-002"].state == CPState.ACTIVATED
+
+
+def test_cp_list_served_from_versioned_snapshot(controller):
+    """Test ETag revalidation and that only changed CPs are re-rendered."""
+    register(controller, "CP-001")
+    register(controller, "CP-002")
+    client = TestClient(create_dashboard_app(controller))
+
+    first = client.get("/cp")
+    etag = first.headers["etag"]
+    assert [cp["cp_id"] for cp in first.json()["charging_points"]] == ["CP-001", "CP-002"]
+    assert client.get("/cp", headers={"If-None-Match": etag}).status_code == 304
+
+    # Heartbeats from a live monitor do not change the snapshot
+    controller.record_monitor_ping("CP-001")
+    assert client.get("/cp", headers={"If-None-Match": etag}).status_code == 304
+
+    renders = controller.snapshot.cp_renders
+    asyncio.run(controller.handle_cp_telemetry(CPTelemetry(
+        cp_id="CP-002", kw=22.0, kwh=0.5, euros=0.15, driver_id="driver-1", session_id="s-1"
+    )))
+    second = client.get("/cp", headers={"If-None-Match": etag})
+
+    assert second.status_code == 200
+    assert second.headers["etag"] != etag
+    assert second.json()["charging_points"][1]["telemetry"]["kwh"] == 0.5
+    assert controller.snapshot.cp_renders == renders + 1
+
+
+def test_dashboard_page_has_one_style_block(controller):
+    """Test that the dashboard HTML opens and closes its style block once."""
+    html = TestClient(create_dashboard_app(controller)).get("/").text
+
+    assert html.count("<style>") == html.count("</style>") == 1
+    assert html.index("<style>") < html.index("</style>")
+
+
+def test_changes_feed_returns_only_changed_cps(controller):
+    """Test delta polling and the resync response once the log is exceeded."""
+    for i in range(5):
+        register(controller, f"CP-{i:03d}")
+    client = TestClient(create_dashboard_app(controller))
+    full = client.get("/cp").json()
+
+    asyncio.run(controller.mark_cp_faulty("CP-003", "probe timeout"))
+    asyncio.run(controller.mark_cp_faulty("CP-001", "probe timeout"))
+    asyncio.run(controller.clear_cp_fault("CP-003"))
+    delta = client.get("/cp/changes", params={"since": full["version"], "epoch": full["epoch"]}).json()
+
+    assert delta["resync"] is False
+    assert [cp["cp_id"] for cp in delta["charging_points"]] == ["CP-001", "CP-003"]
+    assert delta["charging_points"][1]["state"] == "ON"
+    assert client.get("/cp/changes", params={"since": delta["version"]}).json()["charging_points"] == []
+
+    # Once older CPs are evicted from the log, versions before them must resync
+    controller.snapshot.change_log_size = 1
+    asyncio.run(controller.mark_cp_faulty("CP-002", "probe timeout"))
+    assert client.get("/cp/changes", params={"since": full["version"]}).json()["resync"] is True
+    assert client.get("/cp/changes", params={"since": 0, "epoch": "other-run"}).json()["resync"] is True
+
+
+def test_change_log_keeps_one_entry_per_cp(controller):
+    """Test that a CP changing many times does not push other CPs out of the change log."""
+    controller.snapshot.change_log_size = 3
+    for i in range(3):
+        register(controller, f"CP-{i:03d}")
+    since = controller.snapshot.version
+    asyncio.run(controller.mark_cp_faulty("CP-000", "probe timeout"))
+    asyncio.run(controller.mark_cp_faulty("CP-001", "probe timeout"))
+    for _ in range(100):
+        controller.snapshot.mark_changed("CP-002")
+
+    delta = controller.snapshot.changes_since(since)
+
+    assert delta["resync"] is False
+    assert [cp["cp_id"] for cp in delta["charging_points"]] == ["CP-000", "CP-001", "CP-002"]
+    assert controller.snapshot.stats()["change_log"] == 3
+
+
+def test_events_stream_pushes_snapshot_then_changes(controller):
+    """Test that /events starts with the full list and then sends only changes."""
+    register(controller, "CP-001")
+    register(controller, "CP-002")
+    controller.config.events_coalesce_ms = 0
+    app = create_dashboard_app(controller)
+    endpoint = next(route.endpoint for route in app.routes if getattr(route, "path", None) == "/events")
+
+    async def run():
+        stream = (await endpoint()).body_iterator
+        first = await stream.__anext__()
+        next_event = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        assert not next_event.done()
+        await controller.mark_cp_faulty("CP-002", "probe timeout")
+        second = await asyncio.wait_for(next_event, timeout=1)
+        await stream.aclose()
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first.startswith(b"event: snapshot\ndata: ")
+    assert len(json.loads(first.split(b"data: ", 1)[1])["charging_points"]) == 2
+    assert second.startswith(b"event: changes\ndata: ")
+    changes = json.loads(second.split(b"data: ", 1)[1])
+    assert [cp["cp_id"] for cp in changes["charging_points"]] == ["CP-002"]
+    assert controller.snapshot.stats()["subscribers"] == 0
+
+
+def test_active_request_index():
+    """Test that the CP, driver and id lookups stay consistent."""
+    index = ActiveRequestIndex()
+    index.add(DriverRequest(request_id="req-1", driver_id="driver-1", cp_id="CP-001"))
+    index.add(DriverRequest(request_id="req-2", driver_id="driver-1", cp_id="CP-002"))
+
+    assert index.for_cp("CP-001", "driver-1").request_id == "req-1"
+    assert index.for_cp("CP-001", "driver-2") is None
+    assert {r.request_id for r in index.for_driver("driver-1")} == {"req-1", "req-2"}
+
+    # A new request on a CP replaces one that was never cleaned up
+    index.add(DriverRequest(request_id="req-3", driver_id="driver-3", cp_id="CP-001"))
+    assert "req-1" not in index
+    assert [r.request_id for r in index.for_driver("driver-1")] == ["req-2"]
+
+    assert index.remove("req-2").cp_id == "CP-002"
+    assert index.remove("req-2") is None
+    assert index.for_driver("driver-1") == []
+    assert len(index) == 1
+
+
+def test_session_end_releases_request(controller):
+    """Test that ending a session removes its request from every index."""
+    register(controller, "CP-001")
+    start_session(controller)
+    assert controller.active_requests.for_cp("CP-001").request_id == "req-1"
+
+    asyncio.run(controller.handle_cp_status(CPStatus(cp_id="CP-001", state="ACTIVATED")))
+
+    assert len(controller.active_requests) == 0
+    assert controller.active_requests.for_driver("driver-1") == []
+
+
+class FakeConsumer:
+    """Yields fixed partition batches, then idles; records committed offsets."""
+
+    def __init__(self, batches):
+        self.batches = batches
+        self.commits = []
+
+    async def consume_batches(self, **kwargs):
+        for batch in self.batches:
+            yield batch
+        await asyncio.Event().wait()
+
+    async def commit_offset(self, topic, partition, offset):
+        self.commits.append((partition, offset))
+
+    async def stop(self):
+        pass
+
+
+def test_slow_shard_only_delays_its_own_partition(controller):
+    """Test that offsets commit per partition as batches finish, without joining every shard."""
+    slow, fast = "CP-001", next(
+        f"CP-{i:03d}" for i in range(2, 100)
+        if controller.dispatcher.shard_for(f"CP-{i:03d}") != controller.dispatcher.shard_for("CP-001")
+    )
+    topic = TOPICS["CP_STATUS"]
+
+    def record(cp_id, partition, offset):
+        return {"topic": topic, "partition": partition, "offset": offset,
+                "value": CPStatus(cp_id=cp_id, state="ACTIVATED")}
+
+    controller.consumer = FakeConsumer([
+        [record(slow, 0, 10)],
+        [record(fast, 1, 20), record(fast, 1, 21)],
+        [record(fast, 0, 11)],
+    ])
+    release = None
+
+    async def handler(message):
+        if message.cp_id == slow:
+            await release.wait()
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        controller.dispatcher.handler = handler
+        controller.dispatcher.start()
+        processing = asyncio.create_task(controller.process_messages())
+        for _ in range(20):
+            await asyncio.sleep(0)
+        before = list(controller.consumer.commits)
+        release.set()
+        for _ in range(20):
+            await asyncio.sleep(0)
+        processing.cancel()
+        await controller.dispatcher.drain()
+        return before
+
+    before = asyncio.run(run())
+
+    # Partition 0's second batch waits for its first (slow) one
+    assert before == [(1, 22)]
+    assert controller.consumer.commits == [(1, 22), (0, 11), (0, 12)]
+
+
+def test_stop_with_queued_items_returns_without_committing_them(controller, monkeypatch):
+    """Test that a timed-out drain releases queued records and skips their offsets."""
+    topic = TOPICS["CP_STATUS"]
+    controller.consumer = FakeConsumer([
+        [{"topic": topic, "partition": 0, "offset": i, "value": CPStatus(cp_id="CP-001", state="ACTIVATED")}
+         for i in range(5)],
+        [{"topic": topic, "partition": 0, "offset": 5, "value": CPStatus(cp_id="CP-002", state="ACTIVATED")}],
+    ])
+    drain = controller.dispatcher.drain
+    monkeypatch.setattr(controller.dispatcher, "drain", lambda timeout=None: drain(timeout=0.05))
+
+    async def handler(message):
+        if message.cp_id == "CP-001":
+            await asyncio.Event().wait()  # Never finishes
+
+    async def run():
+        controller.dispatcher.handler = handler
+        controller.dispatcher.start()
+        processing = asyncio.create_task(controller.process_messages())
+        for _ in range(20):
+            await asyncio.sleep(0)
+        processing.cancel()
+        await asyncio.wait_for(controller.stop(), timeout=5.0)
+        return [task.result() for task in controller._commit_tasks.values()]
+
+    assert asyncio.run(run()) == [False]
+    assert controller.consumer.commits == []
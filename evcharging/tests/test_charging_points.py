@@ -0,0 +1,95 @@
+"""
+Unit tests for the charging point metadata registry.
+"""
+
+import asyncio
+import json
+import os
+
+from evcharging.common.charging_points import ChargingPointRegistry, get_metadata, get_registry
+
+FIELDS = "cp_id,name,address,city,latitude,longitude,connector_type,power_kw,amenities"
+
+
+def write_csv(path, rows):
+    path.write_text("\n".join([FIELDS] + rows) + "\n")
+
+
+def test_builtin_registry_loads_lazily():
+    """Test that the built-in data file provides the default CPs on first lookup."""
+    registry = ChargingPointRegistry()
+    assert registry.stats()["loaded"] is False
+
+    meta = registry.get("CP-002")
+
+    assert registry.stats()["loaded"] is True
+    assert len(registry) == 10
+    assert meta.name == "Harbor Fast Charge"
+    assert meta.power_kw == 150.0
+    assert meta.amenities == ["24/7", "Restrooms"]
+    assert registry.get("CP-404") is None
+    assert get_metadata("CP-001") == get_registry().get("CP-001")
+
+
+def test_registry_secondary_indexes():
+    """Test city, connector and power filters, alone and combined."""
+    registry = ChargingPointRegistry()
+
+    assert registry.find(connector_type="ccs") == ["CP-002", "CP-004", "CP-006", "CP-008", "CP-010"]
+    assert registry.find(min_power_kw=100) == ["CP-002", "CP-006", "CP-010"]
+    assert registry.find(min_power_kw=22, connector_type="Type 2") == ["CP-001", "CP-005", "CP-009"]
+    assert registry.find(city="Gotham") == []
+    assert len(registry.find(city="metropolis")) == 10
+
+
+def test_registry_reads_json_lines(tmp_path):
+    """Test loading a .jsonl file with amenities as a list."""
+    path = tmp_path / "cps.jsonl"
+    path.write_text(json.dumps({
+        "cp_id": "CP-900", "name": "Depot", "address": "1 Yard Rd", "city": "Springfield",
+        "latitude": 42.1, "longitude": -71.5, "connector_type": "CHAdeMO", "power_kw": 50,
+        "amenities": ["Fleet Only"]
+    }) + "\n\n")
+
+    registry = ChargingPointRegistry(path)
+
+    assert registry.cp_ids() == ["CP-900"]
+    assert registry.get("CP-900").amenities == ["Fleet Only"]
+    assert registry.geo_index().nearest(42.1, -71.5, k=1)[0][0] == "CP-900"
+
+
+def test_registry_hot_reload_swaps_and_keeps_data_on_error(tmp_path):
+    """Test that a changed file is swapped in and a broken one is ignored."""
+    path = tmp_path / "cps.csv"
+    write_csv(path, ["CP-A,A,1 St,Oldtown,1.0,1.0,CCS,50,"])
+    registry = ChargingPointRegistry(path)
+    old_index = registry.geo_index()
+
+    assert registry.reload_if_changed() is False
+    write_csv(path, ["CP-A,A,1 St,Newtown,1.0,1.0,CCS,50,", "CP-B,B,2 St,Newtown,2.0,2.0,Type 2,11,WiFi"])
+    os.utime(path, ns=(1, 1))
+
+    assert registry.reload_if_changed() is True
+    assert registry.find(city="newtown") == ["CP-A", "CP-B"]
+    assert registry.geo_index() is not old_index
+    assert len(registry.geo_index()) == 2
+
+    write_csv(path, ["CP-C,C,3 St,Newtown,north,2.0,CCS,50,"])
+    assert registry.reload() is False
+    assert registry.cp_ids() == ["CP-A", "CP-B"]
+    assert registry.stats()["loads"] == 2
+
+
+def test_event_loop_lookups_never_read_the_file(tmp_path):
+    """Test that lookups on the loop see an empty registry until a worker thread loads it."""
+    path = tmp_path / "cps.csv"
+    write_csv(path, ["CP-A,A,1 St,Oldtown,1.0,1.0,CCS,50,"])
+    registry = ChargingPointRegistry(path)
+
+    async def run():
+        before = (registry.get("CP-A"), registry.find(city="oldtown"), len(registry.geo_index()))
+        await asyncio.to_thread(registry.load)
+        return before, registry.get("CP-A").city, registry.geo_index().nearest(1.0, 1.0, k=1)[0][0]
+
+    assert asyncio.run(run()) == ((None, [], 0), "Oldtown", "CP-A")
+    assert registry.stats()["loads"] == 1
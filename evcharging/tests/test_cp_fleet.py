@@ -0,0 +1,54 @@
+"""
+Unit tests for the CP fleet host.
+Runs hosted engines against an in-memory producer instead of Kafka.
+"""
+
+import asyncio
+
+from evcharging.apps.ev_cp_e.fleet import CPFleetHost
+from evcharging.common.config import CPFleetConfig, TOPICS
+from evcharging.common.messages import CentralCommand, CommandType
+from evcharging.common.states import CPState
+
+
+def make_host(producer, count=5):
+    host = CPFleetHost(CPFleetConfig(cp_count=count, command_workers=2, telemetry_interval=0.01))
+    host.producer = producer
+    host.create_engines()
+    return host
+
+
+def test_fleet_generates_cp_ids_and_shares_producer(producer):
+    """Test that every hosted engine uses the single shared producer."""
+    host = make_host(producer, count=3)
+
+    assert list(host.engines) == ["CP-001", "CP-002", "CP-003"]
+    assert all(engine.producer is host.producer for engine in host.engines.values())
+    assert all(engine.config.health_port == 0 for engine in host.engines.values())
+
+
+def test_commands_are_routed_by_cp_id(producer):
+    """Test that a command only reaches the engine it is addressed to."""
+    host = make_host(producer)
+
+    async def run():
+        host.dispatcher.start()
+        await asyncio.gather(*(engine.start() for engine in host.engines.values()))
+        for cp_id in ("CP-002", "CP-404"):
+            await host.dispatcher.submit(cp_id, CentralCommand(
+                cmd=CommandType.START_SUPPLY, cp_id=cp_id,
+                payload={"driver_id": "driver-1", "request_id": "req-1", "session_id": "s-1"}
+            ))
+        await host.dispatcher.join()
+        states = {cp_id: engine.state for cp_id, engine in host.engines.items()}
+        await host.stop()
+        return states
+
+    states = asyncio.run(run())
+
+    assert states["CP-002"] == CPState.SUPPLYING
+    assert [s for cp_id, s in states.items() if cp_id != "CP-002"] == [CPState.ACTIVATED] * 4
+    assert host.dropped_commands == 1
+    assert host.producer.stopped
+    status_keys = {key for topic, _, key in host.producer.sent if topic == TOPICS["CP_STATUS"]}
+    assert status_keys == set(host.engines)
@@ -0,0 +1,194 @@
+"""
+Unit tests for the CP Monitor's connection to Central.
+Uses a minimal keep-alive HTTP server and a real engine health server on
+loopback ports.
+"""
+
+import asyncio
+
+from evcharging.apps.ev_central.tcp_server import TCPControlServer
+from evcharging.apps.ev_cp_e.main import CPEngine
+from evcharging.apps.ev_cp_m import main as monitor_main
+from evcharging.apps.ev_cp_m.fleet import CPMonitorFleet
+from evcharging.apps.ev_cp_m.main import CPMonitor
+from evcharging.common.config import CPEngineConfig, CPMonitorConfig, CPMonitorFleetConfig
+from evcharging.common.utils import jittered_backoff
+
+
+async def start_central_stub():
+    """Answer every request with 200 {} and count accepted connections."""
+    connections = []
+
+    async def handle(reader, writer):
+        connections.append(writer)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":")[1])
+                await reader.readexactly(length)
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: 2\r\n\r\n{}")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1], connections
+
+
+def make_monitor(port, **overrides):
+    overrides.setdefault("central_control_port", 0)
+    config = CPMonitorConfig(cp_id="CP-001", central_host="127.0.0.1", central_port=port, **overrides)
+    monitor = CPMonitor(config)
+    monitor.http = monitor.create_http_client()
+    return monitor
+
+
+def test_heartbeats_reuse_one_connection():
+    """Test that repeated heartbeats share one keep-alive connection."""
+    async def run():
+        server, port, connections = await start_central_stub()
+        monitor = make_monitor(port)
+        for _ in range(20):
+            await monitor.send_heartbeat()
+        await monitor.stop()
+        server.close()
+        return monitor.stats(), len(connections)
+
+    stats, accepted = asyncio.run(run())
+
+    assert accepted == 1
+    assert stats["connections_opened"] == 1
+    assert stats["connection_reuse_rate"] == 0.95
+    assert stats["heartbeat_rtt"]["count"] == 20
+    assert stats["heartbeat_rtt"]["p99_ms"] >= stats["heartbeat_rtt"]["p50_ms"]
+
+
+def test_unreachable_central_backs_off(monkeypatch):
+    """Test that heartbeats are skipped while backing off after a failure."""
+    monkeypatch.setattr(monitor_main, "jittered_backoff", lambda attempt, base, cap: 60.0)
+
+    async def run():
+        server, port, _ = await start_central_stub()
+        server.close()
+        await server.wait_closed()
+        monitor = make_monitor(port)
+        await monitor.send_heartbeat()
+        await monitor.send_heartbeat()
+        await monitor.stop()
+        return monitor.stats()
+
+    stats = asyncio.run(run())
+
+    assert stats["requests"] == 1
+    assert stats["request_failures"] == 1
+    assert stats["heartbeat_rtt"]["count"] == 0
+
+
+def test_jittered_backoff_bounds():
+    """Test exponential growth, the cap, and jitter staying non-negative."""
+    for attempt in range(1, 10):
+        delays = [jittered_backoff(attempt, base=0.5, cap=4.0) for _ in range(200)]
+        assert min(delays) >= 0
+        assert max(delays) <= min(4.0, 0.5 * 2 ** (attempt - 1))
+    # Attempt counts from a long outage stay within the cap instead of overflowing
+    assert 0 <= jittered_backoff(5000, base=0.5, cap=4.0) <= 4.0
+
+
+def make_engine():
+    return CPEngine(CPEngineConfig(cp_id="CP-001", health_port=0))
+
+
+def test_persistent_probe_reuses_connection():
+    """Test that probes share one engine connection and record RTT."""
+    async def run():
+        engine = make_engine()
+        await engine.start_health_server()
+        port = engine.health_server.sockets[0].getsockname()[1]
+        monitor = make_monitor(9, cp_e_host="127.0.0.1", cp_e_port=port)
+
+        responses = [await monitor.probe_engine() for _ in range(10)]
+        # An error drops the connection; the next probe reconnects
+        monitor._probe_writer.close()
+        responses.append(await monitor.probe_engine())
+
+        await monitor.stop()
+        engine.health_server.close()
+        return responses, monitor.stats()
+
+    responses, stats = asyncio.run(run())
+
+    assert responses == [b"OK:DISCONNECTED\n"] * 11
+    assert stats["probe_connections"] == 2
+    assert stats["probe_rtt"]["count"] == 11
+
+
+def test_per_probe_connection_mode():
+    """Test that persistent_probe=False opens a connection per probe."""
+    async def run():
+        engine = make_engine()
+        await engine.start_health_server()
+        port = engine.health_server.sockets[0].getsockname()[1]
+        monitor = make_monitor(9, cp_e_host="127.0.0.1", cp_e_port=port, persistent_probe=False)
+        for _ in range(3):
+            await monitor.probe_engine()
+        await monitor.stop()
+        engine.health_server.close()
+        return monitor.stats()
+
+    assert asyncio.run(run())["probe_connections"] == 3
+
+
+def test_control_traffic_uses_one_tcp_connection(controller):
+    """Test that register, heartbeats and faults share one TCP control connection."""
+    async def run():
+        server = TCPControlServer(0, controller, host="127.0.0.1")
+        await server.listen()
+        monitor = CPMonitor(CPMonitorConfig(
+            cp_id="CP-001", central_host="127.0.0.1", central_control_port=server.port
+        ))
+        await monitor.register_with_central()
+        monitor.engine_state = "ACTIVATED"
+        monitor.last_probe_rtt = 0.002
+        for _ in range(5):
+            await monitor.send_heartbeat()
+        await monitor.notify_central_fault()
+        faulty = controller.charging_points["CP-001"].is_faulty
+        await monitor.stop()
+        await server.stop()
+        return monitor.stats(), faulty
+
+    stats, faulty = asyncio.run(run())
+
+    cp = controller.charging_points["CP-001"]
+    assert faulty is True
+    assert cp.monitor_engine_state == "ACTIVATED"
+    assert cp.monitor_rtt_ms == 2.0
+    assert stats["requests"] == 7
+    assert stats["connections_opened"] == 1
+
+
+def test_fleet_batches_heartbeats():
+    """Test that a monitor fleet sends one batched POST for all its CPs."""
+    async def run():
+        server, port, connections = await start_central_stub()
+        fleet = CPMonitorFleet(CPMonitorFleetConfig(
+            cp_count=50, central_host="127.0.0.1", central_port=port, heartbeat_batch_max=20
+        ))
+        await fleet.start()
+        for _ in range(3):
+            for monitor in fleet.monitors.values():
+                await monitor.send_heartbeat()
+        delivered = await fleet.flush_heartbeats()
+        await fleet.stop()
+        server.close()
+        return delivered, fleet.stats(), len(connections)
+
+    delivered, stats, accepted = asyncio.run(run())
+
+    # Only the latest heartbeat per CP is kept; 50 CPs in batches of 20
+    assert delivered == 50
+    assert stats["batches_sent"] == 3
+    assert accepted <= 8
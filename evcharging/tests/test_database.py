@@ -0,0 +1,141 @@
+"""
+Unit tests for the SQLite persistence layer.
+Validates synchronous and write-behind write paths.
+"""
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from evcharging.common.database import FaultHistoryDB, SessionEnergyCoalescer
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "test.db")
+
+
+def test_synchronous_writes_are_visible(db_path):
+    """Test that the default path commits every write immediately."""
+    db = FaultHistoryDB(db_path)
+    db.record_fault_event("CP-001", "FAULT", "test")
+
+    history = db.get_fault_history("CP-001")
+    assert len(history) == 1
+    assert db.get_writer_stats() is None
+
+
+def test_write_behind_session_lifecycle(db_path):
+    """Test that queued writes are applied in submission order."""
+    db = FaultHistoryDB(db_path, write_behind=True, flush_interval_ms=1000)
+    db.start_charging_session("session-1", "CP-001", "driver-1")
+    db.update_session_energy("session-1", 1.5, 0.45)
+    db.end_charging_session("session-1", 2.0, 0.60)
+
+    # Reads flush the queue first
+    sessions = db.get_session_history(cp_id="CP-001")
+    assert len(sessions) == 1
+    assert sessions[0]["status"] == "COMPLETED"
+    assert sessions[0]["total_kwh"] == 2.0
+    db.close()
+
+
+def test_write_behind_batches_rows(db_path):
+    """Test that many writes are committed in few transactions."""
+    db = FaultHistoryDB(db_path, write_behind=True, batch_size=100, flush_interval_ms=1000)
+    for i in range(250):
+        db.record_health_snapshot("CP-001", True, "ACTIVATED", "CLOSED", i)
+
+    assert db.flush(timeout=5)
+    stats = db.get_writer_stats()
+    assert stats["rows_written"] == 250
+    assert stats["enqueued"] == 250
+    assert stats["batches"] <= 5
+    assert stats["errors"] == 0
+    db.close()
+
+
+def test_close_flushes_pending_writes(db_path):
+    """Test that closing the writer commits everything still queued."""
+    db = FaultHistoryDB(db_path, write_behind=True, flush_interval_ms=10000)
+    db.record_fault_event("CP-002", "RECOVERY", "restored")
+    db.close()
+
+    reader = FaultHistoryDB(db_path)
+    assert reader.get_fault_statistics("CP-002")["recovery_count"] == 1
+
+
+def test_full_queue_drops_only_droppable_rows(db_path):
+    """Test that a stalled writer drops health snapshots but keeps lifecycle and fault rows."""
+    db = FaultHistoryDB(db_path, write_behind=True, batch_size=1, max_queue_size=2)
+    db.flush()
+    lock = sqlite3.connect(db_path)
+    lock.execute("BEGIN EXCLUSIVE")
+
+    for _ in range(4):
+        db.record_health_snapshot("CP-001", True, "ACTIVATED", "CLOSED")
+    db.start_charging_session("sess-1", "CP-001", "driver-1")
+    db.record_fault_event("CP-001", "FAULT", "overload")
+    lock.rollback()
+    lock.close()
+    stats = db.get_writer_stats()
+    db.close()
+
+    reader = FaultHistoryDB(db_path)
+    assert stats["dropped"] >= 1
+    assert len(reader.get_health_history("CP-001")) == 4 - stats["dropped"]
+    assert [s["session_id"] for s in reader.get_session_history(cp_id="CP-001")] == ["sess-1"]
+    assert reader.get_fault_statistics("CP-001")["fault_count"] == 1
+
+
+def test_reads_run_off_the_event_loop(db_path):
+    """Test that read helpers see queued writes when run through a worker thread."""
+    db = FaultHistoryDB(db_path, write_behind=True, flush_interval_ms=10000)
+
+    async def run():
+        db.record_fault_event("CP-003", "FAULT", "queued")
+        return await asyncio.to_thread(db.get_fault_history, "CP-003")
+
+    assert [row["reason"] for row in asyncio.run(run())] == ["queued"]
+    db.close()
+
+
+def test_write_after_close_rejected(db_path):
+    """Test that writes after shutdown fail loudly instead of being lost."""
+    db = FaultHistoryDB(db_path, write_behind=True)
+    db.close()
+
+    with pytest.raises(RuntimeError):
+        db.record_fault_event("CP-001", "FAULT", "late")
+
+
+def test_coalescer_keeps_latest_reading(db_path):
+    """Test that only the last reading per session is written."""
+    db = FaultHistoryDB(db_path)
+    db.start_charging_session("session-1", "CP-001", "driver-1")
+    coalescer = SessionEnergyCoalescer(db)
+
+    for i in range(1, 11):
+        coalescer.record("session-1", i * 0.1, i * 0.03)
+
+    assert coalescer.flush() == 1
+    assert coalescer.flush() == 0
+    session = db.get_session_history(cp_id="CP-001")[0]
+    assert session["total_kwh"] == pytest.approx(1.0)
+    assert coalescer.stats()["readings_received"] == 10
+    assert coalescer.stats()["rows_flushed"] == 1
+
+
+def test_coalescer_flush_single_session(db_path):
+    """Test that a targeted flush leaves other sessions dirty."""
+    db = FaultHistoryDB(db_path)
+    db.start_charging_session("session-1", "CP-001", "driver-1")
+    db.start_charging_session("session-2", "CP-002", "driver-2")
+    coalescer = SessionEnergyCoalescer(db)
+    coalescer.record("session-1", 1.0, 0.3)
+    coalescer.record("session-2", 2.0, 0.6)
+
+    assert coalescer.flush("session-1") == 1
+    assert coalescer.stats()["dirty_sessions"] == 1
+    assert db.get_session_history(cp_id="CP-002")[0]["total_kwh"] is None
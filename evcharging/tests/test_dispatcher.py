@@ -0,0 +1,99 @@
+"""
+Unit tests for the keyed dispatcher.
+Validates per-key ordering, cross-key concurrency and draining.
+"""
+
+import asyncio
+
+import pytest
+
+from evcharging.common.dispatcher import KeyedDispatcher
+
+
+def test_per_key_order_preserved():
+    """Test that items with the same key are handled in submission order."""
+    handled = []
+
+    async def handler(item):
+        key, seq = item
+        await asyncio.sleep(0)
+        handled.append(item)
+
+    async def run():
+        dispatcher = KeyedDispatcher(handler, num_workers=4)
+        dispatcher.start()
+        for seq in range(20):
+            for key in ("CP-001", "CP-002", "CP-003"):
+                await dispatcher.submit(key, (key, seq))
+        await dispatcher.drain()
+
+    asyncio.run(run())
+
+    assert len(handled) == 60
+    for key in ("CP-001", "CP-002", "CP-003"):
+        assert [seq for k, seq in handled if k == key] == list(range(20))
+
+
+def test_slow_key_does_not_block_other_shards():
+    """Test that a stalled handler only delays its own shard."""
+    release = None
+    handled = []
+
+    async def handler(item):
+        if item == "slow":
+            await release.wait()
+        handled.append(item)
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        dispatcher = KeyedDispatcher(handler, num_workers=8)
+        dispatcher.start()
+        slow_key = "CP-001"
+        fast_key = next(
+            f"CP-{i:03d}" for i in range(2, 100)
+            if dispatcher.shard_for(f"CP-{i:03d}") != dispatcher.shard_for(slow_key)
+        )
+        await dispatcher.submit(slow_key, "slow")
+        await dispatcher.submit(fast_key, "fast")
+        await asyncio.sleep(0.01)
+        assert handled == ["fast"]
+        release.set()
+        await dispatcher.drain()
+
+    asyncio.run(run())
+    assert handled == ["fast", "slow"]
+
+
+def test_handler_errors_are_counted():
+    """Test that handler failures are isolated and reported in stats."""
+    async def handler(item):
+        if item < 0:
+            raise ValueError("bad item")
+
+    async def run():
+        dispatcher = KeyedDispatcher(handler, num_workers=1)
+        dispatcher.start()
+        for item in (1, -1, 2):
+            await dispatcher.submit("CP-001", item)
+        await dispatcher.drain()
+        return dispatcher.stats()
+
+    stats = asyncio.run(run())
+    assert stats["shards"][0]["processed"] == 2
+    assert stats["shards"][0]["errors"] == 1
+
+
+def test_submit_after_drain_rejected():
+    """Test that a drained dispatcher refuses new work."""
+    async def handler(item):
+        pass
+
+    async def run():
+        dispatcher = KeyedDispatcher(handler)
+        dispatcher.start()
+        await dispatcher.drain()
+        with pytest.raises(RuntimeError):
+            await dispatcher.submit("CP-001", 1)
+
+    asyncio.run(run())
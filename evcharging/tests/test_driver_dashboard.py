@@ -2,7 +2,11 @@
 Tests for the driver dashboard FastAPI application.
 """
 
+import asyncio
+import json
 from datetime import datetime, timezone
+
+import httpx
 from fastapi.testclient import TestClient
 
 from evcharging.apps.ev_driver.dashboard import (
@@ -14,6 +18,8 @@ from evcharging.apps.ev_driver.dashboard import (
     SessionSummary,
     create_driver_dashboard_app,
 )
+from evcharging.apps.ev_driver.main import EVDriver
+from evcharging.common.config import DriverConfig
 
 
 class FakeDriver:
@@ -88,7 +94,7 @@ class FakeDriver:
             return None
         return self._session.model_copy(update={"status": "STOPPED"})
 
-    async def dashboard_session_history(self):
+    async def dashboard_session_history(self, after=0, limit=None):
         return self._history
 
     async def dashboard_favorites(self):
@@ -100,7 +106,7 @@ class FakeDriver:
     async def dashboard_remove_favorite(self, cp_id: str):
         return None
 
-    async def dashboard_notifications(self):
+    async def dashboard_notifications(self, after=0, limit=None):
         return [
             Notification(
                 notification_id="note-1",
@@ -164,3 +170,115 @@ def test_driver_dashboard_endpoints():
     resp = client.get("/drivers/driver-test/alerts")
     assert resp.status_code == 200
     assert resp.json()[0]["title"] == "Maintenance"
+
+
+def central_view(cp_id, engine_state="ACTIVATED", driver=None, kwh=None):
+    return {
+        "cp_id": cp_id, "state": "ON", "engine_state": engine_state, "monitor_status": "OK",
+        "current_driver": driver, "last_update": None, "monitor_last_seen": None,
+        "telemetry": {"kw": 22.0, "kwh": kwh, "euros": 0.1, "session_id": "s-1"} if kwh else None,
+    }
+
+
+def test_driver_applies_central_event_stream():
+    """Test that the driver applies SSE snapshot/changes events incrementally."""
+    snapshot = {"charging_points": [central_view("CP-001"), central_view("CP-002")], "version": 2, "epoch": "e"}
+    changes = {"charging_points": [central_view("CP-002", "SUPPLYING", "driver-test", kwh=1.5)], "version": 3, "epoch": "e"}
+    body = (
+        f"event: snapshot\ndata: {json.dumps(snapshot)}\n\n"
+        f": keep-alive\n\n"
+        f"event: changes\ndata: {json.dumps(changes)}\n\n"
+    ).encode()
+
+    def handler(request):
+        assert request.url.path == "/events"
+        return httpx.Response(200, content=body, headers={"content-type": "text/event-stream"})
+
+    async def run():
+        driver = EVDriver(DriverConfig(driver_id="driver-test", central_http_url="http://central"))
+        await asyncio.to_thread(driver.registry.load)
+        driver.session_state["req-1"] = SessionSummary(
+            session_id="sess-1", request_id="req-1", cp_id="CP-002", status="CHARGING"
+        )
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            await driver._follow_central_events(client)
+        return driver
+
+    driver = asyncio.run(run())
+
+    assert driver.central_events_received == 2
+    assert driver.central_version == 3
+    assert driver.charging_points["CP-001"].status == "FREE"
+    assert driver.charging_points["CP-002"].status == "OCCUPIED"
+    assert driver.session_state["req-1"].energy_kwh == 1.5
+    # CP-002 was pushed to the dashboard snapshot twice; the session once
+    assert driver.snapshot.version == 4
+    assert json.loads(driver.snapshot.body())["current_session"]["energy_kwh"] == 1.5
+
+
+def test_driver_notifications_are_bounded_deduplicated_and_paged():
+    """Test that repeated offline alerts are stored once and feeds page by seq."""
+    driver = EVDriver(DriverConfig(driver_id="driver-test", notification_capacity=3, history_capacity=2))
+    driver.registry.load()
+    driver.session_state["req-1"] = SessionSummary(
+        session_id="sess-1", request_id="req-1", cp_id="CP-001", status="PENDING"
+    )
+    offline = central_view("CP-001")
+    offline["state"] = "DISCONNECTED"
+
+    async def run():
+        for _ in range(50):  # one full /cp poll after another
+            await driver._update_charging_points([offline])
+        for i in range(4):
+            driver.session_state[f"req-{i}"] = SessionSummary(
+                session_id=f"sess-{i}", request_id=f"req-{i}", cp_id="CP-001", status="PENDING"
+            )
+            await driver.dashboard_cancel_request(f"req-{i}")
+
+    asyncio.run(run())
+
+    assert driver.notifications.stats()["deduplicated_total"] == 49
+    assert len(driver.notifications) == 3
+    assert len(driver.session_history) == 2
+
+    client = TestClient(create_driver_dashboard_app(driver))
+    notes = client.get("/drivers/driver-test/notifications").json()
+    assert [n["seq"] for n in notes] == [3, 4, 5]
+    assert [n["message"] for n in notes][-1] == "Request req-3 cancelled."
+
+    resp = client.get("/drivers/driver-test/notifications", params={"after": 3, "limit": 1})
+    assert [n["seq"] for n in resp.json()] == [4]
+    assert client.get("/drivers/driver-test/notifications", params={"after": 5}).json() == []
+
+    history = client.get("/drivers/driver-test/sessions/history", params={"after": 0, "limit": 10}).json()
+    assert [(h["seq"], h["request_id"]) for h in history] == [(3, "req-2"), (4, "req-3")]
+    assert client.get("/drivers/driver-test/sessions/history", params={"limit": 0}).status_code == 422
+
+
+def test_driver_nearest_charging_points():
+    """Test near/radius_km/limit search returns CPs by distance with distance_km set."""
+    driver = EVDriver(DriverConfig(driver_id="driver-test"))
+    driver.registry.load()
+    asyncio.run(driver._update_charging_points([central_view(f"CP-{i:03d}") for i in range(1, 11)]))
+    client = TestClient(create_driver_dashboard_app(driver))
+
+    # CP-001 is at the query point; CP-005 is ~0.3 km and CP-009 ~1.2 km away
+    resp = client.get("/charging-points", params={"near": "40.7128,-74.0060", "limit": 3})
+    assert resp.status_code == 200
+    points = resp.json()
+    assert [p["cp_id"] for p in points] == ["CP-001", "CP-005", "CP-009"]
+    distances = [p["location"]["distance_km"] for p in points]
+    assert distances[0] == 0.0 and distances == sorted(distances)
+
+    resp = client.get("/charging-points", params={"near": "40.7128,-74.0060", "radius_km": 1.0})
+    assert [p["cp_id"] for p in resp.json()] == ["CP-001", "CP-005"]
+
+    resp = client.get("/charging-points", params={"near": "40.7128,-74.0060", "connector_type": "CCS", "limit": 1})
+    assert [p["cp_id"] for p in resp.json()] == ["CP-004"]
+
+    resp = client.get("/charging-points", params={"min_power_kw": 100, "connector_type": "ccs"})
+    assert [p["cp_id"] for p in resp.json()] == ["CP-002", "CP-006", "CP-010"]
+    assert client.get("/charging-points", params={"limit": 4}).json()[0]["location"]["distance_km"] is None
+    assert len(client.get("/charging-points", params={"limit": 4}).json()) == 4
+    assert client.get("/charging-points", params={"near": "north"}).status_code == 422
+    assert client.get("/charging-points", params={"radius_km": 5}).status_code == 422
@@ -0,0 +1,65 @@
+"""
+Unit tests for the driver fleet host and keyed driver.updates delivery.
+Runs hosted drivers against an in-memory producer instead of Kafka.
+"""
+
+import asyncio
+
+from evcharging.apps.ev_driver.fleet import DriverFleetHost
+from evcharging.common.config import DriverFleetConfig, TOPICS
+from evcharging.common.kafka import KafkaConsumerHelper, partition_for_key
+from evcharging.common.messages import DriverUpdate, MessageStatus
+
+
+def make_host(producer, count=5):
+    host = DriverFleetHost(DriverFleetConfig(driver_count=count))
+    host.producer = producer
+    host.create_drivers()
+    return host
+
+
+def test_fleet_generates_driver_ids_and_shares_producer(producer):
+    """Test that every hosted driver uses the single shared producer and no consumer."""
+    host = make_host(producer, count=3)
+
+    assert list(host.drivers) == ["driver-001", "driver-002", "driver-003"]
+    assert all(driver.producer is host.producer for driver in host.drivers.values())
+    assert all(driver.hosted and driver.consumer is None for driver in host.drivers.values())
+
+
+def test_updates_are_routed_by_driver_id(producer):
+    """Test that an update only reaches the driver it is addressed to."""
+    host = make_host(producer)
+
+    async def run():
+        await asyncio.gather(*(driver.start() for driver in host.drivers.values()))
+        request = await host.drivers["driver-002"].send_request("CP-001")
+        for driver_id in ("driver-002", "driver-404"):
+            await host.route_update(DriverUpdate(
+                request_id=request.request_id, driver_id=driver_id, cp_id="CP-001",
+                status=MessageStatus.COMPLETED, reason="Charging complete"
+            ))
+        await host.stop()
+        return request
+
+    request = asyncio.run(run())
+
+    assert host.producer.sent == [(TOPICS["DRIVER_REQUESTS"], request, "driver-002")]
+    assert list(host.drivers["driver-002"].completed_requests) == [request.request_id]
+    assert host.drivers["driver-002"].pending_requests == {}
+    assert host.stats()["routed_updates"] == 1
+    assert host.stats()["completed_requests"] == 1
+    assert host.dropped_updates == 1
+    assert host.producer.stopped
+
+
+def test_keyed_update_assignment_reads_only_driver_partitions(producer):
+    """Test that drivers are assigned the driver.updates partitions their IDs hash to."""
+    topic = TOPICS["DRIVER_UPDATES"]
+    single = KafkaConsumerHelper("kafka:9092", [topic], "driver-driver-001", assign_keys=["driver-001"])
+    host = make_host(producer, count=40)
+    fleet = KafkaConsumerHelper("kafka:9092", [topic], "driver-fleet-1", assign_keys=host.driver_ids())
+
+    assert [tp.partition for tp in single.key_assignment({topic: 16})] == [partition_for_key("driver-001", 16)]
+    fleet_partitions = {tp.partition for tp in fleet.key_assignment({topic: 16})}
+    assert fleet_partitions == {partition_for_key(driver_id, 16) for driver_id in host.driver_ids()}
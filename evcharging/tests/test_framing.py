@@ -0,0 +1,127 @@
+"""
+Unit tests for STX/ETX/LRC framing.
+Validates streaming parsing, corruption handling and size limits.
+"""
+
+import json
+import os
+
+import pytest
+
+from evcharging.common.framing import (
+    FrameParser, MessageFramer, calculate_lrc, frame_message, frame_messages,
+    parse_framed_message
+)
+
+
+def corrupt(framed: bytes) -> bytes:
+    """Flip the LRC byte of a framed message."""
+    return framed[:-1] + bytes([framed[-1] ^ 0xFF])
+
+
+def test_frame_split_across_reads():
+    """Test that a frame delivered one byte at a time is parsed once complete."""
+    parser = FrameParser()
+    framed = frame_message('{"cmd": "heartbeat"}')
+
+    parser.feed(framed[:5])
+    assert list(parser.messages()) == []
+    assert parser.pending == framed[:5]
+
+    results = []
+    for i in range(5, len(framed)):
+        parser.feed(framed[i:i + 1])
+        results.extend(parser.messages())
+
+    assert results == ['{"cmd": "heartbeat"}']
+    assert len(parser) == 0 and parser.pending == b""
+
+
+def test_corrupt_frames_are_skipped():
+    """Test that bad LRC and invalid UTF-8 frames are dropped, not fatal."""
+    parser = FrameParser()
+    bad_utf8 = b"\x02\xff\x03\xff"
+    parser.feed(b"noise" + corrupt(frame_message("bad")) + bad_utf8 + frame_message("good"))
+
+    assert list(parser.messages()) == ["good"]
+    assert parser.frames_dropped == 2
+    assert parser.bytes_discarded == len(b"noise")
+
+
+def test_parse_framed_message_is_iterative():
+    """Test that long runs of corrupt frames do not recurse."""
+    buffer = corrupt(frame_message("x")) * 5000 + frame_message("ok")
+    message, remaining = parse_framed_message(buffer)
+    assert message == "ok"
+    assert remaining == b""
+
+
+def test_oversized_frame_dropped_and_resynced():
+    """Test that frames over max_frame_size are dropped without buffering them."""
+    parser = FrameParser(max_frame_size=16)
+    parser.feed(b"\x02" + b"a" * 100)
+    assert list(parser.messages()) == []
+    assert len(parser) < 32
+
+    parser.feed(b"\x03\x00" + frame_message("small"))
+    assert list(parser.messages()) == ["small"]
+    assert parser.frames_dropped == 1
+
+
+def test_frames_are_views_and_survive_feed():
+    """Test zero-copy frames and feeding while a view is still held."""
+    parser = FrameParser()
+    parser.feed(frame_message("first") + frame_message("second")[:3])
+
+    frame = parser.next_frame()
+    assert isinstance(frame, memoryview)
+    parser.feed(frame_message("second")[3:])
+
+    assert bytes(frame) == b"first"
+    assert [bytes(f) for f in parser.frames()] == [b"second"]
+
+
+def test_message_framer_keeps_large_frames():
+    """Test that frames over the old 10 KB cap are no longer truncated."""
+    payload = json.dumps({"data": "x" * 50_000})
+    framed = frame_message(payload)
+    framer = MessageFramer()
+
+    for i in range(0, len(framed), 1024):
+        framer.add_data(framed[i:i + 1024])
+
+    assert framer.get_all_messages() == [payload]
+    assert framer.buffer == b""
+
+
+def test_get_message_returns_frames_one_at_a_time():
+    """Test that frames received together are each returned by a separate call."""
+    framer = MessageFramer()
+    framer.add_data(frame_messages(["a", "b", "c"]))
+
+    assert [framer.get_message() for _ in range(4)] == ["a", "b", "c", None]
+
+    framer.add_data(frame_message("d"))
+    assert framer.get_message() == "d"
+
+
+@pytest.mark.parametrize("size", [0, 1, 128, 129, 4095, 4096, 4097, 100_000])
+def test_lrc_matches_bytewise_xor(size):
+    """Test every LRC path against a plain XOR over the bytes."""
+    data = os.urandom(size)
+    expected = 0
+    for byte in data:
+        expected ^= byte
+    assert calculate_lrc(data) == expected
+    assert calculate_lrc(memoryview(bytearray(data))) == expected
+
+
+def test_frame_messages_batches_frames():
+    """Test that batch framing equals framing each message in turn."""
+    messages = ['{"id": 1}', "é" * 300, ""]
+    batch = frame_messages(messages)
+
+    assert batch == b"".join(frame_message(m) for m in messages)
+    parser = FrameParser()
+    parser.feed(batch)
+    assert list(parser.messages()) == messages
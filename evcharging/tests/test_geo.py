@@ -0,0 +1,81 @@
+"""
+Unit tests for haversine distances and the GeoIndex nearest-point search.
+"""
+
+import random
+
+import pytest
+
+from evcharging.common.geo import GeoIndex, haversine_km, parse_lat_lon
+
+
+def brute_force(points, lat, lon, k=None, radius_km=None):
+    ranked = sorted((haversine_km(lat, lon, p_lat, p_lon), key) for key, p_lat, p_lon in points)
+    if radius_km is not None:
+        ranked = [r for r in ranked if r[0] <= radius_km]
+    return [(key, d) for d, key in ranked[:k]]
+
+
+def assert_same(got, expected):
+    assert [key for key, _ in got] == [key for key, _ in expected]
+    assert [d for _, d in got] == pytest.approx([d for _, d in expected])
+
+
+def test_haversine_known_distances():
+    """Test haversine against known great-circle distances."""
+    assert haversine_km(40.7128, -74.0060, 40.7128, -74.0060) == 0.0
+    # New York - London, ~5570 km
+    assert haversine_km(40.7128, -74.0060, 51.5074, -0.1278) == pytest.approx(5570, rel=0.01)
+    # One degree of latitude, ~111.2 km
+    assert haversine_km(0.0, 0.0, 1.0, 0.0) == pytest.approx(111.19, rel=0.001)
+
+
+def test_parse_lat_lon():
+    """Test parsing of the near=lat,lon query value."""
+    assert parse_lat_lon("40.71, -74.0") == (40.71, -74.0)
+    for bad in ("40.71", "a,b", "91,0", "0,181", "1,2,3"):
+        with pytest.raises(ValueError):
+            parse_lat_lon(bad)
+
+
+@pytest.mark.parametrize("cell_deg", [None, 0.5, 7.0])
+def test_nearest_matches_brute_force(cell_deg):
+    """Test k-NN and radius queries against a linear scan, including across the antimeridian."""
+    rng = random.Random(7)
+    points = [(i, rng.uniform(-60, 60), rng.uniform(-180, 180)) for i in range(400)]
+    points += [(f"am-{i}", rng.uniform(-2, 2), rng.choice([-1, 1]) * rng.uniform(178, 180)) for i in range(50)]
+    index = GeoIndex(points, cell_deg=cell_deg)
+
+    for lat, lon in [(0.0, 179.9), (0.0, -179.9), (45.0, 10.0), (-70.0, 0.0)]:
+        assert_same(index.nearest(lat, lon, k=10), brute_force(points, lat, lon, k=10))
+        assert_same(index.nearest(lat, lon, radius_km=800), brute_force(points, lat, lon, radius_km=800))
+    assert len(index.nearest(0.0, 0.0)) == len(points)
+
+
+def test_nearest_applies_predicate_before_k():
+    """Test that filtered-out points do not use up the k results."""
+    points = [(f"CP-{i}", 40.0 + i * 0.01, -74.0) for i in range(10)]
+    index = GeoIndex(points)
+
+    result = index.nearest(40.0, -74.0, k=3, predicate=lambda key: int(key[3:]) % 2 == 1)
+
+    assert [key for key, _ in result] == ["CP-1", "CP-3", "CP-5"]
+    assert result[0][1] == pytest.approx(1.112, abs=0.001)
+    assert index.nearest(40.0, -74.0, k=0) == []
+    assert GeoIndex([]).nearest(0.0, 0.0, k=5) == []
+
+
+def test_queries_far_from_every_point_stay_cheap(monkeypatch):
+    """Test that queries far from dense clusters do not scan rings of empty cells."""
+    rng = random.Random(11)
+    points = [(i, rng.gauss(40.4, 0.1), rng.gauss(-3.7, 0.1)) for i in range(2000)]
+    points += [(f"b-{i}", rng.gauss(41.4, 0.1), rng.gauss(2.2, 0.1)) for i in range(2000)]
+    index = GeoIndex(points, cell_deg=0.01)
+    probes = []
+    monkeypatch.setattr(index, "_ring", lambda *args: probes.append(args) or GeoIndex._ring(index, *args))
+
+    for lat, lon in [(45.0, 10.0), (0.0, -160.0), (-33.9, 151.2), (-89.0, 0.0)]:
+        assert_same(index.nearest(lat, lon, k=10), brute_force(points, lat, lon, k=10))
+        assert_same(index.nearest(lat, lon, radius_km=1500), brute_force(points, lat, lon, radius_km=1500))
+    # A ring scan out to the clusters would take thousands of rings per query
+    assert len(probes) < 100
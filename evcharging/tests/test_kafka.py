@@ -0,0 +1,293 @@
+"""
+Unit tests for the Kafka helpers.
+Uses in-memory stand-ins for the aiokafka client objects.
+"""
+
+import asyncio
+from collections import namedtuple
+
+import pytest
+from aiokafka.partitioner import DefaultPartitioner
+
+from evcharging.common import kafka
+from evcharging.common.kafka import (
+    KafkaConsumerHelper, KafkaProducerHelper, get_codec, available_codecs,
+    resolve_compression, serialize_value, partition_for_key, ensure_topics
+)
+from evcharging.common.messages import CPStatus, CPTelemetry
+
+
+TopicPartition = namedtuple("TopicPartition", ["topic", "partition"])
+Record = namedtuple(
+    "Record", ["topic", "key", "value", "partition", "offset", "headers"], defaults=[()]
+)
+
+
+class FakeConsumer:
+    """Serves a fixed list of getmany() results, then stops the test."""
+
+    def __init__(self, fetches):
+        self.fetches = list(fetches)
+        self.commits = []
+
+    async def getmany(self, timeout_ms=0, max_records=None):
+        if not self.fetches:
+            raise asyncio.CancelledError
+        return self.fetches.pop(0)
+
+    async def commit(self, offsets=None):
+        self.commits.append(offsets)
+
+
+class FakeAIOKafkaProducer:
+    """Stands in for the aiokafka producer; the test resolves or fails its delivery futures."""
+
+    def __init__(self):
+        self.deliveries = []
+
+    async def send(self, topic, value=None, key=None, headers=None):
+        delivery = asyncio.get_running_loop().create_future()
+        self.deliveries.append(delivery)
+        return delivery
+
+
+def make_batch(topic, partition, start, count):
+    tp = TopicPartition(topic, partition)
+    return tp, [
+        Record(topic, f"key-{i}", serialize_value({"seq": i}), partition, i)
+        for i in range(start, start + count)
+    ]
+
+
+def collect(helper, **kwargs):
+    async def run():
+        batches = []
+        try:
+            async for batch in helper.consume_batches(**kwargs):
+                batches.append(batch)
+        except asyncio.CancelledError:
+            pass
+        return batches
+    return asyncio.run(run())
+
+
+def test_consume_batches_groups_by_partition():
+    """Test that each yielded batch holds one partition's records."""
+    tp0, records0 = make_batch("cp.telemetry", 0, 0, 3)
+    tp1, records1 = make_batch("cp.telemetry", 1, 10, 2)
+    helper = KafkaConsumerHelper("kafka:9092", ["cp.telemetry"], "test")
+    helper.consumer = FakeConsumer([{tp0: records0, tp1: records1}])
+
+    batches = collect(helper)
+
+    assert [len(b) for b in batches] == [3, 2]
+    assert {r["partition"] for r in batches[0]} == {0}
+    assert batches[1][-1]["offset"] == 11
+    assert helper.consumer.commits == []
+
+
+def test_consume_batches_commits_after_handling():
+    """Test that offsets are committed per batch once the caller resumes."""
+    tp0, records0 = make_batch("cp.status", 0, 5, 4)
+    helper = KafkaConsumerHelper("kafka:9092", ["cp.status"], "test", enable_auto_commit=False)
+    helper.consumer = FakeConsumer([{tp0: records0}, {}])
+
+    batches = collect(helper, commit=True)
+
+    assert len(batches) == 1
+    assert helper.consumer.commits == [{tp0: 9}]
+
+
+def test_manual_commit_requires_auto_commit_disabled():
+    """Test that commit=True is rejected when auto-commit is on."""
+    helper = KafkaConsumerHelper("kafka:9092", ["cp.status"], "test")
+    helper.consumer = FakeConsumer([])
+
+    with pytest.raises(ValueError):
+        collect(helper, commit=True)
+
+
+def test_serialize_value_matches_model_dump_json():
+    """Test that models are serialized with their own JSON serializer."""
+    telemetry = CPTelemetry(cp_id="CP-001", kw=22.0, kwh=1.5, euros=0.45)
+    assert serialize_value(telemetry) == telemetry.model_dump_json().encode("utf-8")
+    assert serialize_value({"cp_id": "CP-001"}) == b'{"cp_id": "CP-001"}'
+
+
+def test_value_models_validate_raw_bytes():
+    """Test that typed topics yield models and bad records are skipped."""
+    good = CPTelemetry(cp_id="CP-001", kw=22.0, kwh=1.5, euros=0.45)
+    tp = TopicPartition("cp.telemetry", 0)
+    records = [
+        Record("cp.telemetry", "CP-001", serialize_value(good), 0, 0),
+        Record("cp.telemetry", "CP-001", b'{"cp_id": "CP-001"}', 0, 1),
+    ]
+    helper = KafkaConsumerHelper(
+        "kafka:9092", ["cp.telemetry"], "test",
+        value_models={"cp.telemetry": CPTelemetry}
+    )
+    helper.consumer = FakeConsumer([{tp: records}])
+
+    batches = collect(helper)
+
+    assert len(batches[0]) == 1
+    assert batches[0][0]["value"] == good
+
+
+@pytest.mark.parametrize("name", available_codecs())
+def test_codec_round_trip(name):
+    """Test that every registered codec round-trips telemetry."""
+    codec = get_codec(name)
+    telemetry = CPTelemetry(
+        cp_id="CP-001", kw=22.0, kwh=1.234567, euros=0.37,
+        driver_id="driver-1", session_id=None
+    )
+    decoded = codec.decode(codec.encode(telemetry), CPTelemetry)
+    assert decoded == telemetry
+
+
+def test_struct_codec_is_smallest_for_telemetry():
+    """Test that the fixed layout beats JSON on payload size."""
+    telemetry = CPTelemetry(cp_id="CP-001", kw=22.0, kwh=1.2, euros=0.36, driver_id="d-1", session_id="s-1")
+    assert len(get_codec("struct-telemetry").encode(telemetry)) < len(get_codec("json").encode(telemetry)) / 2
+
+
+def test_unknown_codec_rejected():
+    """Test that misconfigured codec names fail fast."""
+    with pytest.raises(ValueError, match="Unknown codec"):
+        KafkaProducerHelper("kafka:9092", codecs={"cp.telemetry": "xml"})
+
+
+def test_records_decoded_by_content_type_header():
+    """Test that mixed-codec records on one topic are all decoded."""
+    producer = KafkaProducerHelper("kafka:9092", codecs={"cp.telemetry": "struct-telemetry"})
+    telemetry = CPTelemetry(cp_id="CP-001", kw=22.0, kwh=1.5, euros=0.45)
+    struct_value, struct_headers = producer.encode("cp.telemetry", telemetry)
+    tp = TopicPartition("cp.telemetry", 0)
+    records = [
+        Record("cp.telemetry", "CP-001", struct_value, 0, 0, struct_headers),
+        # Older producers send JSON without a content-type header
+        Record("cp.telemetry", "CP-001", serialize_value(telemetry), 0, 1),
+        Record("cp.telemetry", "CP-001", b"??", 0, 2, [("content-type", b"text/plain")]),
+    ]
+    helper = KafkaConsumerHelper(
+        "kafka:9092", ["cp.telemetry"], "test",
+        value_models={"cp.telemetry": CPTelemetry}
+    )
+    helper.consumer = FakeConsumer([{tp: records}])
+
+    batches = collect(helper)
+
+    assert [r["value"] for r in batches[0]] == [telemetry, telemetry]
+
+
+def test_struct_codec_falls_back_to_json_for_other_messages():
+    """Test that messages a codec cannot encode are sent as JSON."""
+    producer = KafkaProducerHelper("kafka:9092", codecs={"cp.status": "struct-telemetry"})
+    value, headers = producer.encode("cp.status", CPStatus(cp_id="CP-001", state="ACTIVATED"))
+    assert headers == [("content-type", b"application/json")]
+    assert CPStatus.model_validate_json(value).state == "ACTIVATED"
+
+
+def test_send_nowait_tracks_in_flight_and_failures():
+    """Test delivery counters and failure callbacks for pipelined sends."""
+    failures = []
+
+    async def run():
+        helper = KafkaProducerHelper("kafka:9092")
+        helper.producer = FakeAIOKafkaProducer()
+        helper.add_failure_callback(lambda topic, key, error: failures.append((topic, key)))
+
+        futures = [
+            helper.send_nowait("cp.telemetry", {"seq": i}, key="CP-001") for i in range(3)
+        ]
+        await asyncio.sleep(0)
+        assert helper.stats()["in_flight"] == 3
+
+        deliveries = helper.producer.deliveries
+        deliveries[0].set_result("ok-0")
+        deliveries[1].set_exception(RuntimeError("broker down"))
+        deliveries[2].set_result("ok-2")
+        await asyncio.gather(*futures, return_exceptions=True)
+        return helper.stats(), futures
+
+    stats, futures = asyncio.run(run())
+    assert stats["in_flight"] == 0
+    assert stats["max_in_flight"] == 3
+    assert stats["delivered"] == 2
+    assert stats["failed"] == 1
+    assert failures == [("cp.telemetry", "CP-001")]
+    assert futures[0].result() == "ok-0"
+
+
+def test_resolve_compression():
+    """Test compression validation and gzip fallback."""
+    assert resolve_compression(None) is None
+    assert resolve_compression("none") is None
+    assert resolve_compression("GZIP") == "gzip"
+    assert resolve_compression("zstd") in {"zstd", "gzip"}
+    with pytest.raises(ValueError):
+        resolve_compression("brotli")
+
+
+def test_partition_for_key_matches_producer_partitioner():
+    """Test that consumers compute the partition the producer writes to."""
+    partitioner = DefaultPartitioner()
+    for i in range(200):
+        key = f"CP-{i:03d}"
+        assert partition_for_key(key, 16) == partitioner(key.encode(), list(range(16)), [])
+
+
+def test_key_assignment_covers_only_hashed_partitions():
+    """Test that keyed consumers are assigned just their keys' partitions."""
+    keys = ["CP-001", "CP-002"]
+    helper = KafkaConsumerHelper("kafka:9092", ["central.commands"], "test", assign_keys=keys)
+
+    assignment = helper.key_assignment({"central.commands": 64})
+
+    assert {tp.partition for tp in assignment} == {partition_for_key(k, 64) for k in keys}
+    assert all(tp.topic == "central.commands" for tp in assignment)
+
+
+class FakeAdmin:
+    """Records topic creation and growth against a fixed cluster state."""
+
+    existing = {}
+    created = []
+    grown = {}
+
+    def __init__(self, bootstrap_servers=None):
+        pass
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def describe_topics(self, topics):
+        return [
+            {"topic": t, "error_code": 0, "partitions": [{}] * self.existing[t]}
+            if t in self.existing else {"topic": t, "error_code": 3, "partitions": []}
+            for t in topics
+        ]
+
+    async def create_topics(self, new_topics, validate_only=False):
+        FakeAdmin.created = [(t.name, t.num_partitions) for t in new_topics]
+
+    async def create_partitions(self, topic_partitions):
+        FakeAdmin.grown = {t: p.total_count for t, p in topic_partitions.items()}
+
+
+def test_ensure_topics_creates_and_grows_partitions(monkeypatch):
+    """Test per-topic partition counts for new and existing topics."""
+    monkeypatch.setattr(kafka, "AIOKafkaAdminClient", FakeAdmin)
+    FakeAdmin.existing = {"central.commands": 1, "cp.status": 1}
+
+    asyncio.run(ensure_topics(
+        "kafka:9092", ["central.commands", "cp.status", "cp.telemetry"],
+        partitions={"central.commands": 16}
+    ))
+
+    assert FakeAdmin.created == [("cp.telemetry", 1)]
+    assert FakeAdmin.grown == {"central.commands": 16}
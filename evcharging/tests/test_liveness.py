@@ -0,0 +1,50 @@
+"""
+Unit tests for the heartbeat liveness tracker.
+"""
+
+from evcharging.common.liveness import LivenessTracker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_keys_expire_after_timeout():
+    """Test that only keys past their deadline are reported, once."""
+    clock = FakeClock()
+    tracker = LivenessTracker(5.0, clock=clock)
+    tracker.touch("CP-001")
+    clock.now = 2.0
+    tracker.touch("CP-002")
+
+    assert tracker.expire(now=4.9) == []
+    assert tracker.expire(now=5.0) == ["CP-001"]
+    assert tracker.expire(now=6.0) == []
+    assert tracker.expire(now=7.0) == ["CP-002"]
+    assert len(tracker) == 0
+    assert tracker.stats()["expired_total"] == 2
+
+
+def test_heartbeats_extend_deadline_without_growing_heap():
+    """Test that touching a live key only moves its deadline."""
+    clock = FakeClock()
+    tracker = LivenessTracker(5.0, clock=clock)
+    for i in range(100):
+        clock.now = i * 0.5
+        tracker.touch("CP-001")
+
+    assert tracker.stats()["heap_entries"] == 1
+    # The stale heap entry is re-pushed, not expired
+    assert tracker.expire(now=10.0) == []
+    assert tracker.next_deadline() == 49.5 + 5.0
+    assert tracker.expire(now=54.5) == ["CP-001"]
+
+    # An expired key starts a fresh deadline on its next heartbeat
+    clock.now = 60.0
+    tracker.touch("CP-001")
+    assert "CP-001" in tracker
+    assert tracker.expire(now=65.0) == ["CP-001"]
@@ -0,0 +1,57 @@
+"""
+Unit tests for the bounded, sequence-numbered RingStore.
+"""
+
+import pytest
+
+from evcharging.common.ring_store import RingStore
+
+
+def test_ring_store_evicts_oldest_and_keeps_seq_monotonic():
+    """Test that seqs keep increasing while only the newest records are held."""
+    store = RingStore(3)
+    seqs = [store.append(f"r{i}") for i in range(5)]
+
+    assert seqs == [1, 2, 3, 4, 5]
+    assert list(store) == ["r2", "r3", "r4"]
+    assert store.first_seq == 3
+    assert store.stats()["evicted_total"] == 2
+
+
+def test_ring_store_pages_by_cursor():
+    """Test that page(after, limit) resumes after a seq, including evicted ones."""
+    store = RingStore(4)
+    for i in range(1, 7):
+        store.append(i)  # records equal their seq; 1 and 2 are evicted
+
+    assert store.page() == [3, 4, 5, 6]
+    assert store.page(after=1) == [3, 4, 5, 6]
+    assert store.page(after=3, limit=2) == [4, 5]
+    assert store.page(after=6) == []
+    assert store.page(after=99) == []
+
+
+def test_ring_store_drops_identical_consecutive_records():
+    """Test that dedup_key only suppresses a repeat of the newest record."""
+    store = RingStore(10, dedup_key=lambda r: r["msg"])
+
+    assert store.append({"msg": "offline"}) == 1
+    assert store.append({"msg": "offline"}) is None
+    assert store.append({"msg": "online"}) == 2
+    assert store.append({"msg": "offline"}) == 3
+    assert store.stats()["deduplicated_total"] == 1
+
+
+def test_ring_store_assigns_seq_to_records():
+    """Test that set_seq receives each stored record's seq."""
+    class Record:
+        seq = 0
+
+    store = RingStore(2, set_seq=lambda record, seq: setattr(record, "seq", seq))
+    records = [Record() for _ in range(3)]
+    for record in records:
+        store.append(record)
+
+    assert [r.seq for r in records] == [1, 2, 3]
+    with pytest.raises(ValueError):
+        RingStore(0)
@@ -0,0 +1,90 @@
+"""
+Unit tests for the TCP control channel.
+Runs TCPControlServer on a loopback port against an in-memory producer.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from evcharging.apps.ev_central.tcp_server import TCPControlServer
+from evcharging.common.control_client import ControlClient, ControlError
+from evcharging.common.messages import CPRegistration
+
+
+def run_with_client(controller, scenario):
+    async def run():
+        server = TCPControlServer(0, controller, host="127.0.0.1")
+        await server.listen()
+        client = ControlClient("127.0.0.1", server.port)
+        await client.connect()
+        try:
+            return await scenario(client)
+        finally:
+            await client.close()
+            await server.stop()
+    return asyncio.run(run())
+
+
+def test_register_heartbeat_and_query(controller):
+    """Test the monitor command set over one persistent connection."""
+    async def scenario(client):
+        await client.register(CPRegistration(cp_id="CP-001", cp_e_host="engine-1", cp_e_port=8001))
+        await client.heartbeat("CP-001")
+        return await client.query("CP-001")
+
+    states = run_with_client(controller, scenario)
+
+    assert states == [{
+        "cp_id": "CP-001", "state": "ACTIVATED", "current_driver": None,
+        "current_session": None, "last_update": states[0]["last_update"],
+    }]
+    assert controller.charging_points["CP-001"].cp_e_host == "engine-1"
+
+
+def test_pipelined_requests_are_correlated(controller):
+    """Test that many in-flight requests each get their own response."""
+    for i in range(50):
+        controller.register_cp(CPRegistration(cp_id=f"CP-{i:03d}", cp_e_host="localhost", cp_e_port=8001))
+
+    async def scenario(client):
+        return await asyncio.gather(*(client.query(f"CP-{i:03d}") for i in range(50)))
+
+    results = run_with_client(controller, scenario)
+
+    assert [r[0]["cp_id"] for r in results] == [f"CP-{i:03d}" for i in range(50)]
+
+
+def test_fault_and_recovery(controller):
+    """Test fault commands, including rejection for unknown CPs."""
+    controller.register_cp(CPRegistration(cp_id="CP-001", cp_e_host="localhost", cp_e_port=8001))
+
+    async def scenario(client):
+        await client.fault("CP-001", "probe timeout")
+        faulty = controller.charging_points["CP-001"].is_faulty
+        with pytest.raises(ControlError, match="Unknown charging point"):
+            await client.fault("CP-404", "probe timeout")
+        await client.healthy("CP-001")
+        return faulty
+
+    assert run_with_client(controller, scenario) is True
+    assert controller.charging_points["CP-001"].is_faulty is False
+
+
+def test_malformed_requests_get_error_responses(controller):
+    """Test that bad requests are answered, not dropped."""
+    server = TCPControlServer(0, controller)
+
+    async def run():
+        return [
+            json.loads(await server.handle_request(message))
+            for message in ("not json", '{"id": 3, "cmd": "reboot"}', '{"id": 4, "cmd": "heartbeat"}')
+        ]
+
+    responses = asyncio.run(run())
+
+    assert [r["ok"] for r in responses] == [False, False, False]
+    assert [r["id"] for r in responses] == [None, 3, 4]
+    assert "Unknown command" in responses[1]["error"]
+    assert server.requests_failed == 3